@@ -0,0 +1,82 @@
+"""
+NumPy feature extractor vs. librosa: latency and agreement.
+
+Usage:
+    python benchmarks/bench_audio_features.py [--seconds 1 10 60] [--repeat 5]
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from audio_features import extract_features  # noqa: E402
+
+
+def synth(seconds: float, sr: int, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(seconds * sr)) / sr
+    # Gliding tone plus noise so every frame has a different spectrum
+    tone = 0.3 * np.sin(2 * np.pi * (180 + 40 * np.sin(2 * np.pi * 0.5 * t)) * t)
+    return (tone + 0.05 * rng.standard_normal(t.size)).astype(np.float32)
+
+
+def librosa_features(y: np.ndarray, sr: int, n_mfcc: int) -> dict:
+    import librosa
+
+    return {
+        "rms": float(np.mean(librosa.feature.rms(y=y))),
+        "centroid": float(np.mean(librosa.feature.spectral_centroid(y=y, sr=sr))),
+        "zcr": float(np.mean(librosa.feature.zero_crossing_rate(y=y))),
+        "mfcc": librosa.feature.mfcc(y=y, sr=sr, n_mfcc=n_mfcc).mean(axis=1),
+    }
+
+
+def best_of(fn, repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seconds", type=float, nargs="+", default=[1.0, 10.0, 60.0])
+    parser.add_argument("--sr", type=int, default=16000)
+    parser.add_argument("--n-mfcc", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    # librosa defers most of its imports (and numba compilation) to the first feature call
+    warm = synth(0.5, args.sr)
+    start = time.perf_counter()
+    librosa_features(warm, args.sr, args.n_mfcc)
+    print(f"librosa cold start (import + first call): {time.perf_counter() - start:.2f}s")
+    start = time.perf_counter()
+    extract_features(warm, args.sr, n_mfcc=args.n_mfcc)
+    print(f"numpy   cold start (first call):          {time.perf_counter() - start:.2f}s")
+
+    for seconds in args.seconds:
+        y = synth(seconds, args.sr)
+        ours = extract_features(y, args.sr, n_mfcc=args.n_mfcc)
+        ref = librosa_features(y, args.sr, args.n_mfcc)
+        t_ours = best_of(lambda: extract_features(y, args.sr, n_mfcc=args.n_mfcc), args.repeat)
+        t_ref = best_of(lambda: librosa_features(y, args.sr, args.n_mfcc), args.repeat)
+        diffs = {k: abs(ours[k] - ref[k]) for k in ("rms", "centroid", "zcr")}
+        diffs["mfcc"] = float(np.max(np.abs(np.asarray(ours["mfcc"]) - ref["mfcc"])))
+        print(
+            f"{seconds:6.1f}s clip: numpy {t_ours * 1000:8.2f} ms  librosa {t_ref * 1000:8.2f} ms  "
+            f"speedup {t_ref / t_ours:5.1f}x  max|diff| "
+            + " ".join(f"{k}={v:.2e}" for k, v in diffs.items())
+        )
+
+
+if __name__ == "__main__":
+    main()
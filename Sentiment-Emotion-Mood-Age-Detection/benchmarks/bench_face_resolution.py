@@ -0,0 +1,106 @@
+"""
+Face detection accuracy vs. latency at several detection resolutions.
+
+Boxes detected at full resolution are the reference; for each maximum
+detection side the script reports per-image latency, RSS growth, recall
+(reference faces matched at IoU >= 0.5) and mean IoU of the matches.
+
+Usage:
+    python benchmarks/bench_face_resolution.py --images path/to/photos [--sides 1920 1280 960 640 480]
+
+Without --images, a few synthetic 12 MP images are generated by upscaling
+random crops of a blank canvas, which only exercises latency (no faces).
+"""
+from __future__ import annotations
+
+import argparse
+import glob
+import os
+import sys
+import time
+from typing import List, Optional
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from PIL import Image  # noqa: E402
+
+from face_analysis import FaceAnalyzer  # noqa: E402
+from registry import _rss_bytes  # noqa: E402
+
+
+def load_images(directory: Optional[str], count: int) -> List[Image.Image]:
+    if directory:
+        paths = sorted(
+            p for ext in ("jpg", "jpeg", "png") for p in glob.glob(os.path.join(directory, f"*.{ext}"))
+        )
+        return [Image.open(p).convert("RGB") for p in paths[:count]]
+    rng = np.random.default_rng(0)
+    images = []
+    for _ in range(count):
+        small = rng.integers(0, 255, (300, 400, 3), dtype=np.uint8)
+        images.append(Image.fromarray(small).resize((4000, 3000), Image.BILINEAR))
+    return images
+
+
+def iou(a: np.ndarray, b: np.ndarray) -> float:
+    x1, y1 = max(a[0], b[0]), max(a[1], b[1])
+    x2, y2 = min(a[2], b[2]), min(a[3], b[3])
+    inter = max(0.0, x2 - x1) * max(0.0, y2 - y1)
+    union = (a[2] - a[0]) * (a[3] - a[1]) + (b[2] - b[0]) * (b[3] - b[1]) - inter
+    return inter / union if union > 0 else 0.0
+
+
+def detect_boxes(analyzer: FaceAnalyzer, img: Image.Image) -> np.ndarray:
+    boxes, _ = analyzer._detect_batch([img])[0]
+    return np.zeros((0, 4)) if boxes is None else np.asarray(boxes, dtype=np.float64)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--images", help="directory of JPEG/PNG photos")
+    parser.add_argument("--count", type=int, default=8)
+    parser.add_argument("--sides", type=int, nargs="+", default=[1920, 1280, 960, 640, 480])
+    parser.add_argument("--min-face-size", type=int, default=20)
+    args = parser.parse_args()
+
+    images = load_images(args.images, args.count)
+    if not images:
+        sys.exit("No images found.")
+
+    reference_analyzer = FaceAnalyzer(max_detection_side=None, min_face_size=args.min_face_size)
+    reference_analyzer.warmup()
+    if reference_analyzer._mtcnn is None:
+        sys.exit("facenet-pytorch is not installed; nothing to benchmark.")
+
+    configs: List[Optional[int]] = [None] + list(args.sides)
+    references = [detect_boxes(reference_analyzer, img) for img in images]
+    print(f"{len(images)} images, {sum(len(r) for r in references)} reference faces")
+    print(f"{'max side':>10} {'ms/img':>9} {'RSS +MiB':>9} {'recall':>7} {'mean IoU':>9}")
+
+    for side in configs:
+        analyzer = FaceAnalyzer(max_detection_side=side, min_face_size=args.min_face_size)
+        analyzer.warmup()
+        rss_before = _rss_bytes()
+        start = time.perf_counter()
+        detections = [detect_boxes(analyzer, img) for img in images]
+        elapsed = (time.perf_counter() - start) / len(images)
+        rss_delta = max(0, _rss_bytes() - rss_before) / (1024 * 1024)
+
+        matched, ious = 0, []
+        for ref, found in zip(references, detections):
+            for box in ref:
+                best = max((iou(box, other) for other in found), default=0.0)
+                if best >= 0.5:
+                    matched += 1
+                    ious.append(best)
+        total = sum(len(r) for r in references)
+        recall = matched / total if total else float("nan")
+        mean_iou = float(np.mean(ious)) if ious else float("nan")
+        label = "full" if side is None else str(side)
+        print(f"{label:>10} {elapsed * 1000:9.1f} {rss_delta:9.1f} {recall:7.2f} {mean_iou:9.3f}")
+
+
+if __name__ == "__main__":
+    main()
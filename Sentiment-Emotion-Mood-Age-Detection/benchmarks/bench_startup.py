@@ -0,0 +1,214 @@
+"""
+Cold-start cost: import time of each module and first-request latency per modality.
+
+Every measurement runs in a fresh interpreter. Imports are timed with
+`python -X importtime`; the report shows each module's cumulative import
+time, its heaviest dependencies and any heavy packages (numpy, torch, ...)
+it pulled in. For each modality the first request is timed twice: cold
+(models load lazily inside the request) and after an explicit
+`registry.preload` warmup, together with the warmup time itself; the
+repeat of the same request is normally served by the result cache.
+
+Usage:
+    python benchmarks/bench_startup.py [--json startup.json]
+    python benchmarks/bench_startup.py --check [--budget benchmarks/startup_budget.json]
+
+With --check the run exits non-zero when a module exceeds its import budget,
+imports a package listed as forbidden for it, or a warm first request is over
+budget, so it can gate CI.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+from typing import Any, Dict, List, Tuple
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+SRC = os.path.normpath(os.path.join(HERE, "..", "src"))
+DEFAULT_BUDGET = os.path.join(HERE, "startup_budget.json")
+
+MODULES = (
+    "registry",
+    "result_cache",
+    "metrics",
+    "text_analysis",
+    "speech_analysis",
+    "face_analysis",
+    "face_attributes",
+    "mood_predictor",
+    "recommender",
+    "orchestrator",
+    "diary_store",
+    "micro_batcher",
+    "async_api",
+    "service",
+)
+HEAVY = (
+    "numpy", "pandas", "PIL", "torch", "transformers", "optimum", "onnxruntime",
+    "librosa", "soundfile", "facenet_pytorch", "cv2", "nltk", "streamlit", "flask",
+)
+MODALITIES = ("text", "speech", "face", "mood", "recommender")
+
+# Runs inside the child interpreter: builds a tiny input for the modality and times one request
+_REQUEST_SNIPPET = r"""
+import io, json, math, struct, sys, time, wave
+sys.path.insert(0, {src!r})
+from registry import get_analyzer, preload
+
+name, warm = {name!r}, {warm!r}
+
+def payload():
+    if name == "speech":
+        buf = io.BytesIO()
+        with wave.open(buf, "wb") as w:
+            w.setnchannels(1); w.setsampwidth(2); w.setframerate(16000)
+            w.writeframes(b"".join(struct.pack("<h", int(8000 * math.sin(i / 20.0))) for i in range(16000)))
+        return buf.getvalue()
+    if name == "face":
+        from PIL import Image
+        buf = io.BytesIO()
+        Image.new("RGB", (320, 240), (180, 140, 120)).save(buf, format="PNG")
+        return buf.getvalue()
+    return None
+
+def request(data):
+    analyzer = get_analyzer(name)
+    if name == "text":
+        return analyzer.analyze("I finally finished the project and I feel great")
+    if name == "speech":
+        return analyzer.analyze_bytes(data)
+    if name == "face":
+        return analyzer.analyze_bytes(data)
+    if name == "mood":
+        return analyzer.predict_mood({{"sentiment": {{"label": "positive", "confidence": 0.9}},
+                                      "emotion": {{"label": "joy", "confidence": 0.8}}}}, None, None)
+    return analyzer.recommend("calm", "joy")
+
+data = payload()
+warmup_ms = 0.0
+if warm:
+    t = time.perf_counter(); preload([name]); warmup_ms = (time.perf_counter() - t) * 1000
+t = time.perf_counter(); request(data); first_ms = (time.perf_counter() - t) * 1000
+t = time.perf_counter(); request(data); second_ms = (time.perf_counter() - t) * 1000
+print(json.dumps({{"warmup_ms": warmup_ms, "first_ms": first_ms, "second_ms": second_ms}}))
+"""
+
+
+def measure_import(module: str) -> Dict[str, Any]:
+    code = (
+        f"import sys; sys.path.insert(0, {SRC!r}); import {module}; "
+        f"print(','.join(h for h in {HEAVY!r} if h in sys.modules))"
+    )
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", code], capture_output=True, text=True)
+    if proc.returncode != 0:
+        return {"error": proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else "import failed"}
+    total_us = 0
+    top: List[Tuple[int, str]] = []
+    children: List[Tuple[int, str]] = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        try:
+            _, cumulative, name = line.split("|")
+            cumulative_us = int(cumulative.strip())
+        except ValueError:
+            continue  # header line
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        if depth == 1:
+            children.append((cumulative_us, name.strip()))
+        elif depth == 0:
+            # Children are printed before their parent; anything under other roots (site, ...) is dropped
+            if name.strip() == module:
+                total_us, top = cumulative_us, children
+            children = []
+    heavy = [h for h in proc.stdout.strip().split(",") if h]
+    top.sort(reverse=True)
+    return {
+        "import_ms": total_us / 1000.0,
+        "heaviest": [{"module": name, "ms": us / 1000.0} for us, name in top[:5]],
+        "heavy_imports": heavy,
+    }
+
+
+def measure_request(name: str, warm: bool) -> Dict[str, Any]:
+    code = _REQUEST_SNIPPET.format(src=SRC, name=name, warm=warm)
+    proc = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True)
+    if proc.returncode != 0:
+        return {"error": proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else "request failed"}
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def check(report: Dict[str, Any], budget: Dict[str, Any]) -> List[str]:
+    failures: List[str] = []
+    for module, limit in budget.get("import_ms", {}).items():
+        measured = report["imports"].get(module, {})
+        if "error" in measured:
+            failures.append(f"{module}: {measured['error']}")
+        elif measured.get("import_ms", 0.0) > limit:
+            failures.append(f"{module}: import {measured['import_ms']:.1f} ms > {limit} ms")
+    for module, forbidden in budget.get("forbidden_imports", {}).items():
+        pulled = set(report["imports"].get(module, {}).get("heavy_imports", [])) & set(forbidden)
+        if pulled:
+            failures.append(f"{module}: imports {', '.join(sorted(pulled))} at import time")
+    for name, limit in budget.get("warm_first_request_ms", {}).items():
+        measured = report["requests"].get(name, {}).get("warm", {})
+        if "error" in measured:
+            failures.append(f"{name}: {measured['error']}")
+        elif measured.get("first_ms", 0.0) > limit:
+            failures.append(f"{name}: first request after warmup {measured['first_ms']:.1f} ms > {limit} ms")
+    return failures
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--modules", nargs="+", default=list(MODULES))
+    parser.add_argument("--modalities", nargs="+", default=list(MODALITIES))
+    parser.add_argument("--json", help="write the report to this file")
+    parser.add_argument("--check", action="store_true", help="fail when the budget is exceeded")
+    parser.add_argument("--budget", default=DEFAULT_BUDGET)
+    args = parser.parse_args()
+
+    report: Dict[str, Any] = {"python": sys.version.split()[0], "imports": {}, "requests": {}}
+    print(f"{'module':<16} {'import ms':>10}  heavy imports / heaviest dependencies")
+    for module in args.modules:
+        result = measure_import(module)
+        report["imports"][module] = result
+        if "error" in result:
+            print(f"{module:<16} {'error':>10}  {result['error']}")
+            continue
+        heaviest = ", ".join(f"{d['module']} {d['ms']:.0f}" for d in result["heaviest"][:3])
+        print(f"{module:<16} {result['import_ms']:10.1f}  [{', '.join(result['heavy_imports'])}] {heaviest}")
+
+    print(f"\n{'modality':<12} {'cold 1st ms':>12} {'warmup ms':>10} {'warm 1st ms':>12} {'repeat ms':>10}")
+    for name in args.modalities:
+        cold = measure_request(name, warm=False)
+        warm = measure_request(name, warm=True)
+        report["requests"][name] = {"cold": cold, "warm": warm}
+        if "error" in cold or "error" in warm:
+            print(f"{name:<12} error: {cold.get('error') or warm.get('error')}")
+            continue
+        print(
+            f"{name:<12} {cold['first_ms']:12.1f} {warm['warmup_ms']:10.1f} "
+            f"{warm['first_ms']:12.1f} {warm['second_ms']:10.1f}"
+        )
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as fh:
+            json.dump(report, fh, indent=2)
+
+    if args.check:
+        with open(args.budget, "r", encoding="utf-8") as fh:
+            budget = json.load(fh)
+        failures = check(report, budget)
+        for failure in failures:
+            print(f"FAIL {failure}")
+        if failures:
+            sys.exit(1)
+        print("startup budget OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,361 @@
+"""
+Latency, throughput and memory of every analyzer, on model and fallback paths.
+
+Each scenario runs in a fresh interpreter on synthetic inputs from
+fixtures.py, with result caching disabled. Setup (construction plus the first
+call, which loads models lazily) is timed separately; then calls repeat for
+--seconds and the report gives p50/p95 latency per call, items/s, the
+tracemalloc peak of a few extra calls (Python and NumPy allocations) and the
+RSS growth of the whole scenario (includes native torch/onnx memory). The
+"path" column records what actually ran, e.g. whether the emotion model
+loaded or the keyword fallback answered.
+
+Usage:
+    python benchmarks/bench_suite.py [--scenarios text/keywords mood/batch] [--quick] [--json run.json]
+    python benchmarks/bench_suite.py --json new.json --compare baseline.json [--tolerance 0.2]
+    python benchmarks/bench_suite.py --profile cprofile [--profile-dir profiles/]
+
+With --compare the run exits non-zero when a scenario got slower (p50/p95),
+lost throughput or used more memory than the baseline by more than
+--tolerance, or now takes a different path (e.g. the model stopped loading).
+--profile dumps one profile per scenario of a separate pass over the hot
+loop: `.prof` files for cProfile (open with snakeviz or pstats) or `.html`
+for pyinstrument.
+
+The text model honours MOOD_TEXT_BACKEND, MOOD_TEXT_MODEL_DIR and MOOD_OFFLINE
+like the registry; set MOOD_OFFLINE=1 on machines without network access.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, "..", "src"))
+sys.path.insert(0, HERE)
+
+import fixtures  # noqa: E402
+
+# A scenario builds its inputs and analyzer and returns (call, items per call, path info)
+Setup = Tuple[Callable[[int], Any], int, Dict[str, Any]]
+
+TEXT_BATCH_SIZE = 32
+MOOD_BATCH_SIZE = 1024
+# Fractional slack before a metric counts as a regression; sub-noise latency changes are ignored
+DEFAULT_TOLERANCE = 0.2
+DEFAULT_NOISE_MS = 0.05
+
+
+def _cycle(items: Sequence[Any]) -> Callable[[int], Any]:
+    return lambda i: items[i % len(items)]
+
+
+def _text_analyzer(backend: str) -> Any:
+    from text_analysis import TextAnalyzer
+
+    return TextAnalyzer(
+        cache=None,
+        model_path=os.environ.get("MOOD_TEXT_MODEL_DIR"),
+        offline=os.environ.get("MOOD_OFFLINE", "") not in ("", "0", "false"),
+        backend=backend,
+    )
+
+
+def _text_path(analyzer: Any) -> Dict[str, Any]:
+    return {
+        "backend": analyzer.backend,
+        "sentiment": "vader" if analyzer._vader is not None else "keywords",
+        "emotion": "model" if analyzer._emotion_pipe is not None else "keywords",
+    }
+
+
+def setup_text(backend: Optional[str], batch: bool) -> Setup:
+    analyzer = _text_analyzer(backend or os.environ.get("MOOD_TEXT_BACKEND", "torch"))
+    texts = fixtures.make_texts(256)
+    if batch:
+        chunks = [texts[i : i + TEXT_BATCH_SIZE] for i in range(0, len(texts), TEXT_BATCH_SIZE)]
+        pick = _cycle(chunks)
+        call = lambda i: analyzer.analyze_batch(pick(i), TEXT_BATCH_SIZE)  # noqa: E731
+        size = TEXT_BATCH_SIZE
+    else:
+        pick = _cycle(texts)
+        call = lambda i: analyzer.analyze(pick(i))  # noqa: E731
+        size = 1
+    call(0)
+    return call, size, _text_path(analyzer)
+
+
+def setup_speech(decode: bool) -> Setup:
+    from speech_analysis import SpeechEmotionAnalyzer
+
+    analyzer = SpeechEmotionAnalyzer(cache=None)
+    if decode:
+        pick = _cycle(fixtures.make_wavs(6, seconds=3.0))
+        call = lambda i: analyzer.analyze_bytes(pick(i))  # noqa: E731
+    else:
+        kinds = ("tone", "noise", "mixed")
+        pick = _cycle([fixtures.synth_waveform(3.0, 16000, kinds[i % 3], i) for i in range(6)])
+        call = lambda i: analyzer.analyze_array(pick(i), 16000)  # noqa: E731
+    call(0)
+    try:
+        import soundfile  # noqa: F401
+
+        decoder = "soundfile"
+    except Exception:
+        decoder = "librosa"
+    return call, 1, {"input": "wav bytes" if decode else "array", "decoder": decoder if decode else None}
+
+
+def setup_face(detector: bool) -> Setup:
+    from face_analysis import FaceAnalyzer
+    from face_attributes import AgeEmotionClassifier, build_model
+
+    analyzer = FaceAnalyzer(cache=None)
+    if detector:
+        # Untrained weights cost the same as trained ones; this times the torch attribute head
+        analyzer._attributes = AgeEmotionClassifier("torch", model=build_model(seed=0))
+    else:
+        # Skip MTCNN even when installed: measures decode plus the no-face default
+        analyzer._mtcnn, analyzer._mtcnn_loaded = None, True
+    pick = _cycle(fixtures.make_face_images(6, size=(640, 480)))
+    call = lambda i: analyzer.analyze_bytes(pick(i))  # noqa: E731
+    call(0)
+    analyzer._ensure_mtcnn()
+    return call, 1, {
+        "detector": "mtcnn" if analyzer._mtcnn is not None else "none",
+        "attributes": analyzer._attributes.version.split(":")[0],
+    }
+
+
+def setup_mood(batch: bool) -> Setup:
+    from mood_predictor import MoodPredictor, to_columns
+
+    predictor = MoodPredictor()
+    records = fixtures.make_mood_records(MOOD_BATCH_SIZE * 4)
+    if batch:
+        columns = [to_columns(records[i : i + MOOD_BATCH_SIZE]) for i in range(0, len(records), MOOD_BATCH_SIZE)]
+        pick = _cycle(columns)
+        call = lambda i: predictor.predict_mood_batch(pick(i))  # noqa: E731
+        size = MOOD_BATCH_SIZE
+    else:
+        pick = _cycle(records)
+        call = lambda i: predictor.predict_mood(*pick(i))  # noqa: E731
+        size = 1
+    call(0)
+    return call, size, {"mode": "batch" if batch else "scalar"}
+
+
+def setup_recommender(catalog_items: Optional[int], users: int) -> Setup:
+    from recommender import Recommender
+
+    # None = the shipped catalog; otherwise a synthetic one of that size
+    recommender = Recommender(fixtures.make_catalog(catalog_items) if catalog_items else None)
+    moods = ("energetic", "calm", "stressed", "depressed", "neutral")
+    emotions = ("joy", "sadness", "anger", "fear", None)
+    requests = [(m, e, f"user-{u}" if users else None) for u in range(max(users, 1)) for m in moods for e in emotions]
+    random.Random(0).shuffle(requests)
+    pick = _cycle(requests)
+    call = lambda i: recommender.recommend(*pick(i))  # noqa: E731
+    call(0)
+    return call, 1, {"items": len(recommender.index.ids), "personalized": bool(users)}
+
+
+SCENARIOS: Dict[str, Callable[[], Setup]] = {
+    "text/model": lambda: setup_text(None, batch=False),
+    "text/model-batch": lambda: setup_text(None, batch=True),
+    "text/keywords": lambda: setup_text("keywords", batch=False),
+    "text/keywords-batch": lambda: setup_text("keywords", batch=True),
+    "speech/bytes": lambda: setup_speech(decode=True),
+    "speech/array": lambda: setup_speech(decode=False),
+    "face/detector": lambda: setup_face(detector=True),
+    "face/placeholder": lambda: setup_face(detector=False),
+    "mood/scalar": lambda: setup_mood(batch=False),
+    "mood/batch": lambda: setup_mood(batch=True),
+    "recommender": lambda: setup_recommender(None, users=0),
+    "recommender/personalized": lambda: setup_recommender(None, users=100),
+    "recommender/50k-personalized": lambda: setup_recommender(50000, users=1000),
+}
+
+
+def _percentile(values: List[float], q: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(q / 100.0 * (len(ordered) - 1)))))
+    return ordered[index]
+
+
+def _profile(name: str, call: Callable[[int], Any], calls: int, kind: str, directory: str) -> str:
+    os.makedirs(directory, exist_ok=True)
+    stem = os.path.join(directory, name.replace("/", "_"))
+    if kind == "pyinstrument":
+        from pyinstrument import Profiler  # type: ignore
+
+        profiler = Profiler()
+        profiler.start()
+        for i in range(calls):
+            call(i)
+        profiler.stop()
+        path = stem + ".html"
+        with open(path, "w", encoding="utf-8") as fh:
+            fh.write(profiler.output_html())
+        return path
+    import cProfile
+
+    profiler = cProfile.Profile()
+    profiler.enable()
+    for i in range(calls):
+        call(i)
+    profiler.disable()
+    path = stem + ".prof"
+    profiler.dump_stats(path)
+    return path
+
+
+def measure(name: str, seconds: float, min_calls: int, profile: Optional[str], profile_dir: str) -> Dict[str, Any]:
+    """Runs one scenario in this process; called in a fresh child interpreter by `run_scenario`."""
+    from registry import _rss_bytes
+
+    rss_before = _rss_bytes()
+    start = time.perf_counter()
+    call, size, path = SCENARIOS[name]()
+    setup_seconds = time.perf_counter() - start
+
+    latencies: List[float] = []
+    deadline = time.perf_counter() + seconds
+    i = 1
+    while len(latencies) < min_calls or time.perf_counter() < deadline:
+        t = time.perf_counter()
+        call(i)
+        latencies.append(time.perf_counter() - t)
+        i += 1
+    rss_after = _rss_bytes()
+
+    tracemalloc.start()
+    for j in range(min(len(latencies), 5)):
+        call(i + j)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    report: Dict[str, Any] = {
+        "path": path,
+        "setup_s": setup_seconds,
+        "calls": len(latencies),
+        "items_per_call": size,
+        "p50_ms": _percentile(latencies, 50) * 1000,
+        "p95_ms": _percentile(latencies, 95) * 1000,
+        "mean_ms": sum(latencies) / len(latencies) * 1000,
+        "throughput": len(latencies) * size / sum(latencies),
+        "peak_mib": peak / 2**20,
+        "rss_delta_mib": max(0, rss_after - rss_before) / 2**20,
+    }
+    if profile:
+        report["profile"] = _profile(name, call, max(min_calls, min(len(latencies), 200)), profile, profile_dir)
+    return report
+
+
+def run_scenario(name: str, args: argparse.Namespace) -> Dict[str, Any]:
+    command = [sys.executable, os.path.abspath(__file__), "--worker", name, "--seconds", str(args.seconds)]
+    command += ["--min-calls", str(args.min_calls)]
+    if args.profile:
+        command += ["--profile", args.profile, "--profile-dir", args.profile_dir]
+    proc = subprocess.run(command, capture_output=True, text=True)
+    if proc.returncode != 0:
+        return {"error": proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else "scenario failed"}
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def compare(
+    current: Dict[str, Any],
+    baseline: Dict[str, Any],
+    tolerance: float = DEFAULT_TOLERANCE,
+    noise_ms: float = DEFAULT_NOISE_MS,
+) -> List[str]:
+    """Regressions of `current` against `baseline` (both `--json` reports); scenarios missing from either are skipped."""
+    failures: List[str] = []
+    for name, now in current["scenarios"].items():
+        before = baseline.get("scenarios", {}).get(name)
+        if before is None or "error" in before:
+            continue
+        if "error" in now:
+            failures.append(f"{name}: {now['error']}")
+            continue
+        if now["path"] != before["path"]:
+            failures.append(f"{name}: path changed from {before['path']} to {now['path']}")
+            continue
+        for key in ("p50_ms", "p95_ms"):
+            if now[key] > before[key] * (1 + tolerance) and now[key] - before[key] > noise_ms:
+                failures.append(f"{name}: {key} {now[key]:.3f} > {before[key]:.3f}")
+        if now["throughput"] * (1 + tolerance) < before["throughput"]:
+            failures.append(f"{name}: throughput {now['throughput']:.1f}/s < {before['throughput']:.1f}/s")
+        for key in ("peak_mib", "rss_delta_mib"):
+            # Memory below 1 MiB is dominated by allocator noise
+            if now[key] > max(before[key] * (1 + tolerance), before[key] + 1.0):
+                failures.append(f"{name}: {key} {now[key]:.1f} > {before[key]:.1f}")
+    return failures
+
+
+def _describe(path: Dict[str, Any]) -> str:
+    return ", ".join(f"{key}={value}" for key, value in path.items() if value is not None)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenarios", nargs="+", default=list(SCENARIOS), choices=list(SCENARIOS), metavar="NAME")
+    parser.add_argument("--seconds", type=float, default=2.0, help="measured time per scenario")
+    parser.add_argument("--min-calls", type=int, default=10)
+    parser.add_argument("--quick", action="store_true", help="short run (0.3 s, 3 calls) for smoke tests")
+    parser.add_argument("--json", help="write the report to this file")
+    parser.add_argument("--compare", metavar="BASELINE", help="fail on regressions against this --json report")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    parser.add_argument("--noise-ms", type=float, default=DEFAULT_NOISE_MS)
+    parser.add_argument("--profile", choices=["cprofile", "pyinstrument"])
+    parser.add_argument("--profile-dir", default="profiles")
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.quick:
+        args.seconds, args.min_calls = 0.3, 3
+
+    if args.worker:
+        print(json.dumps(measure(args.worker, args.seconds, args.min_calls, args.profile, args.profile_dir)))
+        return
+
+    report: Dict[str, Any] = {"python": sys.version.split()[0], "created_at": time.time(), "scenarios": {}}
+    print(
+        f"{'scenario':<28} {'setup s':>8} {'p50 ms':>9} {'p95 ms':>9} {'items/s':>10} "
+        f"{'peak MiB':>9} {'RSS MiB':>8}  path"
+    )
+    for name in args.scenarios:
+        result = run_scenario(name, args)
+        report["scenarios"][name] = result
+        if "error" in result:
+            print(f"{name:<28} error: {result['error']}")
+            continue
+        print(
+            f"{name:<28} {result['setup_s']:8.2f} {result['p50_ms']:9.3f} {result['p95_ms']:9.3f} "
+            f"{result['throughput']:10.1f} {result['peak_mib']:9.2f} {result['rss_delta_mib']:8.1f}  "
+            f"{_describe(result['path'])}"
+        )
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as fh:
+            json.dump(report, fh, indent=2)
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as fh:
+            baseline = json.load(fh)
+        failures = compare(report, baseline, args.tolerance, args.noise_ms)
+        for failure in failures:
+            print(f"REGRESSION {failure}")
+        if failures:
+            sys.exit(1)
+        print(f"no regressions against {args.compare}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Compare text emotion backends: load time, RSS, texts/s and label agreement.
+
+Each backend is measured in a fresh subprocess so load time and RSS are not
+skewed by models loaded earlier. Agreement is measured against the fp32
+torch backend's labels.
+
+Usage:
+    python benchmarks/bench_text_backends.py --model-dir models/emotion [--offline]
+        [--backends torch torch-int8 onnx] [--texts 256] [--batch-size 32]
+
+Prepare a local model directory once (needs network):
+    python -c "import sys; sys.path.insert(0, 'src'); from text_analysis import prepare_local_model; prepare_local_model('models/emotion', onnx=True)"
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, "..", "src"))
+sys.path.insert(0, HERE)
+
+from fixtures import make_texts  # noqa: E402
+
+
+def worker(args: argparse.Namespace) -> None:
+    from registry import _rss_bytes
+    from text_analysis import TextAnalyzer
+
+    texts = make_texts(args.texts)
+    rss_before = _rss_bytes()
+    start = time.perf_counter()
+    analyzer = TextAnalyzer(model_path=args.model_dir, offline=args.offline, backend=args.worker)
+    analyzer._ensure_emotion_pipe()
+    load_seconds = time.perf_counter() - start
+    loaded = analyzer._emotion_pipe is not None
+
+    analyzer.analyze_batch(texts[: args.batch_size], batch_size=args.batch_size)  # warm
+    start = time.perf_counter()
+    results = analyzer.analyze_batch(texts, batch_size=args.batch_size)
+    rate = len(texts) / (time.perf_counter() - start)
+    print(
+        json.dumps(
+            {
+                "backend": args.worker,
+                "loaded": loaded,
+                "load_seconds": load_seconds,
+                "rss_mib": max(0, _rss_bytes() - rss_before) / (1024 * 1024),
+                "texts_per_second": rate,
+                "labels": [r["emotion"]["label"] for r in results],
+            }
+        )
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model-dir", default=None, help="local model directory (default: hub id)")
+    parser.add_argument("--offline", action="store_true")
+    parser.add_argument("--backends", nargs="+", default=["torch", "torch-int8", "onnx"])
+    parser.add_argument("--texts", type=int, default=256)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        worker(args)
+        return
+
+    reports = []
+    for backend in args.backends:
+        cmd = [
+            sys.executable, os.path.abspath(__file__), "--worker", backend,
+            "--texts", str(args.texts), "--batch-size", str(args.batch_size),
+        ]
+        if args.model_dir:
+            cmd += ["--model-dir", args.model_dir]
+        if args.offline:
+            cmd.append("--offline")
+        out = subprocess.run(cmd, capture_output=True, text=True, check=True).stdout
+        reports.append(json.loads(out.strip().splitlines()[-1]))
+
+    reference = next((r["labels"] for r in reports if r["backend"] == "torch"), reports[0]["labels"])
+    print(f"{'backend':>11} {'loaded':>6} {'load s':>7} {'RSS MiB':>8} {'texts/s':>9} {'agree':>6}")
+    for r in reports:
+        agree = sum(a == b for a, b in zip(r["labels"], reference)) / len(reference)
+        print(
+            f"{r['backend']:>11} {str(r['loaded']):>6} {r['load_seconds']:7.2f} "
+            f"{r['rss_mib']:8.1f} {r['texts_per_second']:9.1f} {agree:6.1%}"
+        )
+
+
+if __name__ == "__main__":
+    main()
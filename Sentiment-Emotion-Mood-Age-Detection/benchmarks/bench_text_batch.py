@@ -0,0 +1,48 @@
+"""
+Throughput of TextAnalyzer.analyze_batch at several batch sizes.
+
+Usage:
+    python benchmarks/bench_text_batch.py [--texts 512] [--sizes 1 8 32 128]
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from fixtures import make_texts  # noqa: E402
+from text_analysis import TextAnalyzer  # noqa: E402
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--texts", type=int, default=512)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 8, 32, 128])
+    args = parser.parse_args()
+
+    texts = make_texts(args.texts)
+    analyzer = TextAnalyzer()
+    analyzer.warmup()
+
+    start = time.perf_counter()
+    reference = [analyzer.analyze(t) for t in texts]
+    single = len(texts) / (time.perf_counter() - start)
+    print(f"{'single-text loop':>18}: {single:10.1f} texts/s")
+
+    for size in args.sizes:
+        start = time.perf_counter()
+        results = analyzer.analyze_batch(texts, batch_size=size)
+        rate = len(texts) / (time.perf_counter() - start)
+        agree = sum(
+            r["sentiment"]["label"] == ref["sentiment"]["label"]
+            and r["emotion"]["label"] == ref["emotion"]["label"]
+            for r, ref in zip(results, reference)
+        )
+        print(f"{'batch_size=' + str(size):>18}: {rate:10.1f} texts/s  (labels agree {agree}/{len(texts)})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""
+Synthetic, locally generated benchmark inputs: diary-like texts, WAV clips
+and face-like images, plus fused-result records for mood scoring. Everything
+is seeded, so two runs measure the same inputs.
+"""
+from __future__ import annotations
+
+import io
+import random
+import wave
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+_WORDS = (
+    "today i felt really good about work but the commute was terrible and "
+    "i am a little anxious about tomorrow my friend made me laugh we had a "
+    "great dinner then it rained and i was sad for a bit wow what a day"
+).split()
+
+
+def make_texts(n: int, seed: int = 0) -> list[str]:
+    rng = random.Random(seed)
+    return [" ".join(rng.choice(_WORDS) for _ in range(rng.randint(5, 60))) for _ in range(n)]
+
+
+def synth_waveform(seconds: float, sr: int = 16000, kind: str = "tone", seed: int = 0) -> np.ndarray:
+    """Float32 mono clip: a gliding sine ("tone"), white noise ("noise") or both mixed ("mixed")."""
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(seconds * sr)) / sr
+    tone = 0.3 * np.sin(2 * np.pi * (180 + 40 * np.sin(2 * np.pi * 0.5 * t)) * t)
+    noise = 0.1 * rng.standard_normal(t.size)
+    y = {"tone": tone, "noise": noise, "mixed": tone + 0.5 * noise}[kind]
+    return y.astype(np.float32)
+
+
+def encode_wav(y: np.ndarray, sr: int = 16000) -> bytes:
+    pcm = (np.clip(y, -1.0, 1.0) * 32767).astype("<i2")
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(sr)
+        wav.writeframes(pcm.tobytes())
+    return buffer.getvalue()
+
+
+def make_wavs(n: int, seconds: float = 3.0, sr: int = 16000, seed: int = 0) -> List[bytes]:
+    kinds = ("tone", "noise", "mixed")
+    return [encode_wav(synth_waveform(seconds, sr, kinds[i % 3], seed + i), sr) for i in range(n)]
+
+
+def make_face_image(size: Tuple[int, int] = (640, 480), seed: int = 0) -> Any:
+    """
+    A face-like RGB PIL image: skin-toned ellipse with eyes, brows and a mouth
+    on a noisy background. Not a real face, but it exercises decoding,
+    detection and cropping with realistic image statistics.
+    """
+    from PIL import Image, ImageDraw, ImageFilter
+
+    rng = np.random.default_rng(seed)
+    width, height = size
+    background = rng.integers(40, 200, (height // 8, width // 8, 3), dtype=np.uint8)
+    img = Image.fromarray(background).resize(size, Image.BILINEAR)
+    draw = ImageDraw.Draw(img)
+    face_w = int(width * rng.uniform(0.25, 0.4))
+    face_h = int(face_w * 1.3)
+    cx = int(rng.uniform(0.3, 0.7) * width)
+    cy = int(rng.uniform(0.35, 0.65) * height)
+    skin = tuple(int(v) for v in rng.integers([170, 120, 90], [240, 190, 160]))
+    draw.ellipse([cx - face_w // 2, cy - face_h // 2, cx + face_w // 2, cy + face_h // 2], fill=skin)
+    eye_dx, eye_y, eye_r = face_w // 5, cy - face_h // 8, max(2, face_w // 16)
+    for ex in (cx - eye_dx, cx + eye_dx):
+        draw.ellipse([ex - 2 * eye_r, eye_y - eye_r, ex + 2 * eye_r, eye_y + eye_r], fill=(245, 245, 245))
+        draw.ellipse([ex - eye_r, eye_y - eye_r, ex + eye_r, eye_y + eye_r], fill=(40, 30, 20))
+        draw.line([ex - 2 * eye_r, eye_y - 3 * eye_r, ex + 2 * eye_r, eye_y - 3 * eye_r], fill=(60, 40, 30), width=2)
+    draw.line([cx, cy - face_h // 16, cx - face_w // 20, cy + face_h // 10], fill=(150, 100, 80), width=2)
+    mouth_y = cy + face_h // 4
+    draw.arc([cx - face_w // 5, mouth_y - face_h // 12, cx + face_w // 5, mouth_y + face_h // 12], 20, 160, fill=(150, 50, 50), width=3)
+    return img.filter(ImageFilter.GaussianBlur(1))
+
+
+def make_face_images(n: int, size: Tuple[int, int] = (640, 480), fmt: str = "JPEG", seed: int = 0) -> List[bytes]:
+    images = []
+    for i in range(n):
+        buffer = io.BytesIO()
+        make_face_image(size, seed + i).save(buffer, format=fmt)
+        images.append(buffer.getvalue())
+    return images
+
+
+def make_mood_records(
+    n: int, seed: int = 0
+) -> List[Tuple[Optional[Dict[str, Any]], Optional[Dict[str, Any]], Optional[Dict[str, Any]]]]:
+    """(text_result, speech_result, face_result) triples, each modality missing now and then."""
+    rng = random.Random(seed)
+    sentiments = ("positive", "negative", "neutral")
+    emotions = ("joy", "sadness", "anger", "fear", "neutral", "surprise")
+    voices = ("happy", "angry", "fear", "calm", "neutral")
+    faces = ("happy", "sad", "angry", "surprise", "neutral")
+    records = []
+    for _ in range(n):
+        text = None
+        if rng.random() > 0.1:
+            text = {
+                "sentiment": {"label": rng.choice(sentiments), "confidence": rng.random()},
+                "emotion": {"label": rng.choice(emotions), "confidence": rng.random()},
+            }
+        speech = {"label": rng.choice(voices), "confidence": rng.random()} if rng.random() > 0.3 else None
+        face = None
+        if rng.random() > 0.3:
+            face = {"faces": [{"emotion": rng.choice(faces), "emotion_confidence": rng.random()}]}
+        records.append((text, speech, face))
+    return records
+
+
+def make_catalog(n: int, seed: int = 0) -> Dict[str, Any]:
+    """Recommender catalog with `n` items spread over moods, categories and (for a third of them) emotions."""
+    rng = random.Random(seed)
+    moods = ("energetic", "calm", "stressed", "depressed", "neutral")
+    emotions = ("joy", "sadness", "anger", "fear", "surprise", "disgust")
+    categories = ("music_playlists", "motivational_quotes", "relaxation", "study_work_tips")
+    items = []
+    for i in range(n):
+        item: Dict[str, Any] = {
+            "id": f"item/{i}",
+            "category": categories[i % len(categories)],
+            "text": f"{categories[i % len(categories)]} item {i}",
+            "moods": rng.sample(moods, rng.randint(1, 2)),
+            "weight": round(rng.random(), 3),
+        }
+        if rng.random() < 0.33:
+            item["emotions"] = [rng.choice(emotions)]
+        items.append(item)
+    return {"default_mood": "neutral", "limits": {c: 3 for c in categories}, "items": items}
@@ -0,0 +1,144 @@
+"""
+Load test for the inference service using Flask's in-process test client.
+
+Concurrent client threads send requests to one endpoint; the script reports
+throughput, p50/p99 latency, rejected (503) requests and the mean batch size
+the micro-batcher achieved, for each --max-batch-size given (1 = no batching).
+
+Usage:
+    python benchmarks/load_test_service.py [--endpoint text] [--requests 2000] [--concurrency 32]
+        [--max-batch-size 1 32] [--max-wait-ms 5] [--max-queue 256]
+
+Set MOOD_TEXT_BACKEND=keywords to measure the service overhead without a model.
+"""
+from __future__ import annotations
+
+import argparse
+import io
+import os
+import sys
+import threading
+import time
+import wave
+from typing import Any, Dict, List
+
+import numpy as np
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, "..", "src"))
+sys.path.insert(0, HERE)
+
+from fixtures import make_texts  # noqa: E402
+from service import create_app  # noqa: E402
+
+
+def make_requests(endpoint: str, n: int) -> List[Dict[str, Any]]:
+    rng = np.random.default_rng(0)
+    if endpoint == "text":
+        return [{"json": {"text": text}} for text in make_texts(n)]
+    if endpoint == "mood":
+        labels = ("positive", "negative", "neutral")
+        return [
+            {
+                "json": {
+                    "text_result": {
+                        "sentiment": {"label": labels[i % 3], "confidence": float(rng.random())},
+                        "emotion": {"label": "joy", "confidence": float(rng.random())},
+                    },
+                    "speech_result": {"label": "calm", "confidence": float(rng.random())},
+                }
+            }
+            for i in range(n)
+        ]
+    if endpoint == "speech":
+        payloads = []
+        for i in range(8):
+            buffer = io.BytesIO()
+            with wave.open(buffer, "wb") as wav:
+                wav.setnchannels(1)
+                wav.setsampwidth(2)
+                wav.setframerate(16000)
+                wav.writeframes((rng.normal(0, 0.1 * (i + 1), 16000) * 32767).clip(-32768, 32767).astype("<i2").tobytes())
+            payloads.append(buffer.getvalue())
+        return [{"data": payloads[i % len(payloads)]} for i in range(n)]
+    if endpoint == "face":
+        from PIL import Image
+
+        payloads = []
+        for _ in range(8):
+            buffer = io.BytesIO()
+            Image.fromarray(rng.integers(0, 255, (240, 320, 3), dtype=np.uint8)).save(buffer, format="JPEG")
+            payloads.append(buffer.getvalue())
+        return [{"data": payloads[i % len(payloads)]} for i in range(n)]
+    raise ValueError(f"Unknown endpoint '{endpoint}'.")
+
+
+def run(app: Any, endpoint: str, requests: List[Dict[str, Any]], concurrency: int) -> Dict[str, Any]:
+    latencies: List[float] = []
+    statuses: Dict[int, int] = {}
+    lock = threading.Lock()
+    cursor = iter(range(len(requests)))
+
+    def client() -> None:
+        http = app.test_client()
+        while True:
+            with lock:
+                i = next(cursor, None)
+            if i is None:
+                return
+            start = time.perf_counter()
+            response = http.post(f"/{endpoint}", **requests[i])
+            elapsed = time.perf_counter() - start
+            with lock:
+                latencies.append(elapsed)
+                statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+    threads = [threading.Thread(target=client) for _ in range(concurrency)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall = time.perf_counter() - start
+    lat = np.asarray(latencies) * 1000
+    return {
+        "throughput": statuses.get(200, 0) / wall,
+        "p50": float(np.percentile(lat, 50)),
+        "p99": float(np.percentile(lat, 99)),
+        "statuses": statuses,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--endpoint", choices=["text", "speech", "face", "mood"], default="text")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--max-batch-size", type=int, nargs="+", default=[1, 32])
+    parser.add_argument("--max-wait-ms", type=float, default=5.0)
+    parser.add_argument("--max-queue", type=int, default=256)
+    args = parser.parse_args()
+
+    requests = make_requests(args.endpoint, args.requests)
+    print(f"{args.endpoint}: {args.requests} requests, {args.concurrency} clients")
+    print(f"{'batch':>6} {'req/s':>9} {'p50 ms':>8} {'p99 ms':>8} {'mean batch':>11} {'503s':>6}")
+    for size in args.max_batch_size:
+        app = create_app(max_batch_size=size, max_wait_ms=args.max_wait_ms, max_queue=args.max_queue)
+        # Warm the model path outside the measurement
+        run(app, args.endpoint, requests[: args.concurrency], args.concurrency)
+        batcher = app.extensions["mood_batchers"][args.endpoint]
+        before = batcher.stats()
+        report = run(app, args.endpoint, requests, args.concurrency)
+        after = batcher.stats()
+        batches = after.batches - before.batches
+        mean_batch = (after.items - before.items) / batches if batches else 0.0
+        print(
+            f"{size:>6} {report['throughput']:9.1f} {report['p50']:8.2f} {report['p99']:8.2f} "
+            f"{mean_batch:11.1f} {report['statuses'].get(503, 0):>6}"
+        )
+        for b in app.extensions["mood_batchers"].values():
+            b.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,39 +1,51 @@
 from __future__ import annotations
 
-import io
-import os
-import json
-import tempfile
-from datetime import datetime
 from typing import Any, Dict
 
+import pandas as pd
 import streamlit as st
 
-from text_analysis import analyze_text, TextAnalyzer
-from speech_analysis import SpeechEmotionAnalyzer
-from face_analysis import FaceAnalyzer
-from mood_predictor import MoodPredictor
-from recommender import Recommender
+from diary_store import default_store
+from mood_trends import PERIODS
+from orchestrator import default_pipeline
+from registry import get_analyzer, get_registry, preload
+from result_cache import default_cache
 
 
 st.set_page_config(page_title="Multi-Modal Emotion & Age", layout="wide")
 
-if "diary" not in st.session_state:
-    st.session_state.diary = []  # list of entries
+# Models live in a process-wide registry, so this only does work on the first run
+with st.spinner("Loading models… this may download models on first run"):
+    preload()
 
+DIARY_PAGE_SIZE = 20
+TREND_BUCKETS = {"day": 30, "week": 26, "month": 12}
 
-def add_diary_entry(entry: Dict[str, Any]) -> None:
-    st.session_state.diary.append(entry)
+
+def add_diary_entry(user_id: str, entry: Dict[str, Any]) -> None:
+    default_store().append(user_id, entry)
 
 
 st.title("Multi-Modal Sentiment, Emotion, Mood, and Age Detection")
 
 with st.sidebar:
     st.header("Inputs")
+    user_id = st.text_input("User ID", value="default").strip() or "default"
     input_text = st.text_area("Text", placeholder="Type something to analyze…")
     audio_file = st.file_uploader("Speech (WAV/MP3)", type=["wav", "mp3", "ogg"])
     image_file = st.file_uploader("Face Image", type=["jpg", "jpeg", "png"])
     analyze_button = st.button("Analyze")
+    with st.expander("Model load stats"):
+        for stats in get_registry().stats().values():
+            st.caption(
+                f"{stats.name}: {stats.load_seconds:.2f}s, "
+                f"{stats.rss_delta_bytes / (1024 * 1024):.1f} MiB"
+            )
+        cache_stats = default_cache().stats()
+        st.caption(
+            f"result cache: {cache_stats.hits} hits, {cache_stats.misses} misses, "
+            f"{cache_stats.evictions} evictions, {cache_stats.bytes / 1024:.0f} KiB"
+        )
 
 col1, col2, col3 = st.columns(3)
 
@@ -42,36 +54,20 @@ speech_result: Dict[str, float | str] | None = None
 face_result: Dict[str, list[Dict[str, float | int | str]]] | None = None
 
 if analyze_button:
-    with st.spinner("Analyzing… this may download models on first run"):
-        # Text analysis
-        if input_text.strip():
-            text_result = analyze_text(input_text.strip())
-        # Speech analysis
-        if audio_file is not None:
-            try:
-                with tempfile.NamedTemporaryFile(delete=False, suffix="_audio") as tmp:
-                    tmp.write(audio_file.read())
-                    tmp_path = tmp.name
-                speech_result = SpeechEmotionAnalyzer().analyze_file(tmp_path)
-            finally:
-                try:
-                    os.remove(tmp_path)
-                except Exception:
-                    pass
-        # Face analysis
-        if image_file is not None:
-            try:
-                with tempfile.NamedTemporaryFile(delete=False, suffix=".png") as tmp:
-                    tmp.write(image_file.read())
-                    tmp_path = tmp.name
-                face_result = FaceAnalyzer().analyze_image(tmp_path)
-            finally:
-                try:
-                    os.remove(tmp_path)
-                except Exception:
-                    pass
-
-    mood_pred = MoodPredictor().predict_mood(text_result, speech_result, face_result)
+    with st.spinner("Analyzing…"):
+        # Text, speech and face run concurrently; uploads are read straight from their buffers
+        pipeline_result = default_pipeline().run(
+            text=input_text,
+            audio=audio_file.getbuffer() if audio_file is not None else None,
+            image=image_file.getbuffer() if image_file is not None else None,
+        )
+    text_result = pipeline_result.text
+    speech_result = pipeline_result.speech
+    face_result = pipeline_result.face
+    mood_pred = pipeline_result.mood
+    for stage in pipeline_result.stages.values():
+        if stage.status in ("timeout", "error"):
+            st.warning(f"{stage.name} analysis {stage.status}; showing partial results.")
 
     # Determine primary emotion for recommendations
     primary_emotion = "neutral"
@@ -80,7 +76,7 @@ if analyze_button:
     if face_result is not None and face_result.get("faces"):
         primary_emotion = str(face_result["faces"][0].get("emotion", primary_emotion))
 
-    recs = Recommender().recommend(mood_pred.get("mood", "neutral"), primary_emotion)
+    recs = get_analyzer("recommender").recommend(mood_pred.get("mood", "neutral"), primary_emotion, user_id=user_id)
 
     # Display
     with col1:
@@ -95,14 +91,18 @@ if analyze_button:
 
     st.subheader("Mood Prediction")
     st.write(mood_pred)
+    st.caption(
+        "Latency: "
+        + ", ".join(f"{name} {seconds * 1000:.0f} ms" for name, seconds in pipeline_result.timings().items())
+    )
 
     st.subheader("Recommendations")
     st.json(recs)
 
     # Save to diary
     add_diary_entry(
+        user_id,
         {
-            "timestamp": datetime.utcnow().isoformat(),
             "text": input_text,
             "text_result": text_result,
             "speech_result": speech_result,
@@ -115,15 +115,40 @@ if analyze_button:
 st.markdown("---")
 
 st.header("Personal Mood Diary")
-if st.session_state.diary:
-    st.write(f"Entries: {len(st.session_state.diary)}")
-    st.dataframe(st.session_state.diary, use_container_width=True)
-    diary_json = json.dumps(st.session_state.diary, indent=2)
-    st.download_button(
-        label="Download Diary (JSON)",
-        data=io.BytesIO(diary_json.encode("utf-8")),
-        file_name="mood_diary.json",
-        mime="application/json",
+diary = default_store()
+total_entries = diary.count(user_id)
+if total_entries:
+    st.write(f"Entries: {total_entries}")
+    period = st.selectbox("Mood trend", PERIODS)
+    trend = diary.trends(user_id).trend(period, last=TREND_BUCKETS[period])
+    st.line_chart(
+        pd.DataFrame(
+            {"mean score": trend["mean"], "EWMA": trend["ewma"]},
+            index=pd.to_datetime(trend["start"], unit="s"),
+        )
+    )
+    pages = (total_entries + DIARY_PAGE_SIZE - 1) // DIARY_PAGE_SIZE
+    page_number = st.number_input("Page", min_value=1, max_value=pages, value=1, step=1)
+    page = diary.query(user_id, limit=DIARY_PAGE_SIZE, offset=(int(page_number) - 1) * DIARY_PAGE_SIZE)
+    st.dataframe(
+        [
+            {
+                "timestamp": entry["timestamp"],
+                "text": entry.get("text", ""),
+                "mood": (entry.get("mood") or {}).get("mood"),
+                "confidence": (entry.get("mood") or {}).get("confidence"),
+            }
+            for entry in page.entries
+        ],
+        use_container_width=True,
     )
+    # Built only on request; download_button holds the whole payload in memory either way
+    if st.button("Prepare Diary Export (JSON)"):
+        st.download_button(
+            label="Download Diary (JSON)",
+            data=b"".join(diary.export_json(user_id)),
+            file_name=f"mood_diary_{user_id}.json",
+            mime="application/json",
+        )
 else:
-    st.caption("No entries yet. Run an analysis to add one.")
\ No newline at end of file
+    st.caption("No entries yet. Run an analysis to add one.")
@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from registry import get_analyzer
+
+# Concurrent model calls allowed per analyzer; each gets a thread pool of the same size
+DEFAULT_LIMITS: Dict[str, int] = {"text": 2, "speech": 2, "face": 1}
+
+
+class AsyncAnalyzers:
+    """
+    asyncio front end for the registry's analyzers.
+    Model loading, decoding and inference run in one bounded thread pool per
+    analyzer, so the event loop never blocks on torch, librosa or PIL. At most
+    `limits[name]` calls per analyzer run at once; further callers wait on a
+    semaphore and can be cancelled while waiting at no cost. Cancelling a call
+    whose work already started returns immediately, and its slot is freed when
+    the worker thread finishes (a running thread cannot be interrupted).
+    Batched calls check for cancellation between batches.
+    Use one instance per event loop.
+    """
+
+    def __init__(self, limits: Optional[Dict[str, int]] = None) -> None:
+        self.limits = {**DEFAULT_LIMITS, **(limits or {})}
+        self._executors = {
+            name: ThreadPoolExecutor(max_workers=limit, thread_name_prefix=f"async-{name}")
+            for name, limit in self.limits.items()
+        }
+        self._semaphores = {name: asyncio.Semaphore(limit) for name, limit in self.limits.items()}
+
+    async def _run(self, name: str, fn: Callable[..., Any], *args: Any, timeout: Optional[float] = None) -> Any:
+        semaphore = self._semaphores[name]
+        await semaphore.acquire()
+        try:
+            future = asyncio.get_running_loop().run_in_executor(self._executors[name], fn, *args)
+        except BaseException:
+            semaphore.release()
+            raise
+        # The slot is held until the thread is done, even if the caller stops waiting
+        future.add_done_callback(lambda _: semaphore.release())
+        return await asyncio.wait_for(asyncio.shield(future), timeout)
+
+    async def analyze_text(self, text: str, timeout: Optional[float] = None) -> Dict[str, Any]:
+        return await self._run("text", lambda: get_analyzer("text").analyze(text), timeout=timeout)
+
+    async def analyze_texts(
+        self, texts: Sequence[str], batch_size: int = 32, timeout: Optional[float] = None
+    ) -> List[Dict[str, Any]]:
+        """Batched `analyze_text`; each batch is a separate call, so cancellation takes effect between batches."""
+        texts = list(texts)
+        results: List[Dict[str, Any]] = []
+        for i in range(0, len(texts), batch_size):
+            chunk = texts[i : i + batch_size]
+            results.extend(
+                await self._run(
+                    "text", lambda chunk=chunk: get_analyzer("text").analyze_batch(chunk, batch_size), timeout=timeout
+                )
+            )
+        return results
+
+    async def analyze_speech_file(self, audio_path: str, timeout: Optional[float] = None) -> Dict[str, Any]:
+        return await self._run("speech", lambda: get_analyzer("speech").analyze_file(audio_path), timeout=timeout)
+
+    async def analyze_speech_bytes(self, data: bytes, timeout: Optional[float] = None) -> Dict[str, Any]:
+        return await self._run("speech", lambda: get_analyzer("speech").analyze_bytes(data), timeout=timeout)
+
+    async def analyze_face_image(self, image_path: str, timeout: Optional[float] = None) -> Dict[str, Any]:
+        return await self._run("face", lambda: get_analyzer("face").analyze_image(image_path), timeout=timeout)
+
+    async def analyze_face_bytes(self, data: bytes, timeout: Optional[float] = None) -> Dict[str, Any]:
+        return await self._run("face", lambda: get_analyzer("face").analyze_bytes(data), timeout=timeout)
+
+    async def analyze_faces(
+        self, images: Sequence[Any], batch_size: int = 16, timeout: Optional[float] = None
+    ) -> List[Dict[str, Any]]:
+        images = list(images)
+        results: List[Dict[str, Any]] = []
+        for i in range(0, len(images), batch_size):
+            chunk = images[i : i + batch_size]
+            results.extend(
+                await self._run("face", lambda chunk=chunk: get_analyzer("face").analyze_batch(chunk), timeout=timeout)
+            )
+        return results
+
+    def close(self) -> None:
+        for executor in self._executors.values():
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+# One instance per event loop: asyncio semaphores bind to the first loop that waits on them
+_defaults: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, AsyncAnalyzers]" = weakref.WeakKeyDictionary()
+_default_lock = threading.Lock()
+
+
+def default_async_analyzers() -> AsyncAnalyzers:
+    """
+    Instance shared by the module-level helpers within the running event loop
+    (e.g. each `asyncio.run`, or each thread's loop, gets its own).
+    """
+    loop = asyncio.get_running_loop()
+    with _default_lock:
+        # Bound semaphores keep their loop alive, so entries of closed loops are dropped here
+        for closed in [other for other in _defaults if other.is_closed()]:
+            _defaults.pop(closed).close()
+        analyzers = _defaults.get(loop)
+        if analyzers is None:
+            analyzers = _defaults[loop] = AsyncAnalyzers()
+        return analyzers
+
+
+async def analyze_text(text: str, timeout: Optional[float] = None) -> Dict[str, Any]:
+    return await default_async_analyzers().analyze_text(text, timeout=timeout)
+
+
+async def analyze_speech_file(audio_path: str, timeout: Optional[float] = None) -> Dict[str, Any]:
+    return await default_async_analyzers().analyze_speech_file(audio_path, timeout=timeout)
+
+
+async def analyze_face_image(image_path: str, timeout: Optional[float] = None) -> Dict[str, Any]:
+    return await default_async_analyzers().analyze_face_image(image_path, timeout=timeout)
@@ -0,0 +1,194 @@
+from __future__ import annotations
+
+from functools import lru_cache
+from typing import Dict, List, Optional
+
+import numpy as np
+
+# Same framing as librosa's feature defaults
+FRAME_LENGTH = 2048
+HOP_LENGTH = 512
+N_MELS = 128
+
+
+@lru_cache(maxsize=8)
+def hann_window(n: int) -> np.ndarray:
+    """Periodic Hann window (scipy/librosa `get_window("hann", n)`)."""
+    return (0.5 - 0.5 * np.cos(2.0 * np.pi * np.arange(n) / n)).astype(np.float32)
+
+
+def frame_signal(y: np.ndarray, frame_length: int = FRAME_LENGTH, hop_length: int = HOP_LENGTH) -> np.ndarray:
+    """Zero-copy (n_frames, frame_length) view of `y`; trailing samples that do not fill a frame are left out."""
+    if y.shape[-1] < frame_length:
+        return np.empty((0, frame_length), dtype=y.dtype)
+    return np.lib.stride_tricks.sliding_window_view(y, frame_length)[::hop_length]
+
+
+def _sign_changes(y: np.ndarray) -> np.ndarray:
+    # librosa.zero_crossings(threshold=1e-10, zero_pos=True): near-zero samples count as positive
+    signs = np.signbit(np.where(np.abs(y) <= 1e-10, 0.0, y))
+    return signs[..., 1:] != signs[..., :-1]
+
+
+def _centroid(mag: np.ndarray, sr: int) -> np.ndarray:
+    freqs = np.linspace(0.0, sr / 2.0, mag.shape[1])
+    total = mag.sum(axis=1)
+    return np.where(total > np.finfo(np.float32).tiny, mag @ freqs / np.maximum(total, 1e-30), 0.0)
+
+
+def frame_features(frames: np.ndarray, sr: int) -> Dict[str, np.ndarray]:
+    """Per-frame RMS, spectral centroid and zero-crossing rate for already framed audio."""
+    n_frames, frame_length = frames.shape
+    if n_frames == 0:
+        empty = np.zeros(0, dtype=np.float32)
+        return {"rms": empty, "centroid": empty, "zcr": empty}
+
+    rms = np.sqrt(np.mean(np.square(frames, dtype=np.float64), axis=1))
+    mag = np.abs(np.fft.rfft(frames * hann_window(frame_length), axis=1))
+    zcr = np.count_nonzero(_sign_changes(frames), axis=1) / frame_length
+    return {"rms": rms, "centroid": _centroid(mag, sr), "zcr": zcr}
+
+
+def _hz_to_mel(freqs: np.ndarray) -> np.ndarray:
+    # Slaney mel scale (librosa default, htk=False)
+    f_sp = 200.0 / 3
+    min_log_hz = 1000.0
+    min_log_mel = min_log_hz / f_sp
+    logstep = np.log(6.4) / 27.0
+    freqs = np.asarray(freqs, dtype=np.float64)
+    mels = freqs / f_sp
+    log_region = freqs >= min_log_hz
+    mels[log_region] = min_log_mel + np.log(freqs[log_region] / min_log_hz) / logstep
+    return mels
+
+
+def _mel_to_hz(mels: np.ndarray) -> np.ndarray:
+    f_sp = 200.0 / 3
+    min_log_hz = 1000.0
+    min_log_mel = min_log_hz / f_sp
+    logstep = np.log(6.4) / 27.0
+    mels = np.asarray(mels, dtype=np.float64)
+    freqs = f_sp * mels
+    log_region = mels >= min_log_mel
+    freqs[log_region] = min_log_hz * np.exp(logstep * (mels[log_region] - min_log_mel))
+    return freqs
+
+
+@lru_cache(maxsize=8)
+def mel_filterbank(sr: int, n_fft: int = FRAME_LENGTH, n_mels: int = N_MELS) -> np.ndarray:
+    """Slaney-normalized triangular mel filters, shape (n_mels, 1 + n_fft // 2), as in librosa.filters.mel."""
+    fft_freqs = np.linspace(0.0, sr / 2.0, 1 + n_fft // 2)
+    mel_freqs = _mel_to_hz(np.linspace(_hz_to_mel(np.array([0.0]))[0], _hz_to_mel(np.array([sr / 2.0]))[0], n_mels + 2))
+    fdiff = np.diff(mel_freqs)
+    ramps = mel_freqs[:, None] - fft_freqs[None, :]
+    lower = -ramps[:-2] / fdiff[:-1, None]
+    upper = ramps[2:] / fdiff[1:, None]
+    weights = np.maximum(0.0, np.minimum(lower, upper))
+    weights *= (2.0 / (mel_freqs[2 : n_mels + 2] - mel_freqs[:n_mels]))[:, None]
+    return weights.astype(np.float32)
+
+
+@lru_cache(maxsize=8)
+def _dct_matrix(n_out: int, n_in: int) -> np.ndarray:
+    # Orthonormal DCT-II, rows are output coefficients
+    n = np.arange(n_in)
+    k = np.arange(n_out)[:, None]
+    basis = np.cos(np.pi * k * (2 * n + 1) / (2 * n_in)) * np.sqrt(2.0 / n_in)
+    basis[0] /= np.sqrt(2.0)
+    return basis
+
+
+def _pitch(power: np.ndarray, sr: int, fmin: float, fmax: float, voicing: float) -> np.ndarray:
+    """Per-frame f0 from the autocorrelation (inverse FFT of the power spectrum); 0 where unvoiced."""
+    acf = np.fft.irfft(power, axis=1)
+    energy = acf[:, :1]
+    min_lag = max(1, int(sr / fmax))
+    max_lag = min(acf.shape[1] - 2, int(np.ceil(sr / fmin)))
+    if max_lag <= min_lag:
+        return np.zeros(acf.shape[0])
+    segment = acf[:, min_lag : max_lag + 1] / np.maximum(energy, 1e-12)
+    peak = np.argmax(segment, axis=1)
+    strength = segment[np.arange(segment.shape[0]), peak]
+    lag = (peak + min_lag).astype(np.float64)
+    # Parabolic interpolation around the peak for sub-sample lag resolution
+    rows = np.arange(acf.shape[0])
+    idx = peak + min_lag
+    left = acf[rows, idx - 1]
+    mid = acf[rows, idx]
+    right = acf[rows, idx + 1]
+    denom = left - 2.0 * mid + right
+    shift = np.where(np.abs(denom) > 1e-12, 0.5 * (left - right) / np.where(denom == 0, 1.0, denom), 0.0)
+    lag += np.clip(shift, -0.5, 0.5)
+    return np.where(strength >= voicing, sr / lag, 0.0)
+
+
+def extract_features(
+    y: np.ndarray,
+    sr: int,
+    frame_length: int = FRAME_LENGTH,
+    hop_length: int = HOP_LENGTH,
+    center: bool = True,
+    n_mfcc: int = 0,
+    pitch: bool = False,
+    fmin: float = 65.0,
+    fmax: float = 1000.0,
+    voicing_threshold: float = 0.3,
+) -> Dict[str, float | List[float]]:
+    """
+    Clip-level acoustic features computed from a single framing of `y`.
+    The signal is framed once as a strided view and each frame gets one rFFT;
+    RMS, spectral centroid, zero-crossing rate and optionally MFCC means and
+    median pitch are all derived from that. With the defaults the framing
+    matches librosa's (`center=True`, zero padding), so `rms`, `centroid`,
+    `zcr` and `mfcc` agree with the corresponding librosa.feature means.
+    """
+    y = np.asarray(y, dtype=np.float32)
+    feats: Dict[str, float | List[float]] = {}
+    if y.size == 0:
+        feats.update({"rms": 0.0, "centroid": 0.0, "zcr": 0.0})
+        if n_mfcc:
+            feats["mfcc"] = [0.0] * n_mfcc
+        if pitch:
+            feats.update({"pitch": 0.0, "voiced_ratio": 0.0})
+        return feats
+
+    pad = frame_length // 2 if center else 0
+    padded = np.pad(y, pad) if pad else y
+    frames = frame_signal(padded, frame_length, hop_length)
+    if frames.shape[0] == 0:
+        # Shorter than one frame without centering: zero-pad a single frame
+        padded = np.pad(y, (0, frame_length - y.size))
+        frames = frame_signal(padded, frame_length, hop_length)
+    n_frames = frames.shape[0]
+
+    rms = np.sqrt(np.mean(np.square(frames, dtype=np.float64), axis=1))
+    spectrum = np.fft.rfft(frames * hann_window(frame_length), axis=1)
+    mag = np.abs(spectrum)
+
+    # ZCR uses edge padding in librosa, which adds no crossings: count crossings on the
+    # unpadded signal once and sum them per frame with a cumulative sum
+    crossings = np.zeros(padded.shape[0], dtype=np.int64)
+    crossings[pad + 1 : pad + y.size] = _sign_changes(y)
+    cumulative = np.concatenate([[0], np.cumsum(crossings)])
+    starts = np.arange(n_frames) * hop_length
+    zcr = (cumulative[starts + frame_length] - cumulative[starts + 1]) / frame_length
+
+    feats["rms"] = float(np.mean(rms))
+    feats["centroid"] = float(np.mean(_centroid(mag, sr)))
+    feats["zcr"] = float(np.mean(zcr))
+
+    power: Optional[np.ndarray] = None
+    if n_mfcc or pitch:
+        power = np.square(mag)
+    if n_mfcc and power is not None:
+        mel = power @ mel_filterbank(sr, frame_length).T
+        log_mel = 10.0 * np.log10(np.maximum(mel, 1e-10))
+        log_mel = np.maximum(log_mel, log_mel.max() - 80.0)
+        mfcc = log_mel @ _dct_matrix(n_mfcc, log_mel.shape[1]).T
+        feats["mfcc"] = [float(v) for v in mfcc.mean(axis=0)]
+    if pitch and power is not None:
+        f0 = _pitch(power, sr, fmin, fmax, voicing_threshold)
+        voiced = f0 > 0
+        feats["pitch"] = float(np.median(f0[voiced])) if voiced.any() else 0.0
+        feats["voiced_ratio"] = float(voiced.mean())
+    return feats
@@ -0,0 +1,397 @@
+"""
+Offline bulk analysis over directories, JSONL or CSV files.
+
+Inputs are streamed and sent in batches to a process pool; every worker
+loads the models once (registry warmup in the pool initializer). Successful
+results are appended to JSONL or written as Parquet part files as batches
+finish, then the ids of those records and the output's new size are appended
+to `<output>.checkpoint`, so rerunning the same command after a crash skips
+finished records. Output written after the last checkpoint entry (a crash
+between the two writes) is rolled back on the next run, so no record appears
+twice. Failed records go to `<output>.errors.jsonl`, one line per attempt,
+and are retried on the next run.
+
+Usage:
+    python src/batch_runner.py corpus/ entries.jsonl extra.csv --output results.jsonl [--workers 4]
+
+Record sources:
+- directory: every .txt (text), .wav/.mp3/.ogg/.flac (speech) and .jpg/.jpeg/.png (face) file; id = relative path
+- JSONL / CSV: one record per line/row with optional "id" and any of "text", "audio", "image"
+  (audio/image paths are relative to the file); records with several modalities are fused into one mood
+"""
+from __future__ import annotations
+
+import argparse
+import csv
+import json
+import os
+import sys
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
+
+from diary_store import json_default
+
+TEXT_EXTENSIONS = (".txt",)
+AUDIO_EXTENSIONS = (".wav", ".mp3", ".ogg", ".flac")
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png")
+MODALITIES = ("text", "audio", "image")
+
+Record = Dict[str, Any]
+
+
+def iter_records(sources: Sequence[str]) -> Iterator[Record]:
+    """Yields {"id", "text"?, "audio"?, "image"?} records lazily from each source in turn."""
+    for source in sources:
+        if os.path.isdir(source):
+            yield from _directory_records(source)
+        elif source.endswith(".jsonl"):
+            yield from _jsonl_records(source)
+        elif source.endswith(".csv"):
+            yield from _csv_records(source)
+        else:
+            raise ValueError(f"Unsupported input '{source}'; expected a directory, .jsonl or .csv file.")
+
+
+def _directory_records(root: str) -> Iterator[Record]:
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames.sort()
+        for filename in sorted(filenames):
+            path = os.path.join(dirpath, filename)
+            record_id = os.path.relpath(path, root)
+            ext = os.path.splitext(filename)[1].lower()
+            if ext in TEXT_EXTENSIONS:
+                with open(path, "r", encoding="utf-8", errors="replace") as fh:
+                    yield {"id": record_id, "text": fh.read()}
+            elif ext in AUDIO_EXTENSIONS:
+                yield {"id": record_id, "audio": path}
+            elif ext in IMAGE_EXTENSIONS:
+                yield {"id": record_id, "image": path}
+
+
+def _normalize(raw: Dict[str, Any], base_dir: str, fallback_id: str) -> Optional[Record]:
+    record: Record = {"id": str(raw.get("id") or fallback_id)}
+    for key in MODALITIES:
+        value = raw.get(key)
+        if value is None or value == "":
+            continue
+        if key != "text" and not os.path.isabs(value):
+            value = os.path.join(base_dir, value)
+        record[key] = value
+    return record if len(record) > 1 else None
+
+
+def _jsonl_records(path: str) -> Iterator[Record]:
+    base_dir = os.path.dirname(os.path.abspath(path))
+    with open(path, "r", encoding="utf-8") as fh:
+        for line_no, line in enumerate(fh, 1):
+            if not line.strip():
+                continue
+            record = _normalize(json.loads(line), base_dir, f"{os.path.basename(path)}:{line_no}")
+            if record is not None:
+                yield record
+
+
+def _csv_records(path: str) -> Iterator[Record]:
+    base_dir = os.path.dirname(os.path.abspath(path))
+    with open(path, "r", encoding="utf-8", newline="") as fh:
+        for row_no, row in enumerate(csv.DictReader(fh), 1):
+            record = _normalize(row, base_dir, f"{os.path.basename(path)}:{row_no}")
+            if record is not None:
+                yield record
+
+
+def _init_worker(preload_names: Sequence[str], threads: Optional[int]) -> None:
+    if threads:
+        os.environ.setdefault("OMP_NUM_THREADS", str(threads))
+        try:
+            import torch
+
+            torch.set_num_threads(threads)
+        except Exception:
+            pass
+    from registry import preload
+
+    preload(preload_names)
+
+
+def _input_error(path: str) -> Optional[str]:
+    # The analyzers fall back to a neutral result on unreadable files, so check up front
+    if not os.path.isfile(path):
+        return f"FileNotFoundError({path!r})"
+    if not os.access(path, os.R_OK):
+        return f"PermissionError({path!r})"
+    return None
+
+
+def process_batch(records: List[Record]) -> List[Record]:
+    """
+    Analyzes one batch in a worker: texts and images in batched calls, moods
+    with predict_mood_batch. Records whose audio or image file is missing or
+    unreadable get an error for that modality and are not analyzed for it.
+    """
+    from mood_predictor import to_columns
+    from registry import get_analyzer
+
+    outputs: List[Record] = [{"id": r["id"]} for r in records]
+    unreadable: Set[Tuple[int, str]] = set()
+    for i, record in enumerate(records):
+        for key, result_key in (("audio", "speech"), ("image", "face")):
+            error = _input_error(record[key]) if key in record else None
+            if error is not None:
+                outputs[i].setdefault("errors", {})[result_key] = error
+                unreadable.add((i, key))
+
+    def guarded(index: int, key: str, fn: Any) -> None:
+        try:
+            outputs[index][key] = fn()
+        except Exception as exc:
+            outputs[index].setdefault("errors", {})[key] = repr(exc)
+
+    texts = [i for i, r in enumerate(records) if "text" in r]
+    if texts:
+        try:
+            batch = get_analyzer("text").analyze_batch([records[i]["text"] for i in texts])
+            for i, result in zip(texts, batch):
+                outputs[i]["text"] = result
+        except Exception:
+            for i in texts:
+                guarded(i, "text", lambda i=i: get_analyzer("text").analyze(records[i]["text"]))
+
+    for i, record in enumerate(records):
+        if "audio" in record and (i, "audio") not in unreadable:
+            guarded(i, "speech", lambda record=record: get_analyzer("speech").analyze_file(record["audio"]))
+
+    images = [i for i, r in enumerate(records) if "image" in r and (i, "image") not in unreadable]
+    if images:
+        try:
+            batch = get_analyzer("face").analyze_batch([records[i]["image"] for i in images])
+            for i, result in zip(images, batch):
+                outputs[i]["face"] = result
+        except Exception:
+            for i in images:
+                guarded(i, "face", lambda i=i: get_analyzer("face").analyze_image(records[i]["image"]))
+
+    try:
+        columns = to_columns((o.get("text"), o.get("speech"), o.get("face")) for o in outputs)
+        scored = get_analyzer("mood").predict_mood_batch(columns)
+        for output, mood, confidence, score in zip(outputs, scored["mood"], scored["confidence"], scored["score"]):
+            output["mood"] = {"mood": str(mood), "confidence": float(confidence), "score": float(score)}
+    except Exception as exc:
+        for output in outputs:
+            output.setdefault("errors", {})["mood"] = repr(exc)
+    return outputs
+
+
+class _JsonlSink:
+    def __init__(self, path: str) -> None:
+        self._fh = open(path, "a", encoding="utf-8")
+
+    def position(self) -> int:
+        return self._fh.tell()
+
+    def rollback(self, position: int) -> None:
+        """Drops everything written after `position` (bytes)."""
+        self._fh.truncate(position)
+        self._fh.seek(position)
+
+    def write(self, results: List[Record]) -> None:
+        for result in results:
+            self._fh.write(json.dumps(result, default=json_default) + "\n")
+        self._fh.flush()
+        os.fsync(self._fh.fileno())
+
+    def close(self) -> None:
+        self._fh.close()
+
+
+class _ParquetSink:
+    """One part file per written batch under the output directory; readable with pandas.read_parquet(dir)."""
+
+    def __init__(self, path: str) -> None:
+        import pyarrow  # noqa: F401  (fail early if Parquet support is missing)
+
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+        self._part = len([name for name in os.listdir(path) if name.endswith(".parquet")])
+
+    def position(self) -> int:
+        return self._part
+
+    def rollback(self, position: int) -> None:
+        """Deletes part files numbered `position` and above."""
+        for name in os.listdir(self.path):
+            if name.startswith("part-") and (name.endswith(".parquet") or name.endswith(".tmp")):
+                if int(name[len("part-") :].split(".")[0]) >= position:
+                    os.remove(os.path.join(self.path, name))
+        self._part = position
+
+    def write(self, results: List[Record]) -> None:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        rows = [
+            {
+                "id": r["id"],
+                "mood": (r.get("mood") or {}).get("mood"),
+                "mood_score": (r.get("mood") or {}).get("score"),
+                "mood_confidence": (r.get("mood") or {}).get("confidence"),
+                **{key: json.dumps(r[key], default=json_default) if key in r else None for key in ("text", "speech", "face")},
+            }
+            for r in results
+        ]
+        target = os.path.join(self.path, f"part-{self._part:05d}.parquet")
+        pq.write_table(pa.Table.from_pylist(rows), target + ".tmp")
+        os.replace(target + ".tmp", target)
+        self._part += 1
+
+    def close(self) -> None:
+        pass
+
+
+# Checkpoint line that commits the ids above it, followed by the output position (bytes or part count)
+_COMMIT = "#commit\t"
+
+
+def load_checkpoint(path: str) -> Set[str]:
+    return _read_checkpoint(path)[0]
+
+
+def _read_checkpoint(path: str) -> Tuple[Set[str], Optional[int]]:
+    """Committed ids and the output position of the last commit; ids after it (a torn write) are ignored."""
+    committed: Set[str] = set()
+    position: Optional[int] = None
+    if not os.path.exists(path):
+        return committed, position
+    pending: List[str] = []
+    with open(path, "r", encoding="utf-8") as fh:
+        for raw in fh:
+            line = raw.rstrip("\n")
+            if line.startswith(_COMMIT):
+                if not raw.endswith("\n"):
+                    break  # torn commit line
+                position = int(line[len(_COMMIT) :])
+                committed.update(pending)
+                pending = []
+            elif line.strip():
+                pending.append(line)
+    if position is None:
+        # Checkpoint from before commit lines existed: every id counts
+        committed.update(pending)
+    return committed, position
+
+
+def _commit(checkpoint: Any, ids: Iterable[str], position: int) -> None:
+    checkpoint.write("".join(record_id + "\n" for record_id in ids) + f"{_COMMIT}{position}\n")
+    checkpoint.flush()
+    os.fsync(checkpoint.fileno())
+
+
+def _batches(records: Iterable[Record], size: int) -> Iterator[List[Record]]:
+    batch: List[Record] = []
+    for record in records:
+        batch.append(record)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def run(
+    sources: Sequence[str],
+    output: str,
+    output_format: Optional[str] = None,
+    workers: int = 2,
+    batch_size: int = 16,
+    threads_per_worker: Optional[int] = 1,
+    preload_names: Sequence[str] = ("text", "speech", "face", "mood"),
+    progress: bool = True,
+) -> Dict[str, int]:
+    """Processes every not-yet-checkpointed record; returns counts of done / skipped / failed records."""
+    from tqdm import tqdm
+
+    output_format = output_format or ("parquet" if output.endswith(".parquet") else "jsonl")
+    checkpoint_path = output.rstrip(os.sep) + ".checkpoint"
+    completed, position = _read_checkpoint(checkpoint_path)
+    sink = _ParquetSink(output) if output_format == "parquet" else _JsonlSink(output)
+    if position is not None and sink.position() > position:
+        # Results written after the last commit are redone rather than kept twice
+        sink.rollback(position)
+    errors = _JsonlSink(output.rstrip(os.sep) + ".errors.jsonl")
+    counts = {"done": 0, "skipped": 0, "failed": 0}
+
+    def pending_records() -> Iterator[Record]:
+        for record in iter_records(sources):
+            if record["id"] in completed:
+                counts["skipped"] += 1
+                continue
+            yield record
+
+    max_in_flight = max(1, workers) * 2
+    bar = tqdm(unit="rec", dynamic_ncols=True, disable=not progress)
+    with open(checkpoint_path, "a", encoding="utf-8") as checkpoint, ProcessPoolExecutor(
+        max_workers=workers, initializer=_init_worker, initargs=(tuple(preload_names), threads_per_worker)
+    ) as pool:
+        if position is None:
+            # Start of the commit log: anything past the current output end is uncommitted
+            _commit(checkpoint, (), sink.position())
+        in_flight: Set[Future] = set()
+        batches = _batches(pending_records(), batch_size)
+
+        def drain(return_when: str) -> None:
+            done, _ = wait(in_flight, return_when=return_when)
+            for future in done:
+                in_flight.discard(future)
+                results = future.result()
+                ok = [r for r in results if "errors" not in r]
+                failed = [r for r in results if "errors" in r]
+                if failed:
+                    errors.write(failed)
+                if ok:
+                    sink.write(ok)
+                    _commit(checkpoint, (r["id"] for r in ok), sink.position())
+                counts["done"] += len(ok)
+                counts["failed"] += len(failed)
+                bar.update(len(results))
+                bar.set_postfix(failed=counts["failed"], skipped=counts["skipped"])
+
+        # Only a bounded number of batches is read ahead, so inputs are never fully materialized
+        for batch in batches:
+            in_flight.add(pool.submit(process_batch, batch))
+            if len(in_flight) >= max_in_flight:
+                drain(FIRST_COMPLETED)
+        while in_flight:
+            drain(FIRST_COMPLETED)
+    bar.close()
+    sink.close()
+    errors.close()
+    return counts
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("inputs", nargs="+", help="directories, .jsonl or .csv files")
+    parser.add_argument("--output", required=True, help="results .jsonl file, or a .parquet directory")
+    parser.add_argument("--format", choices=["jsonl", "parquet"], help="default: from the output name")
+    parser.add_argument("--workers", type=int, default=max(1, (os.cpu_count() or 2) // 2))
+    parser.add_argument("--batch-size", type=int, default=16)
+    parser.add_argument("--threads-per-worker", type=int, default=1, help="torch/OpenMP threads per worker")
+    parser.add_argument("--preload", nargs="+", default=["text", "speech", "face", "mood"], help="models to load per worker")
+    parser.add_argument("--no-progress", action="store_true")
+    args = parser.parse_args(argv)
+
+    counts = run(
+        args.inputs,
+        args.output,
+        output_format=args.format,
+        workers=args.workers,
+        batch_size=args.batch_size,
+        threads_per_worker=args.threads_per_worker,
+        preload_names=args.preload,
+        progress=not args.no_progress,
+    )
+    print(f"done {counts['done']}, skipped {counts['skipped']}, failed {counts['failed']}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
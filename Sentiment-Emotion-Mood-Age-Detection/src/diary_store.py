@@ -0,0 +1,296 @@
+from __future__ import annotations
+
+import json
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import TYPE_CHECKING, Any, BinaryIO, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+if TYPE_CHECKING:
+    from mood_trends import MoodTrends
+
+Timestamp = Union[float, str, datetime]  # epoch seconds, ISO string or datetime (naive = UTC)
+Cursor = Tuple[float, int]  # (created_at, id) of the last entry on a page
+
+_SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS entries ("
+    "id INTEGER PRIMARY KEY AUTOINCREMENT, "
+    "user_id TEXT NOT NULL, "
+    "created_at REAL NOT NULL, "
+    "mood TEXT, "
+    "score REAL, "
+    "confidence REAL, "
+    "payload TEXT NOT NULL)",
+    "CREATE INDEX IF NOT EXISTS entries_user_time ON entries (user_id, created_at, id)",
+    "CREATE INDEX IF NOT EXISTS entries_time ON entries (created_at)",
+    "CREATE TABLE IF NOT EXISTS trends (user_id TEXT PRIMARY KEY, version INTEGER NOT NULL, state BLOB NOT NULL)",
+)
+_INSERT = "INSERT INTO entries (user_id, created_at, mood, score, confidence, payload) VALUES (?, ?, ?, ?, ?, ?)"
+
+
+@dataclass
+class DiaryPage:
+    entries: List[Dict[str, Any]]
+    next_cursor: Optional[Cursor]  # pass back to `query` for the next (older) page; None at the end
+
+
+class DiaryStore:
+    """
+    Persistent mood diary backed by SQLite in WAL mode.
+    Entries are appended one row at a time and indexed by (user, time), so
+    pages are read with a keyset cursor without scanning older entries.
+    Mood label, score and confidence are kept in their own columns; the full
+    entry is stored as JSON. Each thread gets its own connection; with
+    `path=":memory:"` that means each thread also gets its own private
+    database, which suits tests but not a shared store.
+    Per-user MoodTrends aggregates are updated in the same transaction as
+    each append, so trend queries never rescan the entries.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._local = threading.local()
+        self._schema_lock = threading.Lock()
+        self._schema_ready = False
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30.0)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            with self._schema_lock:
+                # Every ":memory:" connection is a new empty database and needs the schema
+                if not self._schema_ready or self.path == ":memory:":
+                    for statement in _SCHEMA:
+                        conn.execute(statement)
+                    conn.commit()
+                    self._schema_ready = True
+            self._local.conn = conn
+        return conn
+
+    def append(self, user_id: str, entry: Dict[str, Any], timestamp: Optional[Timestamp] = None) -> int:
+        """Stores one entry (an app diary dict with a "mood" result) and returns its id."""
+        row = _row(user_id, entry, timestamp)
+        conn = self._conn()
+        with conn:
+            cur = conn.execute(_INSERT, row)
+            self._update_trends(conn, user_id, [(row[1], row[2], row[3])])
+        return int(cur.lastrowid)
+
+    def append_many(self, user_id: str, entries: Iterable[Dict[str, Any]]) -> int:
+        """Bulk import in one transaction; entries may carry their own "timestamp"."""
+        rows = [_row(user_id, entry, entry.get("timestamp")) for entry in entries]
+        conn = self._conn()
+        with conn:
+            conn.executemany(_INSERT, rows)
+            self._update_trends(conn, user_id, [(row[1], row[2], row[3]) for row in rows])
+        return len(rows)
+
+    def count(self, user_id: str) -> int:
+        row = self._conn().execute("SELECT COUNT(*) FROM entries WHERE user_id = ?", (user_id,)).fetchone()
+        return int(row[0])
+
+    def query(
+        self,
+        user_id: str,
+        limit: int = 50,
+        cursor: Optional[Cursor] = None,
+        offset: int = 0,
+        start: Optional[Timestamp] = None,
+        end: Optional[Timestamp] = None,
+    ) -> DiaryPage:
+        """
+        Newest-first page of a user's entries, optionally within [start, end).
+        Prefer `cursor` (from the previous page) over `offset` for deep pages.
+        """
+        sql = "SELECT id, created_at, payload FROM entries WHERE user_id = ?"
+        params: List[Any] = [user_id]
+        if cursor is not None:
+            sql += " AND (created_at < ? OR (created_at = ? AND id < ?))"
+            params += [cursor[0], cursor[0], cursor[1]]
+        if start is not None:
+            sql += " AND created_at >= ?"
+            params.append(_epoch(start))
+        if end is not None:
+            sql += " AND created_at < ?"
+            params.append(_epoch(end))
+        sql += " ORDER BY created_at DESC, id DESC LIMIT ? OFFSET ?"
+        params += [limit, offset]
+        rows = self._conn().execute(sql, params).fetchall()
+        entries = [_decode(row) for row in rows]
+        next_cursor = (rows[-1][1], rows[-1][0]) if len(rows) == limit else None
+        return DiaryPage(entries=entries, next_cursor=next_cursor)
+
+    def iter_entries(
+        self,
+        user_id: str,
+        batch_size: int = 500,
+        start: Optional[Timestamp] = None,
+        end: Optional[Timestamp] = None,
+    ) -> Iterator[Dict[str, Any]]:
+        """All matching entries, newest first, fetched `batch_size` rows at a time."""
+        cursor: Optional[Cursor] = None
+        while True:
+            page = self.query(user_id, limit=batch_size, cursor=cursor, start=start, end=end)
+            yield from page.entries
+            if page.next_cursor is None:
+                return
+            cursor = page.next_cursor
+
+    def export_json(self, user_id: str, chunk_size: int = 500) -> Iterator[bytes]:
+        """
+        Streams the user's diary as a JSON array, one encoded chunk of up to
+        `chunk_size` entries at a time, so memory does not grow with the diary.
+        """
+        yield b"["
+        first = True
+        batch: List[str] = []
+        for entry in self.iter_entries(user_id, batch_size=chunk_size):
+            batch.append(json.dumps(entry, default=json_default))
+            if len(batch) >= chunk_size:
+                yield (("" if first else ",\n") + ",\n".join(batch)).encode("utf-8")
+                first = False
+                batch = []
+        if batch:
+            yield (("" if first else ",\n") + ",\n".join(batch)).encode("utf-8")
+        yield b"]"
+
+    def export_to(self, fp: BinaryIO, user_id: str, chunk_size: int = 500) -> None:
+        for chunk in self.export_json(user_id, chunk_size):
+            fp.write(chunk)
+
+    def trends(self, user_id: str) -> MoodTrends:
+        """
+        The user's mood aggregates. Diaries written before aggregates existed
+        are scanned once and the result is stored.
+        """
+        from mood_trends import MoodTrends
+
+        conn = self._conn()
+        trends = _load_trends(conn, user_id)
+        if trends is not None:
+            return trends
+        with conn:
+            # The entries insert of a concurrent append takes the write lock first,
+            # so re-check inside the transaction before rebuilding
+            conn.execute("DELETE FROM trends WHERE user_id = ? AND version != ?", (user_id, MoodTrends.VERSION))
+            trends = _load_trends(conn, user_id)
+            if trends is None:
+                trends = MoodTrends()
+                trends.add_many(
+                    conn.execute(
+                        "SELECT created_at, mood, score FROM entries WHERE user_id = ? ORDER BY created_at, id",
+                        (user_id,),
+                    )
+                )
+                _save_trends(conn, user_id, trends)
+        return trends
+
+    def delete_user(self, user_id: str) -> int:
+        conn = self._conn()
+        with conn:
+            cur = conn.execute("DELETE FROM entries WHERE user_id = ?", (user_id,))
+            conn.execute("DELETE FROM trends WHERE user_id = ?", (user_id,))
+        return cur.rowcount
+
+    def _update_trends(self, conn: sqlite3.Connection, user_id: str, rows: List[Tuple[float, Any, Any]]) -> None:
+        # Runs inside the append transaction, after the entries insert took the write lock
+        from mood_trends import MoodTrends
+
+        trends = _load_trends(conn, user_id)
+        if trends is None:
+            # First entry for the user, or a diary that predates aggregates: the rebuild
+            # reads the rows just inserted as well
+            trends = MoodTrends()
+            rows = list(
+                conn.execute(
+                    "SELECT created_at, mood, score FROM entries WHERE user_id = ? ORDER BY created_at, id",
+                    (user_id,),
+                )
+            )
+        trends.add_many(rows)
+        _save_trends(conn, user_id, trends)
+
+    def close(self) -> None:
+        """Closes the calling thread's connection."""
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+
+def _epoch(value: Optional[Timestamp]) -> float:
+    if value is None:
+        return time.time()
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return value.timestamp()
+    if isinstance(value, str):
+        return _epoch(datetime.fromisoformat(value))
+    return float(value)
+
+
+def _row(user_id: str, entry: Dict[str, Any], timestamp: Optional[Timestamp]) -> Tuple[Any, ...]:
+    mood = entry.get("mood") or {}
+    payload = {k: v for k, v in entry.items() if k not in ("id", "user_id", "timestamp")}
+    return (
+        user_id,
+        _epoch(timestamp),
+        mood.get("mood"),
+        mood.get("score"),
+        mood.get("confidence"),
+        json.dumps(payload, default=json_default),
+    )
+
+
+def _decode(row: Tuple[int, float, str]) -> Dict[str, Any]:
+    entry_id, created_at, payload = row
+    entry = {"id": entry_id, "timestamp": datetime.fromtimestamp(created_at, tz=timezone.utc).isoformat()}
+    entry.update(json.loads(payload))
+    return entry
+
+
+def _load_trends(conn: sqlite3.Connection, user_id: str) -> Optional[MoodTrends]:
+    from mood_trends import MoodTrends
+
+    row = conn.execute("SELECT version, state FROM trends WHERE user_id = ?", (user_id,)).fetchone()
+    if row is None or row[0] != MoodTrends.VERSION:
+        return None
+    return pickle.loads(row[1])
+
+
+def _save_trends(conn: sqlite3.Connection, user_id: str, trends: MoodTrends) -> None:
+    from mood_trends import MoodTrends
+
+    conn.execute(
+        "INSERT OR REPLACE INTO trends (user_id, version, state) VALUES (?, ?, ?)",
+        (user_id, MoodTrends.VERSION, pickle.dumps(trends, protocol=pickle.HIGHEST_PROTOCOL)),
+    )
+
+
+def json_default(value: Any) -> Any:
+    """`json.dumps` default for analyzer results: NumPy scalars/arrays become lists or numbers."""
+    if hasattr(value, "tolist"):
+        return value.tolist()
+    return str(value)
+
+
+_default_store: Optional[DiaryStore] = None
+_default_lock = threading.Lock()
+
+
+def default_store() -> DiaryStore:
+    """Process-wide diary store at MOOD_DIARY_DB (default data/mood_diary.sqlite)."""
+    global _default_store
+    with _default_lock:
+        if _default_store is None:
+            _default_store = DiaryStore(os.environ.get("MOOD_DIARY_DB", os.path.join("data", "mood_diary.sqlite")))
+        return _default_store
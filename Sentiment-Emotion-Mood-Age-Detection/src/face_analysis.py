@@ -1,14 +1,31 @@
 from __future__ import annotations
 
+import io
+import threading
 from dataclasses import dataclass
-from typing import Dict, List, Optional, Tuple
+from typing import TYPE_CHECKING, Any, BinaryIO, Dict, List, Optional, Sequence, Tuple, Union
 
-import numpy as np
+from face_attributes import EMOTION_LABELS, PLACEHOLDER_PREDICTION, AgeEmotionClassifier
+from metrics import record_path, stage
+from result_cache import as_buffer
 
-try:
-    from PIL import Image
-except Exception:  # Pillow might not be installed in some envs
-    Image = None  # type: ignore
+if TYPE_CHECKING:
+    import numpy as np
+
+    from result_cache import ResultCache
+
+
+ImageBytes = Union[bytes, bytearray, memoryview, BinaryIO]
+ImageInput = Union[str, bytes, bytearray, memoryview, BinaryIO, "np.ndarray", Any]
+
+
+def _pil_image() -> Any:
+    """PIL.Image, imported on first use so importing this module stays cheap; None without Pillow."""
+    try:
+        from PIL import Image
+    except Exception:  # Pillow might not be installed in some envs
+        return None
+    return Image
 
 
 @dataclass
@@ -23,66 +40,374 @@ class FaceResult:
 
 class FaceAnalyzer:
     """
-    Detects faces and provides placeholder age and emotion estimates.
-    Uses MTCNN for detection if available.
+    Detects faces and estimates age and emotion for each of them.
+    Uses MTCNN for detection if available; age/emotion come from a pluggable
+    head (`attribute_backend`: "placeholder", "torch" or "onnxruntime", see
+    face_attributes.py) that scores all crops of an image in one pass.
+    Detection runs on a copy downscaled so its longer side is at most
+    `max_detection_side` (None disables downscaling); boxes are mapped back to
+    original coordinates and face crops for the age/emotion stage are cut from
+    the full-resolution image. `min_face_size` and `scale_factor` set the
+    MTCNN image pyramid and are expressed in detection-resolution pixels.
     """
 
-    def __init__(self, device: str = "cpu") -> None:
+    def __init__(
+        self,
+        device: str = "cpu",
+        cache: Optional["ResultCache"] = None,
+        max_detection_side: Optional[int] = 1280,
+        min_face_size: int = 20,
+        scale_factor: float = 0.709,
+        attribute_backend: str = "placeholder",
+        attribute_model_path: Optional[str] = None,
+        attribute_threads: Optional[int] = None,
+    ) -> None:
         self.device = device
+        self._cache = cache
+        self.max_detection_side = max_detection_side
+        self.min_face_size = min_face_size
+        self.scale_factor = scale_factor
+        self._attributes = AgeEmotionClassifier(attribute_backend, attribute_model_path, attribute_threads)
         self._mtcnn: Optional[object] = None
+        # Attempt the MTCNN load once; a missing dependency should not be retried per request
+        self._mtcnn_loaded = False
+        self._load_lock = threading.Lock()
 
-    def _ensure_mtcnn(self) -> None:
-        if self._mtcnn is not None:
+    def warmup(self) -> None:
+        """
+        Load MTCNN and the age/emotion head eagerly and run each once on a tiny
+        blank image, decoded from PNG and JPEG so the codecs are loaded too.
+        """
+        self._ensure_mtcnn()
+        Image = _pil_image()
+        if Image is None:
+            return
+        blank = Image.new("RGB", (64, 64))
+        for fmt in ("PNG", "JPEG"):
+            try:
+                encoded = io.BytesIO()
+                blank.save(encoded, format=fmt)
+                encoded.seek(0)
+                blank = self._open_image(encoded)
+            except Exception:
+                pass
+        self._attributes.predict([blank])
+        if self._mtcnn is None:
             return
         try:
-            from facenet_pytorch import MTCNN  # type: ignore
-            self._mtcnn = MTCNN(keep_all=True, device=self.device)
+            self._mtcnn.detect(blank)
         except Exception:
-            self._mtcnn = None
+            pass
 
-    def _open_image(self, image_path: str):
+    def _ensure_mtcnn(self) -> None:
+        if self._mtcnn_loaded:
+            return
+        with self._load_lock:
+            if self._mtcnn_loaded:
+                return
+            with stage("face", "load"):
+                try:
+                    from facenet_pytorch import MTCNN  # type: ignore
+                    self._mtcnn = MTCNN(
+                        keep_all=True,
+                        device=self.device,
+                        min_face_size=self.min_face_size,
+                        factor=self.scale_factor,
+                    )
+                except Exception:
+                    self._mtcnn = None
+            self._mtcnn_loaded = True
+
+    def _open_image(self, source: Union[str, BinaryIO]):
+        Image = _pil_image()
         if Image is None:
             raise RuntimeError("Pillow is not available.")
-        return Image.open(image_path).convert("RGB")
+        with stage("face", "decode"):
+            return Image.open(source).convert("RGB")
 
     def _placeholder_age_emotion(self) -> Tuple[int, float, str, float]:
-        # Placeholder values; integrate a trained model later
-        return 30, 0.35, "neutral", 0.5
+        # Used for the default face when nothing was detected
+        return PLACEHOLDER_PREDICTION
 
-    def analyze_image(self, image_path: str) -> Dict[str, List[Dict[str, float | int | str]]]:
+    def cache_namespace(self) -> str:
         self._ensure_mtcnn()
+        detector = "mtcnn" if self._mtcnn is not None else "none"
+        return (
+            f"face:v2:{detector}:side={self.max_detection_side}:"
+            f"min={self.min_face_size}:factor={self.scale_factor}:{self._attributes.version}"
+        )
+
+    def analyze_image(self, image_path: str) -> Dict[str, List[Dict[str, float | int | str]]]:
+        if self._cache is not None:
+            try:
+                with open(image_path, "rb") as fh:
+                    data = fh.read()
+            except Exception:
+                return {"faces": []}
+            return self.analyze_bytes(data)
+        return self._analyze_source(image_path)
+
+    def analyze_bytes(self, data: ImageBytes) -> Dict[str, List[Dict[str, float | int | str]]]:
+        """
+        Analyzes an encoded image (JPEG/PNG) held in memory: bytes, a memoryview,
+        or a file-like object such as an upload buffer.
+        """
+        payload = as_buffer(data)
+        if self._cache is not None:
+            return self._cache.get_or_compute(
+                self.cache_namespace(), payload, lambda: self._analyze_source(io.BytesIO(payload))
+            )
+        return self._analyze_source(io.BytesIO(payload))
+
+    def analyze_array(self, array: np.ndarray) -> Dict[str, List[Dict[str, float | int | str]]]:
+        """Analyzes a decoded RGB image given as an HxWx3 (or HxW grayscale) uint8 array."""
+        import numpy as np
+
         try:
-            img = self._open_image(image_path)
+            Image = _pil_image()
+            if Image is None:
+                raise RuntimeError("Pillow is not available.")
+            img = Image.fromarray(np.ascontiguousarray(array, dtype=np.uint8)).convert("RGB")
         except Exception:
             return {"faces": []}
+        return self._analyze_pil(img)
 
-        faces: List[FaceResult] = []
-        if self._mtcnn is not None:
+    def analyze_batch(
+        self, images: Sequence[ImageInput]
+    ) -> List[Dict[str, List[Dict[str, float | int | str]]]]:
+        """
+        Analyzes several images with batched MTCNN detection; results match
+        `analyze_image` per image. Images may be paths, encoded bytes, file-like
+        objects, RGB arrays or PIL images. Same-sized images share one
+        `detect` call.
+        """
+        images = list(images)
+        results: List[Optional[Dict[str, List[Dict[str, float | int | str]]]]] = [None] * len(images)
+        keys: List[Optional[str]] = [None] * len(images)
+        if self._cache is not None:
+            namespace = self.cache_namespace()
+            for i, item in enumerate(images):
+                payload = _cacheable_payload(item)
+                if payload is not None:
+                    # Decode from the bytes already read for hashing
+                    images[i] = payload
+                    keys[i] = self._cache.make_key(namespace, payload)
+                    results[i] = self._cache.get(keys[i])
+
+        pending: List[int] = []
+        decoded = []
+        for i, item in enumerate(images):
+            if results[i] is not None:
+                continue
             try:
-                boxes, probs = self._mtcnn.detect(img)
-                if boxes is None or probs is None:
-                    boxes = []
-                    probs = []
-                for box, prob in zip(boxes, probs):
-                    if box is None or prob is None:
-                        continue
-                    x1, y1, x2, y2 = [int(v) for v in box]
-                    age, age_conf, emotion, emo_conf = self._placeholder_age_emotion()
-                    faces.append(
-                        FaceResult(
-                            box=(x1, y1, x2, y2),
-                            probability=float(prob),
-                            age=age,
-                            age_confidence=age_conf,
-                            emotion=emotion,
-                            emotion_confidence=emo_conf,
-                        )
-                    )
+                decoded.append(self._to_pil(item))
+                pending.append(i)
             except Exception:
-                pass
+                results[i] = {"faces": []}
+
+        for i, img, detection in zip(pending, decoded, self._detect_batch(decoded)):
+            results[i] = _to_dict(self._faces_from_detection(img, *detection, keep_default=True))
+            if keys[i] is not None and self._cache is not None:
+                self._cache.set(keys[i], results[i])
+        return results  # type: ignore[return-value]
+
+    def analyze_video(
+        self,
+        video_path: str,
+        stride: int = 1,
+        batch_size: int = 16,
+        dedup_distance: int = 4,
+    ) -> Dict[str, object]:
+        """
+        Analyzes every `stride`-th frame of a video with batched detection.
+        A frame whose perceptual hash is within `dedup_distance` bits of the last
+        analyzed frame reuses that frame's faces instead of being detected again.
+        Returns compact per-face arrays; `face_frames` holds the frame number of
+        each row and `emotions` indexes into `emotion_labels`. Raises
+        RuntimeError without OpenCV or Pillow and ValueError when the video
+        cannot be opened, so an empty result always means "no faces found".
+        """
+        import numpy as np
+
+        Image = _pil_image()
+        frame_indices: List[int] = []
+        source_frames: List[int] = []
+        per_frame: Dict[int, List[FaceResult]] = {}
+
+        try:
+            import cv2  # type: ignore
+        except Exception as exc:
+            raise RuntimeError("OpenCV (cv2) is required for video analysis.") from exc
+        if Image is None:
+            raise RuntimeError("Pillow is not available.")
+        capture = cv2.VideoCapture(video_path)
+        if not capture.isOpened():
+            raise ValueError(f"Could not open video {video_path!r}.")
+        try:
+            fps = float(capture.get(cv2.CAP_PROP_FPS) or 0.0)
+            batch: List[Tuple[int, object]] = []
+            last_hash: Optional[int] = None
+            last_source = -1
+            frame_no = -1
+            stride = max(1, int(stride))
+            while True:
+                ok, frame = capture.read()
+                if not ok:
+                    break
+                frame_no += 1
+                if frame_no % stride:
+                    continue
+                img = Image.fromarray(np.ascontiguousarray(frame[:, :, ::-1]))  # BGR -> RGB
+                frame_hash = _dhash(img)
+                frame_indices.append(frame_no)
+                if last_hash is not None and _hamming(frame_hash, last_hash) <= dedup_distance:
+                    source_frames.append(last_source)
+                    continue
+                last_hash, last_source = frame_hash, frame_no
+                source_frames.append(frame_no)
+                batch.append((frame_no, img))
+                if len(batch) >= batch_size:
+                    self._analyze_video_batch(batch, per_frame)
+                    batch = []
+            if batch:
+                self._analyze_video_batch(batch, per_frame)
+        finally:
+            capture.release()
+
+        rows = [(frame_no, face) for frame_no, src in zip(frame_indices, source_frames) for face in per_frame.get(src, [])]
+        label_index = {label: i for i, label in enumerate(EMOTION_LABELS)}
+        return {
+            "fps": fps,
+            "frame_indices": np.asarray(frame_indices, dtype=np.int32),
+            "source_frames": np.asarray(source_frames, dtype=np.int32),
+            "face_frames": np.asarray([frame_no for frame_no, _ in rows], dtype=np.int32),
+            "boxes": np.asarray([face.box for _, face in rows], dtype=np.int32).reshape(-1, 4),
+            "probabilities": np.asarray([face.probability for _, face in rows], dtype=np.float32),
+            "ages": np.asarray([face.age for _, face in rows], dtype=np.int16),
+            "age_confidences": np.asarray([face.age_confidence for _, face in rows], dtype=np.float32),
+            "emotions": np.asarray([label_index.get(face.emotion, 0) for _, face in rows], dtype=np.uint8),
+            "emotion_confidences": np.asarray([face.emotion_confidence for _, face in rows], dtype=np.float32),
+            "emotion_labels": list(EMOTION_LABELS),
+        }
+
+    def _analyze_video_batch(self, batch: List[Tuple[int, object]], per_frame: Dict[int, List[FaceResult]]) -> None:
+        images = [img for _, img in batch]
+        for (frame_no, img), detection in zip(batch, self._detect_batch(images)):
+            per_frame[frame_no] = self._faces_from_detection(img, *detection, keep_default=False)
+
+    def _to_pil(self, item: ImageInput):
+        Image = _pil_image()
+        if Image is None:
+            raise RuntimeError("Pillow is not available.")
+        if isinstance(item, Image.Image):
+            return item.convert("RGB")
+        if hasattr(item, "__array_interface__"):
+            import numpy as np
+
+            return Image.fromarray(np.ascontiguousarray(item, dtype=np.uint8)).convert("RGB")
+        if isinstance(item, (bytes, bytearray, memoryview)):
+            return self._open_image(io.BytesIO(item))
+        return self._open_image(item)
+
+    def _analyze_source(self, source: Union[str, BinaryIO]) -> Dict[str, List[Dict[str, float | int | str]]]:
+        try:
+            img = self._open_image(source)
+        except Exception:
+            return {"faces": []}
+        return self._analyze_pil(img)
+
+    def _analyze_pil(self, img) -> Dict[str, List[Dict[str, float | int | str]]]:
+        detection = self._detect_batch([img])[0]
+        return _to_dict(self._faces_from_detection(img, *detection, keep_default=True))
+
+    def _detection_copy(self, img) -> Tuple[object, float]:
+        """Downscaled copy for detection and the factor mapping its coordinates back."""
+        longest = max(img.size)
+        if not self.max_detection_side or longest <= self.max_detection_side:
+            return img, 1.0
+        scale = self.max_detection_side / float(longest)
+        size = (max(1, round(img.width * scale)), max(1, round(img.height * scale)))
+        # reduce() does cheap integer box-downsampling first, resize() finishes the job
+        factor = int(1.0 / scale)
+        small = img.reduce(factor) if factor >= 2 else img
+        return small.resize(size, _pil_image().BILINEAR), scale
+
+    def _detect_batch(self, images: List[object]) -> List[Tuple[Optional[np.ndarray], Optional[np.ndarray]]]:
+        """
+        Runs MTCNN once per group of same-sized detection copies; boxes are in
+        original-image coordinates. (None, None) where detection is unavailable.
+        """
+        self._ensure_mtcnn()
+        detections: List[Tuple[Optional[np.ndarray], Optional[np.ndarray]]] = [(None, None)] * len(images)
+        if self._mtcnn is None or not images:
+            record_path("face", "detection", "none", len(images))
+            return detections
+        import numpy as np
+
+        with stage("face", "detection"):
+            record_path("face", "detection", "mtcnn", len(images))
+            copies = [self._detection_copy(img) for img in images]
+            groups: Dict[Tuple[int, int], List[int]] = {}
+            for i, (small, _) in enumerate(copies):
+                groups.setdefault(small.size, []).append(i)  # type: ignore[attr-defined]
+            for indices in groups.values():
+                try:
+                    if len(indices) == 1:
+                        boxes, probs = self._mtcnn.detect(copies[indices[0]][0])
+                        batch_boxes, batch_probs = [boxes], [probs]
+                    else:
+                        batch_boxes, batch_probs = self._mtcnn.detect([copies[i][0] for i in indices])
+                except Exception:
+                    continue
+                for i, boxes, probs in zip(indices, batch_boxes, batch_probs):
+                    scale = copies[i][1]
+                    if boxes is not None and scale != 1.0:
+                        boxes = np.asarray(boxes, dtype=np.float64) / scale
+                    detections[i] = (boxes, probs)
+            return detections
+
+    def _crop_faces(self, img, boxes: List[Tuple[int, int, int, int]]) -> List[object]:
+        """Full-resolution face crops, with boxes clamped to the image."""
+        crops = []
+        for x1, y1, x2, y2 in boxes:
+            x1, y1 = max(0, x1), max(0, y1)
+            x2, y2 = min(img.width, max(x2, x1 + 1)), min(img.height, max(y2, y1 + 1))
+            crops.append(img.crop((x1, y1, x2, y2)))
+        return crops
+
+    def _age_emotion_batch(self, crops: List[object]) -> List[Tuple[int, float, str, float]]:
+        return self._attributes.predict(crops)
+
+    def _faces_from_detection(
+        self,
+        img,
+        boxes: Optional[np.ndarray],
+        probs: Optional[np.ndarray],
+        keep_default: bool,
+    ) -> List[FaceResult]:
+        faces: List[FaceResult] = []
+        if boxes is not None and probs is not None:
+            kept = [
+                (tuple(int(v) for v in box), float(prob))
+                for box, prob in zip(boxes, probs)
+                if box is not None and prob is not None
+            ]
+            attributes = self._age_emotion_batch(self._crop_faces(img, [box for box, _ in kept]))
+            for (box, prob), (age, age_conf, emotion, emo_conf) in zip(kept, attributes):
+                faces.append(
+                    FaceResult(
+                        box=box,  # type: ignore[arg-type]
+                        probability=prob,
+                        age=age,
+                        age_confidence=age_conf,
+                        emotion=emotion,
+                        emotion_confidence=emo_conf,
+                    )
+                )
 
         # If detection failed or dependency missing, return a single default face if image loads
-        if not faces:
+        if not faces and keep_default:
+            record_path("face", "attributes", "default")
             age, age_conf, emotion, emo_conf = self._placeholder_age_emotion()
             faces.append(
                 FaceResult(
@@ -94,17 +419,45 @@ class FaceAnalyzer:
                     emotion_confidence=emo_conf,
                 )
             )
+        return faces
 
-        return {
-            "faces": [
-                {
-                    "box": list(f.box),
-                    "probability": f.probability,
-                    "age": f.age,
-                    "age_confidence": f.age_confidence,
-                    "emotion": f.emotion,
-                    "emotion_confidence": f.emotion_confidence,
-                }
-                for f in faces
-            ]
-        }
\ No newline at end of file
+
+def _to_dict(faces: List[FaceResult]) -> Dict[str, List[Dict[str, float | int | str]]]:
+    return {
+        "faces": [
+            {
+                "box": list(f.box),
+                "probability": f.probability,
+                "age": f.age,
+                "age_confidence": f.age_confidence,
+                "emotion": f.emotion,
+                "emotion_confidence": f.emotion_confidence,
+            }
+            for f in faces
+        ]
+    }
+
+
+def _dhash(img, size: int = 8) -> int:
+    """64-bit difference hash: compares neighbouring pixels of a tiny grayscale thumbnail."""
+    import numpy as np
+
+    thumb = np.asarray(img.convert("L").resize((size + 1, size)), dtype=np.int16)
+    bits = (thumb[:, 1:] > thumb[:, :-1]).ravel()
+    return int.from_bytes(np.packbits(bits).tobytes(), "big")
+
+
+def _hamming(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+
+def _cacheable_payload(item: ImageInput) -> Optional[bytes | bytearray | memoryview]:
+    if isinstance(item, str):
+        try:
+            with open(item, "rb") as fh:
+                return fh.read()
+        except Exception:
+            return None
+    if isinstance(item, (bytes, bytearray, memoryview)):
+        return item
+    return None
@@ -0,0 +1,240 @@
+from __future__ import annotations
+
+import argparse
+import os
+import threading
+from typing import TYPE_CHECKING, Any, List, Optional, Sequence, Tuple
+
+from metrics import record_path, stage
+
+if TYPE_CHECKING:
+    import numpy as np
+
+# Emotion classes predicted by the head (FER-style), in output order
+EMOTION_LABELS = ("neutral", "happy", "sad", "angry", "fear", "surprise", "disgust")
+# Age is classified into bins; the estimate is the probability-weighted bin centre
+AGE_BIN_CENTERS = (1.0, 6.0, 15.0, 25.0, 35.0, 45.0, 55.0, 65.0, 78.0)
+INPUT_SIZE = 64
+BACKENDS = ("placeholder", "torch", "onnxruntime")
+
+AttributePrediction = Tuple[int, float, str, float]  # age, age_confidence, emotion, emotion_confidence
+PLACEHOLDER_PREDICTION: AttributePrediction = (30, 0.35, "neutral", 0.5)
+
+
+def preprocess(crops: Sequence[Any]) -> np.ndarray:
+    """Stacks PIL face crops into one normalized (N, 3, INPUT_SIZE, INPUT_SIZE) float32 batch."""
+    import numpy as np
+    from PIL import Image
+
+    batch = np.empty((len(crops), 3, INPUT_SIZE, INPUT_SIZE), dtype=np.float32)
+    for i, crop in enumerate(crops):
+        resized = crop.convert("RGB").resize((INPUT_SIZE, INPUT_SIZE), Image.BILINEAR)
+        batch[i] = np.asarray(resized, dtype=np.float32).transpose(2, 0, 1)
+    return (batch / 127.5) - 1.0
+
+
+def build_model(width: int = 16, seed: Optional[int] = None) -> Any:
+    """
+    Small CNN producing emotion logits followed by age-bin logits.
+    With `seed` the weights are randomly initialized deterministically, which
+    gives a tiny local model for tests and export checks without any download.
+    """
+    import torch
+    from torch import nn
+
+    if seed is not None:
+        torch.manual_seed(seed)
+    model = nn.Sequential(
+        nn.Conv2d(3, width, 3, stride=2, padding=1),
+        nn.ReLU(inplace=True),
+        nn.Conv2d(width, 2 * width, 3, stride=2, padding=1),
+        nn.ReLU(inplace=True),
+        nn.Conv2d(2 * width, 4 * width, 3, stride=2, padding=1),
+        nn.ReLU(inplace=True),
+        nn.AdaptiveAvgPool2d(1),
+        nn.Flatten(),
+        nn.Linear(4 * width, len(EMOTION_LABELS) + len(AGE_BIN_CENTERS)),
+    )
+    model.width = width  # type: ignore[attr-defined]
+    return model.eval()
+
+
+def save_checkpoint(model: Any, path: str) -> None:
+    import torch
+
+    torch.save({"width": getattr(model, "width", 16), "state_dict": model.state_dict()}, path)
+
+
+def load_checkpoint(path: str) -> Any:
+    import torch
+
+    checkpoint = torch.load(path, map_location="cpu")
+    model = build_model(width=int(checkpoint.get("width", 16)))
+    model.load_state_dict(checkpoint["state_dict"])
+    return model.eval()
+
+
+def export_onnx(model: Any, path: str, quantize: bool = False) -> str:
+    """
+    Exports the head to ONNX with a dynamic batch axis. With `quantize`, an
+    int8 dynamically quantized copy is written next to it and its path returned.
+    """
+    import torch
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    dummy = torch.zeros(1, 3, INPUT_SIZE, INPUT_SIZE)
+    kwargs = dict(
+        input_names=["input"],
+        output_names=["logits"],
+        dynamic_axes={"input": {0: "batch"}, "logits": {0: "batch"}},
+        opset_version=17,
+    )
+    try:
+        torch.onnx.export(model, dummy, path, dynamo=False, **kwargs)
+    except TypeError:
+        # Older torch without the dynamo switch
+        torch.onnx.export(model, dummy, path, **kwargs)
+    if not quantize:
+        return path
+
+    from onnxruntime.quantization import QuantType, quantize_dynamic  # type: ignore
+
+    root, ext = os.path.splitext(path)
+    quantized_path = f"{root}.int8{ext}"
+    quantize_dynamic(path, quantized_path, weight_type=QuantType.QInt8)
+    return quantized_path
+
+
+def decode(logits: np.ndarray) -> List[AttributePrediction]:
+    import numpy as np
+
+    n_emotions = len(EMOTION_LABELS)
+    emo = _softmax(logits[:, :n_emotions])
+    age = _softmax(logits[:, n_emotions:])
+    centers = np.asarray(AGE_BIN_CENTERS)
+    ages = age @ centers
+    emo_idx = emo.argmax(axis=1)
+    return [
+        (int(round(ages[i])), float(age[i].max()), EMOTION_LABELS[emo_idx[i]], float(emo[i, emo_idx[i]]))
+        for i in range(logits.shape[0])
+    ]
+
+
+def _softmax(x: np.ndarray) -> np.ndarray:
+    import numpy as np
+
+    z = np.exp(x - x.max(axis=1, keepdims=True))
+    return z / z.sum(axis=1, keepdims=True)
+
+
+class AgeEmotionClassifier:
+    """
+    Pluggable age/emotion head run on face crops.
+    All crops passed to `predict` go through a single forward pass. Backends:
+    - placeholder: fixed 30 / neutral estimates (no model needed)
+    - torch: a checkpoint written by `save_checkpoint`
+    - onnxruntime: an exported (optionally int8-quantized) ONNX file, CPU only
+    If the backend cannot be loaded, predictions fall back to the placeholder.
+    `num_threads` only sizes the ONNX Runtime session; torch's thread pool is
+    process-wide and left to the caller (see batch_runner's worker setup).
+    """
+
+    def __init__(
+        self,
+        backend: str = "placeholder",
+        model_path: Optional[str] = None,
+        num_threads: Optional[int] = None,
+        model: Any = None,
+    ) -> None:
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown attribute backend '{backend}'; expected one of {BACKENDS}.")
+        self.backend = backend
+        self.model_path = model_path
+        self.num_threads = num_threads
+        self._model = model
+        self._session: Any = None
+        self._loaded = backend == "placeholder" or model is not None
+        self._load_lock = threading.Lock()
+
+    @property
+    def version(self) -> str:
+        """Identifies backend and weights, for cache keys."""
+        if self.backend == "placeholder" or not self.available:
+            # Unloadable backends fall back to placeholder predictions
+            return "placeholder"
+        if self.model_path and os.path.exists(self.model_path):
+            stat = os.stat(self.model_path)
+            return f"{self.backend}:{os.path.basename(self.model_path)}:{stat.st_size}:{int(stat.st_mtime)}"
+        return f"{self.backend}:in-memory:{id(self._model)}"
+
+    @property
+    def available(self) -> bool:
+        self._ensure_loaded()
+        return self._model is not None or self._session is not None
+
+    def _ensure_loaded(self) -> None:
+        if self._loaded:
+            return
+        with self._load_lock:
+            if self._loaded:
+                return
+            with stage("face", "load"):
+                try:
+                    if self.backend == "torch" and self.model_path:
+                        self._model = load_checkpoint(self.model_path)
+                    elif self.backend == "onnxruntime" and self.model_path:
+                        import onnxruntime as ort  # type: ignore
+
+                        options = ort.SessionOptions()
+                        if self.num_threads:
+                            options.intra_op_num_threads = self.num_threads
+                        self._session = ort.InferenceSession(
+                            self.model_path, sess_options=options, providers=["CPUExecutionProvider"]
+                        )
+                except Exception:
+                    self._model = None
+                    self._session = None
+            self._loaded = True
+
+    def predict(self, crops: Sequence[Any]) -> List[AttributePrediction]:
+        if not crops:
+            return []
+        self._ensure_loaded()
+        if self._model is None and self._session is None:
+            record_path("face", "attributes", "placeholder", len(crops))
+            return [PLACEHOLDER_PREDICTION for _ in crops]
+        with stage("face", "attributes"):
+            try:
+                batch = preprocess(crops)
+                if self._session is not None:
+                    logits = self._session.run(None, {self._session.get_inputs()[0].name: batch})[0]
+                else:
+                    import torch
+
+                    with torch.inference_mode():
+                        logits = self._model(torch.from_numpy(batch)).numpy()
+                import numpy as np
+
+                predictions = decode(np.asarray(logits, dtype=np.float64))
+            except Exception:
+                record_path("face", "attributes", "error", len(crops))
+                return [PLACEHOLDER_PREDICTION for _ in crops]
+            record_path("face", "attributes", "model", len(crops))
+            return predictions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Export the face age/emotion head to ONNX.")
+    parser.add_argument("--checkpoint", help="torch checkpoint from save_checkpoint; omit for a random tiny model")
+    parser.add_argument("--out", default=os.path.join("models", "face_attributes.onnx"))
+    parser.add_argument("--quantize", action="store_true", help="also write an int8 dynamically quantized model")
+    parser.add_argument("--width", type=int, default=16)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    model = load_checkpoint(args.checkpoint) if args.checkpoint else build_model(args.width, seed=args.seed)
+    print(export_onnx(model, args.out, quantize=args.quantize))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,261 @@
+from __future__ import annotations
+
+import os
+import threading
+import time
+from bisect import bisect_left
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+# Per-stage instrumentation for the analyzers. Stage names used by the modules:
+# - text: load, sentiment, emotion
+# - speech: decode, features, inference
+# - face: load, decode, detection, attributes
+# - mood: fusion
+# `record_path` counts which path a request took at a stage (e.g. text/emotion:
+# model or keywords), so fallbacks are visible next to the timings.
+
+STAGE_SECONDS = "mood_stage_seconds"
+STAGE_ERRORS = "mood_stage_errors_total"
+PATH_TOTAL = "mood_path_total"
+
+METRIC_HELP: Dict[str, Tuple[str, str]] = {
+    STAGE_SECONDS: ("histogram", "Time spent in each analysis stage."),
+    STAGE_ERRORS: ("counter", "Analysis stages that raised an exception."),
+    PATH_TOTAL: ("counter", "Items processed per stage, by the path (model or fallback) that served them."),
+}
+
+# Histogram bucket upper bounds in seconds; model loads land in the top buckets
+DEFAULT_BUCKETS: Tuple[float, ...] = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0,
+)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+@dataclass
+class MetricEvent:
+    kind: str  # "observe" or "increment"
+    name: str
+    value: float
+    labels: Dict[str, str]
+
+
+class MetricsSink:
+    """
+    Receives every measurement while installed with `add_sink`. Subclasses
+    override `observe` (histogram samples, e.g. stage durations) and
+    `increment` (counters). Both are called on the analyzing thread, so they
+    must be thread-safe and cheap.
+    """
+
+    def observe(self, name: str, value: float, labels: Labels) -> None:
+        pass
+
+    def increment(self, name: str, amount: float, labels: Labels) -> None:
+        pass
+
+
+class CallbackSink(MetricsSink):
+    """Forwards each measurement to `fn` as a MetricEvent, e.g. to feed StatsD or OpenTelemetry."""
+
+    def __init__(self, fn: Callable[[MetricEvent], None]) -> None:
+        self.fn = fn
+
+    def observe(self, name: str, value: float, labels: Labels) -> None:
+        self.fn(MetricEvent("observe", name, value, dict(labels)))
+
+    def increment(self, name: str, amount: float, labels: Labels) -> None:
+        self.fn(MetricEvent("increment", name, amount, dict(labels)))
+
+
+class PrometheusSink(MetricsSink):
+    """
+    Aggregates counters and fixed-bucket histograms in memory and renders
+    them in the Prometheus text exposition format (`render`).
+    """
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS) -> None:
+        self.buckets = tuple(sorted(buckets))
+        self._counters: Dict[Tuple[str, Labels], float] = {}
+        # (name, labels) -> [per-bucket counts (+Inf last), sum, count]
+        self._histograms: Dict[Tuple[str, Labels], List] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, name: str, value: float, labels: Labels) -> None:
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._histograms.get((name, labels))
+            if entry is None:
+                entry = self._histograms[(name, labels)] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            entry[0][index] += 1
+            entry[1] += value
+            entry[2] += 1
+
+    def increment(self, name: str, amount: float, labels: Labels) -> None:
+        with self._lock:
+            self._counters[(name, labels)] = self._counters.get((name, labels), 0.0) + amount
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+    def render(self) -> str:
+        with self._lock:
+            counters = dict(self._counters)
+            histograms = {key: (list(counts), total, n) for key, (counts, total, n) in self._histograms.items()}
+        lines: List[str] = []
+        for name in sorted({name for name, _ in histograms}):
+            _header(lines, name, "histogram")
+            for (metric, labels), (counts, total, n) in sorted(histograms.items()):
+                if metric != name:
+                    continue
+                cumulative = 0
+                bounds = [_format_value(b) for b in self.buckets] + ["+Inf"]
+                for bound, count in zip(bounds, counts):
+                    cumulative += count
+                    lines.append(f"{name}_bucket{_format_labels(labels + (('le', bound),))} {cumulative}")
+                lines.append(f"{name}_sum{_format_labels(labels)} {_format_value(total)}")
+                lines.append(f"{name}_count{_format_labels(labels)} {n}")
+        for name in sorted({name for name, _ in counters}):
+            lines.extend(prometheus_lines(name, [(labels, v) for (m, labels), v in sorted(counters.items()) if m == name]))
+        return "\n".join(lines) + "\n" if lines else ""
+
+
+def prometheus_lines(
+    name: str,
+    samples: Iterable[Tuple[Labels, float]],
+    kind: Optional[str] = None,
+    help_text: Optional[str] = None,
+) -> List[str]:
+    """HELP/TYPE header plus one line per (labels, value) sample, for counters and gauges."""
+    lines: List[str] = []
+    _header(lines, name, kind, help_text)
+    lines.extend(f"{name}{_format_labels(labels)} {_format_value(value)}" for labels, value in samples)
+    return lines
+
+
+def _header(lines: List[str], name: str, kind: Optional[str], help_text: Optional[str] = None) -> None:
+    default_kind, default_help = METRIC_HELP.get(name, ("untyped", ""))
+    help_text = help_text or default_help
+    if help_text:
+        lines.append(f"# HELP {name} {help_text}")
+    lines.append(f"# TYPE {name} {kind or default_kind}")
+
+
+def _format_labels(labels: Labels) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels) + "}"
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_value(value: float) -> str:
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+# Installed sinks; an empty tuple means instrumentation is off and every hook returns immediately
+_sinks: Tuple[MetricsSink, ...] = ()
+_sinks_lock = threading.Lock()
+_default_sink: Optional[PrometheusSink] = None
+
+
+def add_sink(sink: MetricsSink) -> MetricsSink:
+    global _sinks
+    with _sinks_lock:
+        if sink not in _sinks:
+            _sinks = _sinks + (sink,)
+    return sink
+
+
+def remove_sink(sink: MetricsSink) -> None:
+    global _sinks
+    with _sinks_lock:
+        _sinks = tuple(s for s in _sinks if s is not sink)
+
+
+def enabled() -> bool:
+    return bool(_sinks)
+
+
+def default_sink() -> PrometheusSink:
+    """Process-wide PrometheusSink (not installed until `enable`)."""
+    global _default_sink
+    with _sinks_lock:
+        if _default_sink is None:
+            _default_sink = PrometheusSink()
+        return _default_sink
+
+
+def enable() -> PrometheusSink:
+    """Installs the process-wide PrometheusSink and returns it."""
+    return add_sink(default_sink())  # type: ignore[return-value]
+
+
+def disable() -> None:
+    """Removes every sink; hooks go back to costing a single tuple check."""
+    global _sinks
+    with _sinks_lock:
+        _sinks = ()
+
+
+class _Stage:
+    __slots__ = ("labels", "start")
+
+    def __init__(self, labels: Labels) -> None:
+        self.labels = labels
+        self.start = 0.0
+
+    def __enter__(self) -> "_Stage":
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        elapsed = time.perf_counter() - self.start
+        for sink in _sinks:
+            try:
+                sink.observe(STAGE_SECONDS, elapsed, self.labels)
+                if exc_type is not None:
+                    sink.increment(STAGE_ERRORS, 1.0, self.labels)
+            except Exception:
+                pass  # A broken sink must never fail a request
+
+
+class _NullStage:
+    __slots__ = ()
+
+    def __enter__(self) -> "_NullStage":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        return None
+
+
+_NULL_STAGE = _NullStage()
+
+
+def stage(modality: str, name: str):
+    """Context manager timing one stage into STAGE_SECONDS; a shared no-op when no sink is installed."""
+    if not _sinks:
+        return _NULL_STAGE
+    return _Stage((("modality", modality), ("stage", name)))
+
+
+def record_path(modality: str, stage_name: str, path: str, count: int = 1) -> None:
+    """Counts `count` items served by `path` (e.g. "model", "keywords") at a stage."""
+    if not _sinks or count <= 0:
+        return
+    labels = (("modality", modality), ("stage", stage_name), ("path", path))
+    for sink in _sinks:
+        try:
+            sink.increment(PATH_TOTAL, float(count), labels)
+        except Exception:
+            pass
+
+
+if os.environ.get("MOOD_METRICS", "") not in ("", "0", "false"):
+    enable()
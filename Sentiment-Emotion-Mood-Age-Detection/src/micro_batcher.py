@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass
+from typing import Any, Callable, List, Optional, Sequence, Tuple
+
+BatchFn = Callable[[List[Any]], Sequence[Any]]
+
+
+class BatcherFull(RuntimeError):
+    """Raised by `MicroBatcher.submit` when the request queue is at capacity."""
+
+
+@dataclass
+class BatcherStats:
+    submitted: int
+    rejected: int
+    batches: int
+    items: int
+    queued: int
+
+    @property
+    def mean_batch_size(self) -> float:
+        return self.items / self.batches if self.batches else 0.0
+
+
+class MicroBatcher:
+    """
+    Collects individually submitted items into batches for one model call.
+    A worker thread takes the first queued item, then waits at most
+    `max_wait_ms` for more, up to `max_batch_size`, and calls
+    `fn(items)`, which must return one result per item in order. The queue
+    holds at most `max_queue` pending items; beyond that `submit` raises
+    BatcherFull so callers can shed load instead of piling up latency.
+    """
+
+    def __init__(
+        self,
+        fn: BatchFn,
+        max_batch_size: int = 32,
+        max_wait_ms: float = 5.0,
+        max_queue: int = 256,
+        name: str = "batcher",
+    ) -> None:
+        self.fn = fn
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait_ms) / 1000.0
+        self.name = name
+        self._queue: "queue.Queue[Optional[Tuple[Any, Future]]]" = queue.Queue(maxsize=max(1, max_queue))
+        self._lock = threading.Lock()
+        self._submitted = 0
+        self._rejected = 0
+        self._batches = 0
+        self._items = 0
+        self._closed = False
+        self._worker = threading.Thread(target=self._run, name=name, daemon=True)
+        self._worker.start()
+
+    def submit(self, item: Any) -> Future:
+        future: Future = Future()
+        if self._closed:
+            raise RuntimeError(f"{self.name} is closed.")
+        try:
+            self._queue.put_nowait((item, future))
+        except queue.Full:
+            with self._lock:
+                self._rejected += 1
+            raise BatcherFull(f"{self.name} queue is full ({self._queue.maxsize} pending).") from None
+        with self._lock:
+            self._submitted += 1
+        return future
+
+    def __call__(self, item: Any, timeout: Optional[float] = None) -> Any:
+        return self.submit(item).result(timeout=timeout)
+
+    def stats(self) -> BatcherStats:
+        with self._lock:
+            return BatcherStats(
+                submitted=self._submitted,
+                rejected=self._rejected,
+                batches=self._batches,
+                items=self._items,
+                queued=self._queue.qsize(),
+            )
+
+    def close(self, timeout: Optional[float] = None) -> None:
+        """Stops accepting items; already queued items are still processed."""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(None)
+        self._worker.join(timeout)
+
+    def _collect(self) -> Tuple[List[Tuple[Any, Future]], bool]:
+        first = self._queue.get()
+        if first is None:
+            return [], True
+        batch = [first]
+        deadline = time.perf_counter() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            try:
+                entry = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if entry is None:
+                return batch, True
+            batch.append(entry)
+        return batch, False
+
+    def _run(self) -> None:
+        stop = False
+        while not stop:
+            batch, stop = self._collect()
+            # Skip requests whose callers already gave up
+            batch = [(item, future) for item, future in batch if future.set_running_or_notify_cancel()]
+            if not batch:
+                continue
+            try:
+                results = list(self.fn([item for item, _ in batch]))
+                if len(results) != len(batch):
+                    raise RuntimeError(f"{self.name}: batch function returned {len(results)} results for {len(batch)} items.")
+            except Exception as exc:
+                for _, future in batch:
+                    future.set_exception(exc)
+            else:
+                for (_, future), result in zip(batch, results):
+                    future.set_result(result)
+            with self._lock:
+                self._batches += 1
+                self._items += len(batch)
@@ -1,12 +1,52 @@
 from __future__ import annotations
 
-from typing import Dict, Optional
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
+
+from metrics import record_path, stage
+
+# Fusion rules: for each modality, the weight applied to that modality's
+# confidence when it reports a given label. Unlisted labels contribute nothing.
+FUSION_WEIGHTS: Dict[str, Dict[str, float]] = {
+    "text_sentiment": {"positive": 1.0, "negative": -1.0},
+    "text_emotion": {
+        "joy": 0.8, "happy": 0.8, "happiness": 0.8,
+        "sad": -0.8, "sadness": -0.8,
+        "anger": -0.9, "angry": -0.9,
+        "fear": -0.6,
+    },
+    "speech": {"happy": 0.6, "angry": -0.7, "fear": -0.5, "calm": 0.2},
+    "face": {
+        "happy": 0.7, "joy": 0.7,
+        "sad": -0.6, "sadness": -0.6,
+        "angry": -0.7, "anger": -0.7,
+        "surprise": 0.1,
+    },
+}
+
+# Score -> mood buckets, checked in order; the first matching rule wins
+MOOD_THRESHOLDS: Tuple[Tuple[str, float, str], ...] = (
+    (">=", 0.8, "energetic"),
+    (">=", 0.3, "calm"),
+    ("<=", -0.8, "depressed"),
+    ("<=", -0.3, "stressed"),
+)
+DEFAULT_MOOD = "neutral"
+
+# Column names accepted by predict_mood_batch, per modality, in fusion order
+BATCH_COLUMNS: Tuple[Tuple[str, str, str], ...] = (
+    ("text_sentiment", "text_sentiment_label", "text_sentiment_confidence"),
+    ("text_emotion", "text_emotion_label", "text_emotion_confidence"),
+    ("speech", "speech_label", "speech_confidence"),
+    ("face", "face_emotion_label", "face_emotion_confidence"),
+)
 
 
 class MoodPredictor:
     """
     Combines multimodal predictions into a coarse mood estimate.
-    Placeholder logic using simple scoring rules.
+    Placeholder logic using simple scoring rules (see FUSION_WEIGHTS and
+    MOOD_THRESHOLDS). `predict_mood_batch` applies the same rules to columnar
+    data with NumPy and returns exactly the values of the scalar path.
     """
 
     def __init__(self) -> None:
@@ -18,74 +58,113 @@ class MoodPredictor:
         speech_result: Optional[Dict[str, float | str]] = None,
         face_result: Optional[Dict[str, list[Dict[str, float | int | str]]]] = None,
     ) -> Dict[str, float | str]:
-        score = 0.0
-        confidence = 0.5
-
-        # Text sentiment
-        if text_result is not None:
-            sentiment = text_result.get("sentiment", {})
-            sent_label = str(sentiment.get("label", "neutral"))
-            sent_conf = float(sentiment.get("confidence", 0.5))
-            if sent_label == "positive":
-                score += 1.0 * sent_conf
-            elif sent_label == "negative":
-                score -= 1.0 * sent_conf
-
-            # Text emotion
-            emotion = text_result.get("emotion", {})
-            emo_label = str(emotion.get("label", "neutral")).lower()
-            emo_conf = float(emotion.get("confidence", 0.5))
-            if emo_label in {"joy", "happy", "happiness"}:
-                score += 0.8 * emo_conf
-            elif emo_label in {"sad", "sadness"}:
-                score -= 0.8 * emo_conf
-            elif emo_label in {"anger", "angry"}:
-                score -= 0.9 * emo_conf
-            elif emo_label in {"fear"}:
-                score -= 0.6 * emo_conf
-
-        # Speech emotion
-        if speech_result is not None:
-            sp_label = str(speech_result.get("label", "neutral")).lower()
-            sp_conf = float(speech_result.get("confidence", 0.5))
-            if sp_label in {"happy"}:
-                score += 0.6 * sp_conf
-            elif sp_label in {"angry"}:
-                score -= 0.7 * sp_conf
-            elif sp_label in {"fear"}:
-                score -= 0.5 * sp_conf
-            elif sp_label in {"calm"}:
-                score += 0.2 * sp_conf
-
-        # Face emotion (first face)
-        if face_result is not None:
-            faces = face_result.get("faces", [])
-            if faces:
-                face0 = faces[0]
-                fe_label = str(face0.get("emotion", "neutral")).lower()
-                fe_conf = float(face0.get("emotion_confidence", 0.5))
-                if fe_label in {"happy", "joy"}:
-                    score += 0.7 * fe_conf
-                elif fe_label in {"sad", "sadness"}:
-                    score -= 0.6 * fe_conf
-                elif fe_label in {"angry", "anger"}:
-                    score -= 0.7 * fe_conf
-                elif fe_label in {"surprise"}:
-                    score += 0.1 * fe_conf
-
-        # Map score to mood label
-        if score >= 0.8:
-            mood = "energetic"
-        elif score >= 0.3:
-            mood = "calm"
-        elif score <= -0.8:
-            mood = "depressed"
-        elif score <= -0.3:
-            mood = "stressed"
-        else:
-            mood = "neutral"
-
-        # Aggregate confidence as a sigmoid-like mapping
-        confidence = float(min(0.99, max(0.5, 0.5 + abs(score) / 2.0)))
-
-        return {"mood": mood, "confidence": confidence, "score": score}
\ No newline at end of file
+        with stage("mood", "fusion"):
+            observations = _observations(text_result, speech_result, face_result)
+            record_path("mood", "fusion", "fused" if observations else "default")
+            score = 0.0
+            for modality, label, conf in observations:
+                weight = FUSION_WEIGHTS[modality].get(label, 0.0)
+                if weight:
+                    score += weight * conf
+
+            # Map score to mood label
+            mood = DEFAULT_MOOD
+            for op, threshold, name in MOOD_THRESHOLDS:
+                if (score >= threshold) if op == ">=" else (score <= threshold):
+                    mood = name
+                    break
+
+            # Aggregate confidence as a sigmoid-like mapping
+            confidence = float(min(0.99, max(0.5, 0.5 + abs(score) / 2.0)))
+
+        return {"mood": mood, "confidence": confidence, "score": score}
+
+    def predict_mood_batch(self, data: Mapping[str, Any]) -> Dict[str, Any]:
+        """
+        Vectorized `predict_mood` over columns (a pandas DataFrame or a mapping of
+        array-likes) named as in BATCH_COLUMNS. Missing columns mean the modality
+        is absent; missing labels (None/NaN) skip that row's modality and missing
+        confidences default to 0.5, as in the scalar path. Returns NumPy arrays
+        under "mood", "confidence" and "score".
+        """
+        import numpy as np
+
+        with stage("mood", "fusion"):
+            n = _column_length(data)
+            record_path("mood", "fusion", "batch", n)
+            score = np.zeros(n, dtype=np.float64)
+            for modality, label_col, conf_col in BATCH_COLUMNS:
+                if label_col not in data:
+                    continue
+                labels = np.asarray(data[label_col], dtype=str)
+                uniques, inverse = np.unique(labels, return_inverse=True)
+                table = FUSION_WEIGHTS[modality]
+                weights = np.array([table.get(u.lower(), 0.0) for u in uniques], dtype=np.float64)[inverse.ravel()]
+                if conf_col in data:
+                    conf = np.asarray(data[conf_col], dtype=np.float64)
+                    conf = np.where(np.isnan(conf), 0.5, conf)
+                else:
+                    conf = np.full(n, 0.5)
+                score = score + np.where(weights != 0.0, weights * conf, 0.0)
+
+            conditions = [score >= t if op == ">=" else score <= t for op, t, _ in MOOD_THRESHOLDS]
+            mood = np.select(conditions, [name for _, _, name in MOOD_THRESHOLDS], default=DEFAULT_MOOD)
+            confidence = np.minimum(0.99, np.maximum(0.5, 0.5 + np.abs(score) / 2.0))
+        return {"mood": mood, "confidence": confidence, "score": score}
+
+
+def _observations(
+    text_result: Optional[Dict[str, Any]],
+    speech_result: Optional[Dict[str, Any]],
+    face_result: Optional[Dict[str, Any]],
+) -> List[Tuple[str, str, float]]:
+    """(modality, lowercased label, confidence) per available modality, in fusion order."""
+    observations: List[Tuple[str, str, float]] = []
+    if text_result is not None:
+        sentiment = text_result.get("sentiment", {})
+        observations.append(
+            ("text_sentiment", str(sentiment.get("label", "neutral")).lower(), float(sentiment.get("confidence", 0.5)))
+        )
+        emotion = text_result.get("emotion", {})
+        observations.append(
+            ("text_emotion", str(emotion.get("label", "neutral")).lower(), float(emotion.get("confidence", 0.5)))
+        )
+    if speech_result is not None:
+        observations.append(
+            ("speech", str(speech_result.get("label", "neutral")).lower(), float(speech_result.get("confidence", 0.5)))
+        )
+    # Face emotion (first face)
+    if face_result is not None:
+        faces = face_result.get("faces", [])
+        if faces:
+            face0 = faces[0]
+            observations.append(
+                ("face", str(face0.get("emotion", "neutral")).lower(), float(face0.get("emotion_confidence", 0.5)))
+            )
+    return observations
+
+
+def to_columns(
+    records: Iterable[Tuple[Optional[Dict[str, Any]], Optional[Dict[str, Any]], Optional[Dict[str, Any]]]]
+) -> Dict[str, List[Any]]:
+    """Flattens (text_result, speech_result, face_result) triples into predict_mood_batch columns."""
+    columns: Dict[str, List[Any]] = {col: [] for _, label, conf in BATCH_COLUMNS for col in (label, conf)}
+    by_modality = {modality: (label, conf) for modality, label, conf in BATCH_COLUMNS}
+    for text_result, speech_result, face_result in records:
+        seen = {modality: (label, conf) for modality, label, conf in _observations(text_result, speech_result, face_result)}
+        for modality, (label_col, conf_col) in by_modality.items():
+            label, conf = seen.get(modality, (None, float("nan")))
+            columns[label_col].append(label)
+            columns[conf_col].append(conf)
+    return columns
+
+
+def _column_length(data: Mapping[str, Any]) -> int:
+    length = getattr(data, "shape", None)
+    if length is not None:
+        return int(length[0])
+    for _, label_col, conf_col in BATCH_COLUMNS:
+        for col in (label_col, conf_col):
+            if col in data:
+                return len(data[col])
+    return 0
@@ -0,0 +1,156 @@
+from __future__ import annotations
+
+import time
+from datetime import datetime, timezone
+from typing import Dict, Iterable, Optional, Tuple
+
+import numpy as np
+
+from mood_predictor import DEFAULT_MOOD, MOOD_THRESHOLDS
+
+MOOD_LABELS: Tuple[str, ...] = tuple(name for _, _, name in MOOD_THRESHOLDS) + (DEFAULT_MOOD,)
+PERIODS = ("day", "week", "month")
+# Ring sizes: a bit over a year of days, two years of weeks, three years of months
+DEFAULT_CAPACITY = {"day": 400, "week": 106, "month": 36}
+DAY_SECONDS = 86400
+
+
+def bucket_of(timestamp: float, period: str) -> int:
+    """Integer bucket id of an epoch timestamp (UTC); weeks start on Monday."""
+    day = int(timestamp // DAY_SECONDS)
+    if period == "day":
+        return day
+    if period == "week":
+        return (day + 3) // 7  # 1970-01-01 was a Thursday
+    if period == "month":
+        moment = datetime.fromtimestamp(timestamp, tz=timezone.utc)
+        return moment.year * 12 + moment.month - 1
+    raise ValueError(f"Unknown period '{period}'; expected one of {PERIODS}.")
+
+
+def bucket_start(bucket: int, period: str) -> float:
+    if period == "day":
+        return float(bucket * DAY_SECONDS)
+    if period == "week":
+        return float((bucket * 7 - 3) * DAY_SECONDS)
+    if period == "month":
+        return datetime(bucket // 12, bucket % 12 + 1, 1, tzinfo=timezone.utc).timestamp()
+    raise ValueError(f"Unknown period '{period}'; expected one of {PERIODS}.")
+
+
+class TrendSeries:
+    """
+    Fixed-size ring of per-period buckets holding mood counts, score sums and
+    the EWMA of scores at the bucket's last entry. Adding an entry and reading
+    a window are both bounded by the ring size, not by the number of entries.
+    Buckets older than the ring are dropped. The EWMA is only written by
+    in-order entries (`ewma` is None for backfills), so a backfilled bucket
+    shows the EWMA carried forward from the buckets before it.
+    """
+
+    def __init__(self, period: str, capacity: Optional[int] = None) -> None:
+        if period not in PERIODS:
+            raise ValueError(f"Unknown period '{period}'; expected one of {PERIODS}.")
+        self.period = period
+        self.capacity = capacity or DEFAULT_CAPACITY[period]
+        self.bucket_ids = np.full(self.capacity, -1, dtype=np.int64)
+        self.counts = np.zeros((self.capacity, len(MOOD_LABELS)), dtype=np.int32)
+        self.score_sums = np.zeros(self.capacity, dtype=np.float64)
+        self.ewma = np.full(self.capacity, np.nan, dtype=np.float64)
+        self.latest = -1
+
+    def add(self, timestamp: float, mood_index: int, score: float, ewma: Optional[float]) -> None:
+        bucket = bucket_of(timestamp, self.period)
+        if bucket <= self.latest - self.capacity:
+            return  # older than the retained window
+        slot = bucket % self.capacity
+        if self.bucket_ids[slot] != bucket:
+            self.bucket_ids[slot] = bucket
+            self.counts[slot] = 0
+            self.score_sums[slot] = 0.0
+            self.ewma[slot] = np.nan
+        self.counts[slot, mood_index] += 1
+        self.score_sums[slot] += score
+        if ewma is not None and bucket >= self.latest:
+            self.ewma[slot] = ewma
+        self.latest = max(self.latest, bucket)
+
+    def window(self, last: Optional[int] = None, end: Optional[float] = None) -> Dict[str, np.ndarray]:
+        """
+        The `last` buckets up to the one containing `end` (default: the newest
+        bucket), oldest first. Empty buckets have zero counts and NaN mean; the
+        EWMA is carried forward through them.
+        """
+        last = min(last or self.capacity, self.capacity)
+        newest = bucket_of(end, self.period) if end is not None else self.latest
+        if newest < 0:
+            newest = bucket_of(time.time(), self.period)
+        ids = np.arange(newest - last + 1, newest + 1, dtype=np.int64)
+        slots = ids % self.capacity
+        valid = (self.bucket_ids[slots] == ids) & (ids >= 0)
+        counts = np.where(valid[:, None], self.counts[slots], 0)
+        totals = counts.sum(axis=1)
+        sums = np.where(valid, self.score_sums[slots], 0.0)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean = np.where(totals > 0, sums / np.maximum(totals, 1), np.nan)
+        ewma = np.where(valid, self.ewma[slots], np.nan)
+        # Forward-fill the smoothed score over empty buckets
+        filled = np.where(~np.isnan(ewma), np.arange(len(ewma)), -1)
+        np.maximum.accumulate(filled, out=filled)
+        ewma = np.where(filled >= 0, ewma[np.maximum(filled, 0)], np.nan)
+        return {
+            "start": np.array([bucket_start(int(b), self.period) for b in ids]),
+            "counts": counts,
+            "total": totals,
+            "mean": mean,
+            "ewma": ewma,
+        }
+
+
+class MoodTrends:
+    """
+    Daily, weekly and monthly mood aggregates for one user, updated per
+    `MoodPredictor` result. The EWMA (`alpha` per entry) follows entries in
+    time order; backfilled entries older than the newest one update counts and
+    means but not the EWMA. The aggregates keep no per-entry history to replay,
+    so the EWMA assumes append-only timestamps: a store rebuilt from all
+    entries in time order can differ from one that saw backfills.
+    """
+
+    VERSION = 1
+
+    def __init__(self, alpha: float = 0.3, capacity: Optional[Dict[str, int]] = None) -> None:
+        self.alpha = alpha
+        self.series = {period: TrendSeries(period, (capacity or {}).get(period)) for period in PERIODS}
+        self.entries = 0
+        self.latest_timestamp = float("-inf")
+        self.current_ewma: Optional[float] = None
+
+    def add(self, timestamp: float, mood: Optional[str], score: Optional[float]) -> None:
+        if mood is None or score is None:
+            return
+        try:
+            mood_index = MOOD_LABELS.index(mood)
+        except ValueError:
+            mood_index = MOOD_LABELS.index(DEFAULT_MOOD)
+        score = float(score)
+        ewma: Optional[float] = None
+        if timestamp >= self.latest_timestamp:
+            if self.current_ewma is None:
+                self.current_ewma = score
+            else:
+                self.current_ewma = self.alpha * score + (1.0 - self.alpha) * self.current_ewma
+            self.latest_timestamp = timestamp
+            ewma = self.current_ewma
+        for series in self.series.values():
+            series.add(timestamp, mood_index, score, ewma)
+        self.entries += 1
+
+    def add_many(self, rows: Iterable[Tuple[float, Optional[str], Optional[float]]]) -> None:
+        for timestamp, mood, score in sorted(rows, key=lambda row: row[0]):
+            self.add(timestamp, mood, score)
+
+    def trend(self, period: str = "day", last: Optional[int] = None, end: Optional[float] = None) -> Dict[str, np.ndarray]:
+        if period not in self.series:
+            raise ValueError(f"Unknown period '{period}'; expected one of {PERIODS}.")
+        return self.series[period].window(last=last, end=end)
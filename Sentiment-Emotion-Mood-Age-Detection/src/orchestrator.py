@@ -0,0 +1,220 @@
+from __future__ import annotations
+
+import os
+import threading
+import time
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+from dataclasses import dataclass, field
+from typing import Any, BinaryIO, Callable, Dict, Optional, Tuple, Union
+
+from registry import get_analyzer
+from result_cache import as_buffer
+
+MediaInput = Union[str, bytes, bytearray, memoryview, BinaryIO]
+
+DEFAULT_TIMEOUTS: Dict[str, Optional[float]] = {"text": 10.0, "speech": 30.0, "face": 30.0}
+# Stages per run times the runs expected to overlap (e.g. Streamlit sessions sharing default_pipeline)
+DEFAULT_MAX_WORKERS = 3 * 4
+DEFAULT_QUEUE_TIMEOUT = 60.0
+
+
+@dataclass
+class StageResult:
+    name: str
+    status: str  # "ok", "timeout", "error" or "skipped"
+    result: Any = None
+    seconds: float = 0.0
+    error: Optional[str] = None
+
+
+@dataclass
+class PipelineResult:
+    text: Optional[Dict[str, Any]]
+    speech: Optional[Dict[str, Any]]
+    face: Optional[Dict[str, Any]]
+    mood: Dict[str, Any]
+    stages: Dict[str, StageResult] = field(default_factory=dict)
+    total_seconds: float = 0.0
+
+    def timings(self) -> Dict[str, float]:
+        timings = {name: stage.seconds for name, stage in self.stages.items()}
+        timings["total"] = self.total_seconds
+        return timings
+
+
+def _timed(fn: Callable[..., Any], *args: Any) -> Tuple[Any, float]:
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+class _StageClock:
+    """Set by the worker when it picks a stage up, so queueing does not count against the stage's timeout."""
+
+    __slots__ = ("event", "started_at")
+
+    def __init__(self) -> None:
+        self.event = threading.Event()
+        self.started_at = 0.0
+
+
+def _clocked(clock: _StageClock, fn: Callable[..., Any], *args: Any) -> Tuple[Any, float]:
+    clock.started_at = time.perf_counter()
+    clock.event.set()
+    return _timed(fn, *args)
+
+
+def _run_text(text: str) -> Dict[str, Any]:
+    return get_analyzer("text").analyze(text)
+
+
+def _run_speech(audio: MediaInput) -> Dict[str, Any]:
+    analyzer = get_analyzer("speech")
+    if isinstance(audio, str):
+        return analyzer.analyze_file(audio)
+    return analyzer.analyze_bytes(audio)
+
+
+def _run_face(image: MediaInput) -> Dict[str, Any]:
+    analyzer = get_analyzer("face")
+    if isinstance(image, str):
+        return analyzer.analyze_image(image)
+    return analyzer.analyze_bytes(image)
+
+
+def _speech_in_worker(audio: Union[str, bytes]) -> Tuple[Any, float]:
+    # Runs in a child process; the registry there loads the analyzer once per worker
+    return _timed(_run_speech, audio)
+
+
+class MultiModalPipeline:
+    """
+    Runs text, speech and face analysis concurrently and fuses the results.
+    The three stages are independent; only mood fusion waits for all of them.
+    Torch inference and audio/image decoding release the GIL, so a thread
+    pool is used by default. Speech can be moved to a process pool for
+    librosa paths that hold the GIL. A stage that fails or exceeds its timeout
+    is reported in `stages` and fusion proceeds with the remaining results.
+    A stage's timeout runs from when a worker starts it; time spent queued
+    behind concurrent runs is bounded separately by `queue_timeout`. A timed
+    out stage keeps its thread until it finishes, so `max_workers` should
+    leave room for several runs at once.
+    """
+
+    def __init__(
+        self,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        timeouts: Optional[Dict[str, Optional[float]]] = None,
+        speech_in_process: bool = False,
+        queue_timeout: Optional[float] = DEFAULT_QUEUE_TIMEOUT,
+    ) -> None:
+        self.timeouts = {**DEFAULT_TIMEOUTS, **(timeouts or {})}
+        self.queue_timeout = queue_timeout
+        self._threads = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="modality")
+        self._processes: Optional[Executor] = None
+        if speech_in_process:
+            # Importing the process pool pulls in multiprocessing; only pay for it when used
+            from concurrent.futures import ProcessPoolExecutor
+
+            self._processes = ProcessPoolExecutor(max_workers=1)
+
+    def close(self) -> None:
+        self._threads.shutdown(wait=False, cancel_futures=True)
+        if self._processes is not None:
+            self._processes.shutdown(wait=False, cancel_futures=True)
+
+    def run(
+        self,
+        text: Optional[str] = None,
+        audio: Optional[MediaInput] = None,
+        image: Optional[MediaInput] = None,
+    ) -> PipelineResult:
+        start = time.perf_counter()
+        futures: Dict[str, Tuple[Future, Optional[_StageClock]]] = {}
+        if text and text.strip():
+            futures["text"] = self._submit(_run_text, text.strip())
+        if audio is not None:
+            if self._processes is not None:
+                payload = audio if isinstance(audio, str) else bytes(as_buffer(audio))
+                futures["speech"] = (self._processes.submit(_speech_in_worker, payload), None)
+            else:
+                futures["speech"] = self._submit(_run_speech, audio)
+        if image is not None:
+            futures["face"] = self._submit(_run_face, image)
+
+        stages: Dict[str, StageResult] = {}
+        for name in ("text", "speech", "face"):
+            if name not in futures:
+                stages[name] = StageResult(name, "skipped")
+                continue
+            future, clock = futures[name]
+            began = self._wait_started(future, clock, start)
+            if began is None:
+                future.cancel()
+                stages[name] = StageResult(
+                    name, "timeout", seconds=time.perf_counter() - start, error="still queued behind other runs"
+                )
+                continue
+            timeout = self.timeouts.get(name)
+            remaining = None if timeout is None else max(0.0, began + timeout - time.perf_counter())
+            try:
+                result, seconds = future.result(timeout=remaining)
+                stages[name] = StageResult(name, "ok", result, seconds)
+            except FutureTimeout:
+                # A running thread cannot be interrupted; its result is discarded
+                future.cancel()
+                stages[name] = StageResult(name, "timeout", seconds=time.perf_counter() - began)
+            except Exception as exc:
+                stages[name] = StageResult(name, "error", seconds=time.perf_counter() - began, error=repr(exc))
+
+        text_result = stages["text"].result
+        speech_result = stages["speech"].result
+        face_result = stages["face"].result
+        mood, seconds = _timed(get_analyzer("mood").predict_mood, text_result, speech_result, face_result)
+        stages["mood"] = StageResult("mood", "ok", mood, seconds)
+
+        return PipelineResult(
+            text=text_result,
+            speech=speech_result,
+            face=face_result,
+            mood=mood,
+            stages=stages,
+            total_seconds=time.perf_counter() - start,
+        )
+
+    def _submit(self, fn: Callable[..., Any], *args: Any) -> Tuple[Future, _StageClock]:
+        clock = _StageClock()
+        return self._threads.submit(_clocked, clock, fn, *args), clock
+
+    def _wait_started(self, future: Future, clock: Optional[_StageClock], submitted: float) -> Optional[float]:
+        """perf_counter time the stage started at, or None if still queued after `queue_timeout`."""
+        deadline = None if self.queue_timeout is None else submitted + self.queue_timeout
+        while True:
+            if clock is not None and clock.event.is_set():
+                return clock.started_at
+            if future.done() or (clock is None and future.running()):
+                # Process-pool futures carry no clock; running() flips once a worker takes the call
+                return time.perf_counter()
+            remaining = None if deadline is None else deadline - time.perf_counter()
+            if remaining is not None and remaining <= 0:
+                return None
+            if clock is not None:
+                clock.event.wait(remaining)
+            else:
+                time.sleep(0.005 if remaining is None else min(0.005, remaining))
+
+
+_default_pipeline: Optional[MultiModalPipeline] = None
+_default_lock = threading.Lock()
+
+
+def default_pipeline() -> MultiModalPipeline:
+    """Process-wide pipeline sharing one worker pool across requests (sized by MOOD_PIPELINE_WORKERS)."""
+    global _default_pipeline
+    with _default_lock:
+        if _default_pipeline is None:
+            _default_pipeline = MultiModalPipeline(
+                max_workers=int(os.environ.get("MOOD_PIPELINE_WORKERS", DEFAULT_MAX_WORKERS))
+            )
+        return _default_pipeline
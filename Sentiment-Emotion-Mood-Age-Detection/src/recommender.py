@@ -1,69 +1,258 @@
 from __future__ import annotations
 
-from typing import Dict, List
+import json
+import os
+import threading
+from array import array
+from collections import OrderedDict
+from dataclasses import dataclass
+from itertools import chain
+from types import MappingProxyType
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Tuple, Union
+
+DEFAULT_CATALOG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "data", "recommender_catalog.json")
+CATEGORIES = ("music_playlists", "motivational_quotes", "relaxation", "study_work_tips")
+
+# Past recommendation dicts (category -> shown texts) for a user, newest first
+HistoryLoader = Callable[[str], Iterable[Mapping[str, Iterable[str]]]]
+
+
+@dataclass(frozen=True)
+class CatalogIndex:
+    """
+    Immutable catalog, indexed once at load time.
+    `ranked[(mood, emotion)][category]` is a pair of item-index tuples:
+    items tagged with that emotion first, then the mood's emotion-agnostic
+    items (shared between all emotions of a mood), each in descending weight
+    then file order. `emotion` None is the emotion-agnostic entry.
+    """
+
+    ids: Tuple[str, ...]
+    texts: Tuple[str, ...]
+    by_text: Mapping[Tuple[str, str], int]  # (category, text) -> item index
+    ranked: Mapping[Tuple[str, Optional[str]], Mapping[str, Tuple[Tuple[int, ...], Tuple[int, ...]]]]
+    limits: Mapping[str, int]
+    aliases: Mapping[str, str]
+    default_mood: str
+
+    def resolve(self, mood: str, emotion: Optional[str]) -> Tuple[str, Optional[str]]:
+        """Index key for a detected mood/emotion; unknown moods map to the default mood."""
+        if (mood, None) not in self.ranked:
+            mood = self.default_mood
+        emotion = self.aliases.get(emotion, emotion) if emotion else None
+        return (mood, emotion) if (mood, emotion) in self.ranked else (mood, None)
+
+
+def build_index(catalog: Mapping[str, Any]) -> CatalogIndex:
+    """
+    Indexes a catalog mapping: {"items": [{"id", "category", "text", "moods",
+    "emotions"?, "weight"?}, ...], "limits"?, "emotion_aliases"?, "default_mood"?}.
+    Items without "emotions" apply to every emotion of their moods.
+    """
+    limits = {category: int(catalog.get("limits", {}).get(category, 2)) for category in CATEGORIES}
+    default_mood = str(catalog.get("default_mood", "neutral")).lower()
+    ids: List[str] = []
+    texts: List[str] = []
+    by_text: Dict[Tuple[str, str], int] = {}
+    # (mood, emotion or None, category) -> [(-weight, index)]
+    buckets: Dict[Tuple[str, Optional[str], str], List[Tuple[float, int]]] = {}
+    for position, item in enumerate(catalog.get("items", [])):
+        category = item.get("category")
+        if category not in CATEGORIES:
+            raise ValueError(f"Catalog item {item.get('id', position)!r} has unknown category {category!r}.")
+        if not item.get("text") or not item.get("moods"):
+            raise ValueError(f"Catalog item {item.get('id', position)!r} needs a 'text' and at least one mood.")
+        index = len(ids)
+        ids.append(str(item.get("id", index)))
+        texts.append(str(item["text"]))
+        by_text.setdefault((category, texts[index]), index)
+        emotions = [str(e).lower() for e in item.get("emotions") or []] or [None]
+        for mood in item["moods"]:
+            for emotion in emotions:
+                buckets.setdefault((str(mood).lower(), emotion, category), []).append((-float(item.get("weight", 1.0)), index))
+
+    moods = {mood for mood, _, _ in buckets}
+    if default_mood not in moods:
+        raise ValueError(f"Catalog has no items for the default mood {default_mood!r}.")
+    empty: Tuple[int, ...] = ()
+    generic = {
+        (mood, category): tuple(i for _, i in sorted(buckets.get((mood, None, category), [])))
+        for mood in moods
+        for category in CATEGORIES
+    }
+    ranked: Dict[Tuple[str, Optional[str]], Dict[str, Tuple[Tuple[int, ...], Tuple[int, ...]]]] = {}
+    for mood, emotion in {(mood, emotion) for mood, emotion, _ in buckets} | {(mood, None) for mood in moods}:
+        ranked[(mood, emotion)] = {
+            category: (
+                tuple(i for _, i in sorted(buckets.get((mood, emotion, category), []))) if emotion else empty,
+                generic[(mood, category)],
+            )
+            for category in CATEGORIES
+        }
+    aliases = {str(k).lower(): str(v).lower() for k, v in catalog.get("emotion_aliases", {}).items()}
+    return CatalogIndex(
+        ids=tuple(ids),
+        texts=tuple(texts),
+        by_text=MappingProxyType(by_text),
+        ranked=MappingProxyType({key: MappingProxyType(lists) for key, lists in ranked.items()}),
+        limits=MappingProxyType(limits),
+        aliases=MappingProxyType(aliases),
+        default_mood=default_mood,
+    )
+
+
+def load_catalog(path: Optional[str] = None) -> CatalogIndex:
+    """Reads and indexes the catalog at `path` (default: MOOD_RECOMMENDER_CATALOG or data/recommender_catalog.json)."""
+    path = path or os.environ.get("MOOD_RECOMMENDER_CATALOG") or DEFAULT_CATALOG_PATH
+    with open(path, "r", encoding="utf-8") as fh:
+        return build_index(json.load(fh))
+
+
+class _RecentItems:
+    """
+    The last `capacity` distinct items shown to a user: a ring buffer of item
+    indices plus a bitset over the catalog for O(1) membership tests.
+    """
+
+    __slots__ = ("ring", "bits", "pos")
+
+    def __init__(self, capacity: int, n_items: int) -> None:
+        self.ring = array("i", [-1]) * max(1, capacity)
+        self.bits = bytearray((n_items + 7) // 8)
+        self.pos = 0
+
+    def __contains__(self, index: int) -> bool:
+        return bool(self.bits[index >> 3] & (1 << (index & 7)))
+
+    def add(self, index: int) -> None:
+        if index in self:
+            return
+        evicted = self.ring[self.pos]
+        if evicted >= 0:
+            self.bits[evicted >> 3] &= ~(1 << (evicted & 7)) & 0xFF
+        self.ring[self.pos] = index
+        self.bits[index >> 3] |= 1 << (index & 7)
+        self.pos = (self.pos + 1) % len(self.ring)
 
 
 class Recommender:
     """
-    Simple rule-based recommender that maps detected mood/emotion to suggestions.
+    Maps a detected mood/emotion to suggestions from a catalog indexed once by
+    (mood, emotion) (see data/recommender_catalog.json). Items tagged with the
+    detected emotion rank ahead of the mood's general items.
+    With a `user_id`, items the user saw recently are skipped while enough
+    fresh candidates exist, and the returned items are remembered (unless
+    `remember=False`). Recent items live in a per-user ring buffer seeded from
+    `history` (e.g. the diary, see `diary_history`) and kept for the
+    `max_users` most recent users. Ranking only depends on the catalog and
+    the user's recent items, so a `remember=False` preview followed by a
+    remembering call returns the same items.
     """
 
-    def recommend(self, mood: str, emotion: str | None = None) -> Dict[str, List[str]]:
+    def __init__(
+        self,
+        catalog: Union[None, str, Mapping[str, Any], CatalogIndex] = None,
+        history: Optional[HistoryLoader] = None,
+        recent_capacity: int = 32,
+        max_users: int = 4096,
+    ) -> None:
+        if isinstance(catalog, CatalogIndex):
+            self.index = catalog
+        elif isinstance(catalog, Mapping):
+            self.index = build_index(catalog)
+        else:
+            self.index = load_catalog(catalog)
+        self.history = history
+        self.recent_capacity = recent_capacity
+        self.max_users = max_users
+        self._defaults = {
+            key: {category: tuple(self.index.texts[i] for i in self._rank(lists, category, None)) for category in lists}
+            for key, lists in self.index.ranked.items()
+        }
+        self._users: "OrderedDict[str, _RecentItems]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def recommend(
+        self,
+        mood: str,
+        emotion: str | None = None,
+        user_id: Optional[str] = None,
+        remember: bool = True,
+    ) -> Dict[str, List[str]]:
         mood = (mood or "").lower()
         emotion = (emotion or mood or "").lower()
+        key = self.index.resolve(mood, emotion)
+        if user_id is None:
+            return {category: list(texts) for category, texts in self._defaults[key].items()}
 
-        music = {
-            "energetic": ["Upbeat Pop Mix", "EDM Booster", "Morning Run Beats"],
-            "calm": ["Lo-Fi Chill", "Ambient Focus", "Acoustic Calm"],
-            "stressed": ["Piano Relax", "Deep Focus", "Nature Sounds"],
-            "depressed": ["Gentle Uplift", "Soft Indie", "Warm Acoustic"],
-            "neutral": ["Daily Mix", "Chillhop Essentials", "Indie Discovery"],
-        }
+        recent = self._recent(user_id)
+        lists = self.index.ranked[key]
+        with self._lock:
+            picked = {category: self._rank(lists, category, recent) for category in CATEGORIES}
+            if remember:
+                # What was shown becomes history
+                for items in picked.values():
+                    for i in items:
+                        recent.add(i)
+        texts = self.index.texts
+        return {category: [texts[i] for i in items] for category, items in picked.items()}
 
-        quotes = {
-            "energetic": [
-                "The future depends on what you do today.",
-                "Action is the foundational key to all success.",
-            ],
-            "calm": [
-                "Peace comes from within.",
-                "Almost everything will work again if you unplug it for a few minutes.",
-            ],
-            "stressed": [
-                "You don’t have to control your thoughts. You just have to stop letting them control you.",
-                "Simplicity is the ultimate sophistication.",
-            ],
-            "depressed": [
-                "No dark night lasts forever.",
-                "You are stronger than you think.",
-            ],
-            "neutral": [
-                "Small steps every day.",
-                "Do what you can, with what you have, where you are.",
-            ],
-        }
+    def _rank(
+        self, lists: Mapping[str, Tuple[Tuple[int, ...], Tuple[int, ...]]], category: str, recent: Optional[_RecentItems]
+    ) -> List[int]:
+        """Top items for a category, skipping recent ones; recent items only fill up a short list."""
+        limit = self.index.limits[category]
+        picked: List[int] = []
+        skipped: List[int] = []
+        for i in chain(*lists[category]):
+            if recent is not None and i in recent:
+                if len(skipped) < limit:
+                    skipped.append(i)
+                continue
+            if i not in picked:
+                picked.append(i)
+                if len(picked) == limit:
+                    return picked
+        return picked + [i for i in skipped if i not in picked][: limit - len(picked)]
 
-        relaxation = {
-            "energetic": ["10-min stretch", "Box breathing 2 min"],
-            "calm": ["Body scan 5 min", "4-7-8 breathing 3 min"],
-            "stressed": ["Guided meditation 5 min", "Progressive muscle relaxation"],
-            "depressed": ["Sunlight walk 10 min", "Gratitude journaling 3 prompts"],
-            "neutral": ["Mindful tea break", "Light stretching 5 min"],
-        }
+    def _recent(self, user_id: str) -> _RecentItems:
+        with self._lock:
+            recent = self._users.get(user_id)
+            if recent is not None:
+                self._users.move_to_end(user_id)
+                return recent
+        # Seed outside the lock; the history loader may hit the database
+        recent = _RecentItems(self.recent_capacity, len(self.index.ids))
+        if self.history is not None:
+            try:
+                past = list(self.history(user_id))
+            except Exception:
+                past = []
+            for shown in reversed(past):
+                for category, texts in (shown or {}).items():
+                    for text in texts or ():
+                        index = self.index.by_text.get((category, text))
+                        if index is not None:
+                            recent.add(index)
+        with self._lock:
+            recent = self._users.setdefault(user_id, recent)
+            self._users.move_to_end(user_id)
+            while len(self._users) > self.max_users:
+                self._users.popitem(last=False)
+        return recent
+
+    def forget(self, user_id: Optional[str] = None) -> None:
+        """Drops remembered items for one user, or for everyone."""
+        with self._lock:
+            if user_id is None:
+                self._users.clear()
+                return
+            self._users.pop(user_id, None)
 
-        tips = {
-            "energetic": ["Tackle deep work first", "Channel energy into a short sprint"],
-            "calm": ["Good time for reading/study", "Batch shallow tasks"],
-            "stressed": ["Timebox work in 25-min Pomodoros", "Limit notifications 1 hour"],
-            "depressed": ["Start with one tiny task", "Pair with a friend for accountability"],
-            "neutral": ["Plan next 3 priorities", "Declutter your workspace 5 min"],
-        }
 
-        selected_mood = mood if mood in music else "neutral"
+def diary_history(user_id: str, entries: int = 20) -> List[Mapping[str, Iterable[str]]]:
+    """Recommendations saved with the user's newest diary entries, newest first."""
+    from diary_store import default_store
 
-        return {
-            "music_playlists": music[selected_mood],
-            "motivational_quotes": quotes[selected_mood],
-            "relaxation": relaxation[selected_mood],
-            "study_work_tips": tips[selected_mood],
-        }
\ No newline at end of file
+    page = default_store().query(user_id, limit=entries)
+    return [entry["recommendations"] for entry in page.entries if isinstance(entry.get("recommendations"), dict)]
@@ -0,0 +1,181 @@
+from __future__ import annotations
+
+import os
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, Optional
+
+
+@dataclass
+class ModelStats:
+    name: str
+    load_seconds: float
+    rss_delta_bytes: int
+    loaded_at: float
+
+
+def _rss_bytes() -> int:
+    """Current resident set size of this process in bytes (0 if unknown)."""
+    try:
+        with open("/proc/self/statm") as fh:
+            return int(fh.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except Exception:
+        pass
+    try:
+        import resource
+
+        usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is bytes on macOS, kilobytes elsewhere
+        return int(usage) * (1 if sys.platform == "darwin" else 1024)
+    except Exception:
+        return 0
+
+
+class ModelRegistry:
+    """
+    Process-wide, thread-safe holder for analyzer instances.
+    Each analyzer is constructed and warmed once, then shared by every caller.
+    Loads of different analyzers may proceed in parallel; concurrent requests
+    for the same analyzer wait for the single in-flight load.
+    """
+
+    def __init__(self) -> None:
+        self._factories: Dict[str, Callable[[], Any]] = {}
+        self._instances: Dict[str, Any] = {}
+        self._stats: Dict[str, ModelStats] = {}
+        self._name_locks: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def register(self, name: str, factory: Callable[[], Any], replace: bool = False) -> None:
+        with self._lock:
+            if name in self._factories and not replace:
+                raise ValueError(f"Analyzer '{name}' is already registered.")
+            self._factories[name] = factory
+            self._name_locks.setdefault(name, threading.Lock())
+            if replace:
+                self._instances.pop(name, None)
+                self._stats.pop(name, None)
+
+    def names(self) -> list[str]:
+        with self._lock:
+            return list(self._factories)
+
+    def is_loaded(self, name: str) -> bool:
+        with self._lock:
+            return name in self._instances
+
+    def get(self, name: str) -> Any:
+        """Return the shared analyzer, constructing and warming it on first use."""
+        instance = self._instances.get(name)
+        if instance is not None:
+            return instance
+        with self._lock:
+            if name not in self._factories:
+                raise KeyError(f"Unknown analyzer '{name}'.")
+            factory = self._factories[name]
+            name_lock = self._name_locks[name]
+        with name_lock:
+            instance = self._instances.get(name)
+            if instance is not None:
+                return instance
+            rss_before = _rss_bytes()
+            start = time.perf_counter()
+            instance = factory()
+            warmup = getattr(instance, "warmup", None)
+            if callable(warmup):
+                warmup()
+            elapsed = time.perf_counter() - start
+            stats = ModelStats(
+                name=name,
+                load_seconds=elapsed,
+                rss_delta_bytes=max(0, _rss_bytes() - rss_before),
+                loaded_at=time.time(),
+            )
+            with self._lock:
+                self._instances[name] = instance
+                self._stats[name] = stats
+            return instance
+
+    def preload(self, names: Optional[Iterable[str]] = None) -> Dict[str, ModelStats]:
+        """Eagerly load the given analyzers (all registered ones by default)."""
+        for name in list(names) if names is not None else self.names():
+            self.get(name)
+        return self.stats()
+
+    def stats(self) -> Dict[str, ModelStats]:
+        with self._lock:
+            return dict(self._stats)
+
+    def unload(self, name: Optional[str] = None) -> None:
+        with self._lock:
+            if name is None:
+                self._instances.clear()
+                self._stats.clear()
+            else:
+                self._instances.pop(name, None)
+                self._stats.pop(name, None)
+
+
+def _text_factory() -> Any:
+    from text_analysis import TextAnalyzer
+    from result_cache import default_cache
+
+    return TextAnalyzer(
+        cache=default_cache(),
+        model_path=os.environ.get("MOOD_TEXT_MODEL_DIR"),
+        offline=os.environ.get("MOOD_OFFLINE", "") not in ("", "0", "false"),
+        backend=os.environ.get("MOOD_TEXT_BACKEND", "torch"),
+    )
+
+
+def _speech_factory() -> Any:
+    from speech_analysis import SpeechEmotionAnalyzer
+    from result_cache import default_cache
+
+    return SpeechEmotionAnalyzer(cache=default_cache())
+
+
+def _face_factory() -> Any:
+    from face_analysis import FaceAnalyzer
+    from result_cache import default_cache
+
+    return FaceAnalyzer(
+        cache=default_cache(),
+        attribute_backend=os.environ.get("MOOD_FACE_ATTR_BACKEND", "placeholder"),
+        attribute_model_path=os.environ.get("MOOD_FACE_ATTR_MODEL"),
+    )
+
+
+def _mood_factory() -> Any:
+    from mood_predictor import MoodPredictor
+
+    return MoodPredictor()
+
+
+def _recommender_factory() -> Any:
+    from recommender import Recommender, diary_history
+
+    # Personalized calls skip items shown with the user's recent diary entries
+    return Recommender(history=diary_history)
+
+
+_default_registry = ModelRegistry()
+_default_registry.register("text", _text_factory)
+_default_registry.register("speech", _speech_factory)
+_default_registry.register("face", _face_factory)
+_default_registry.register("mood", _mood_factory)
+_default_registry.register("recommender", _recommender_factory)
+
+
+def get_registry() -> ModelRegistry:
+    return _default_registry
+
+
+def get_analyzer(name: str) -> Any:
+    return _default_registry.get(name)
+
+
+def preload(names: Optional[Iterable[str]] = None) -> Dict[str, ModelStats]:
+    return _default_registry.preload(names)
@@ -0,0 +1,226 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, BinaryIO, Callable, Optional, Tuple, Union
+
+Buffer = Union[bytes, bytearray, memoryview]
+
+
+def as_buffer(data: Union[Buffer, BinaryIO]) -> Buffer:
+    """Bytes-like uploads as-is, BytesIO-like ones via `getbuffer` (no copy), other files read fully."""
+    if isinstance(data, (bytes, bytearray, memoryview)):
+        return data
+    getbuffer = getattr(data, "getbuffer", None)
+    if callable(getbuffer):
+        return getbuffer()
+    return data.read()
+
+
+@dataclass
+class CacheStats:
+    hits: int
+    misses: int
+    disk_hits: int
+    evictions: int
+    expirations: int
+    entries: int
+    bytes: int
+
+
+class ResultCache:
+    """
+    Content-addressed LRU + TTL cache for analyzer results.
+    Keys hash the raw input bytes together with an analyzer namespace that
+    encodes the analyzer and model version, so a model change never serves
+    stale results. Values are stored pickled; the memory tier is bounded both
+    by entry count and by total pickled bytes. An optional SQLite tier keeps
+    results across restarts; expired rows are purged and the oldest writes
+    trimmed to `max_disk_entries` every `PRUNE_EVERY` writes (and on open).
+    """
+
+    PRUNE_EVERY = 256
+
+    def __init__(
+        self,
+        max_entries: int = 4096,
+        max_bytes: int = 64 * 1024 * 1024,
+        ttl_seconds: Optional[float] = 3600.0,
+        disk_path: Optional[str] = None,
+        max_disk_entries: Optional[int] = 100_000,
+    ) -> None:
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.disk_path = disk_path
+        self.max_disk_entries = max_disk_entries
+        self._disk_writes = 0
+        self._entries: "OrderedDict[str, Tuple[bytes, float]]" = OrderedDict()
+        self._bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._disk_hits = 0
+        self._evictions = 0
+        self._expirations = 0
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        if disk_path:
+            os.makedirs(os.path.dirname(os.path.abspath(disk_path)), exist_ok=True)
+            self._db = sqlite3.connect(disk_path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS results ("
+                "key TEXT PRIMARY KEY, value BLOB NOT NULL, expires_at REAL NOT NULL)"
+            )
+            self._db.commit()
+            self._prune_disk()
+
+    @staticmethod
+    def make_key(namespace: str, payload: Buffer) -> str:
+        digest = hashlib.blake2b(digest_size=20)
+        digest.update(namespace.encode("utf-8"))
+        digest.update(b"\0")
+        digest.update(payload)
+        return digest.hexdigest()
+
+    def _expiry(self) -> float:
+        return time.time() + self.ttl_seconds if self.ttl_seconds else float("inf")
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                blob, expires_at = entry
+                if expires_at > time.time():
+                    self._entries.move_to_end(key)
+                    self._hits += 1
+                    return pickle.loads(blob)
+                self._drop(key)
+                self._expirations += 1
+            row = self._disk_get(key)
+            if row is None:
+                self._misses += 1
+                return None
+            blob, expires_at = row
+            self._hits += 1
+            self._disk_hits += 1
+            # Keep the row's expiry; a disk hit must not extend the entry's life
+            self._store(key, blob, expires_at)
+            return pickle.loads(blob)
+
+    def set(self, key: str, value: Any) -> None:
+        blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        expires_at = self._expiry()
+        with self._lock:
+            self._store(key, blob, expires_at)
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO results (key, value, expires_at) VALUES (?, ?, ?)",
+                    (key, blob, expires_at),
+                )
+                self._db.commit()
+                self._disk_writes += 1
+                if self._disk_writes % self.PRUNE_EVERY == 0:
+                    self._prune_disk()
+
+    def get_or_compute(self, namespace: str, payload: Buffer, compute: Callable[[], Any]) -> Any:
+        key = self.make_key(namespace, payload)
+        value = self.get(key)
+        if value is None:
+            value = compute()
+            self.set(key, value)
+        return value
+
+    def stats(self) -> CacheStats:
+        with self._lock:
+            return CacheStats(
+                hits=self._hits,
+                misses=self._misses,
+                disk_hits=self._disk_hits,
+                evictions=self._evictions,
+                expirations=self._expirations,
+                entries=len(self._entries),
+                bytes=self._bytes,
+            )
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            if self._db is not None:
+                self._db.execute("DELETE FROM results")
+                self._db.commit()
+
+    def _store(self, key: str, blob: bytes, expires_at: float) -> None:
+        if len(blob) > self.max_bytes:
+            return
+        self._drop(key)
+        self._entries[key] = (blob, expires_at)
+        self._bytes += len(blob)
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            old_key, _ = next(iter(self._entries.items()))
+            self._drop(old_key)
+            self._evictions += 1
+
+    def _drop(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= len(entry[0])
+
+    def _disk_get(self, key: str) -> Optional[Tuple[bytes, float]]:
+        if self._db is None:
+            return None
+        row = self._db.execute(
+            "SELECT value, expires_at FROM results WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        if row[1] <= time.time():
+            self._db.execute("DELETE FROM results WHERE key = ?", (key,))
+            self._db.commit()
+            self._expirations += 1
+            return None
+        return bytes(row[0]), float(row[1])
+
+    def _prune_disk(self) -> None:
+        """Deletes expired rows, then the oldest writes beyond `max_disk_entries`."""
+        if self._db is None:
+            return
+        deleted = self._db.execute("DELETE FROM results WHERE expires_at <= ?", (time.time(),)).rowcount
+        self._expirations += max(deleted, 0)
+        if self.max_disk_entries is not None:
+            # INSERT OR REPLACE assigns a fresh rowid, so rowid order is write order
+            self._db.execute(
+                "DELETE FROM results WHERE rowid <= ("
+                "SELECT rowid FROM results ORDER BY rowid DESC LIMIT 1 OFFSET ?)",
+                (self.max_disk_entries,),
+            )
+        self._db.commit()
+
+
+_default_cache: Optional[ResultCache] = None
+_default_lock = threading.Lock()
+
+
+def default_cache() -> ResultCache:
+    """
+    Process-wide cache shared by the registry's analyzers. Configured from
+    MOOD_CACHE_MAX_BYTES, MOOD_CACHE_TTL (seconds, 0 disables expiry),
+    MOOD_CACHE_DIR (enables the on-disk tier) and MOOD_CACHE_DISK_MAX_ENTRIES.
+    """
+    global _default_cache
+    with _default_lock:
+        if _default_cache is None:
+            cache_dir = os.environ.get("MOOD_CACHE_DIR")
+            _default_cache = ResultCache(
+                max_bytes=int(os.environ.get("MOOD_CACHE_MAX_BYTES", 64 * 1024 * 1024)),
+                ttl_seconds=float(os.environ.get("MOOD_CACHE_TTL", 3600.0)) or None,
+                disk_path=os.path.join(cache_dir, "results.sqlite") if cache_dir else None,
+                max_disk_entries=int(os.environ.get("MOOD_CACHE_DISK_MAX_ENTRIES", 100_000)),
+            )
+        return _default_cache
@@ -0,0 +1,216 @@
+from __future__ import annotations
+
+import argparse
+import json
+import os
+from concurrent.futures import TimeoutError as FutureTimeout
+from typing import Any, Dict, List, Optional, Sequence
+
+from flask import Flask, Response, request
+
+import metrics
+from diary_store import json_default
+from micro_batcher import BatcherFull, MicroBatcher
+from registry import get_analyzer, get_registry, preload
+
+# Batching knobs, overridable per create_app call
+DEFAULT_MAX_BATCH_SIZE = int(os.environ.get("MOOD_BATCH_MAX_SIZE", 32))
+DEFAULT_MAX_WAIT_MS = float(os.environ.get("MOOD_BATCH_MAX_WAIT_MS", 5.0))
+DEFAULT_MAX_QUEUE = int(os.environ.get("MOOD_BATCH_MAX_QUEUE", 256))
+REQUEST_TIMEOUT = float(os.environ.get("MOOD_REQUEST_TIMEOUT", 30.0))
+
+
+def _text_batch(texts: List[str]) -> List[Dict[str, Any]]:
+    return get_analyzer("text").analyze_batch(texts, batch_size=len(texts))
+
+
+def _speech_batch(payloads: List[bytes]) -> List[Dict[str, Any]]:
+    # Decoding and features are per clip; batching still bounds concurrency and applies backpressure
+    analyzer = get_analyzer("speech")
+    return [analyzer.analyze_bytes(payload) for payload in payloads]
+
+
+def _face_batch(payloads: List[bytes]) -> List[Dict[str, Any]]:
+    return get_analyzer("face").analyze_batch(payloads)
+
+
+def _mood_batch(records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    from mood_predictor import to_columns
+
+    columns = to_columns((r.get("text_result"), r.get("speech_result"), r.get("face_result")) for r in records)
+    scored = get_analyzer("mood").predict_mood_batch(columns)
+    return [
+        {"mood": str(mood), "confidence": float(confidence), "score": float(score)}
+        for mood, confidence, score in zip(scored["mood"], scored["confidence"], scored["score"])
+    ]
+
+
+def _mood_payload_error(payload: Dict[str, Any]) -> Optional[str]:
+    """Why a /mood body cannot be fused; checked before batching, where one bad record would fail the batch."""
+    from mood_predictor import to_columns
+
+    for key in ("text_result", "speech_result", "face_result"):
+        if payload.get(key) is not None and not isinstance(payload[key], dict):
+            return f"'{key}' must be an object"
+    faces = (payload.get("face_result") or {}).get("faces")
+    if faces is not None and not (isinstance(faces, list) and all(isinstance(face, dict) for face in faces)):
+        return "'face_result.faces' must be a list of objects"
+    try:
+        # Nested values (e.g. a non-numeric confidence) fail here rather than inside the batch
+        to_columns([(payload.get("text_result"), payload.get("speech_result"), payload.get("face_result"))])
+    except (AttributeError, TypeError, ValueError) as exc:
+        return f"malformed mood inputs: {exc}"
+    return None
+
+
+_BATCH_FUNCTIONS = {"text": _text_batch, "speech": _speech_batch, "face": _face_batch, "mood": _mood_batch}
+
+
+def create_app(
+    max_batch_size: Optional[int] = None,
+    max_wait_ms: Optional[float] = None,
+    max_queue: Optional[int] = None,
+    preload_models: bool = True,
+    collect_metrics: bool = True,
+) -> Flask:
+    """
+    Headless inference service. Each endpoint feeds its own MicroBatcher, so
+    concurrent requests share model calls; a full queue answers 503.
+    - POST /text   {"text": "..."}
+    - POST /speech audio bytes as the body or a multipart "file"
+    - POST /face   image bytes as the body or a multipart "file"
+    - POST /mood   {"text_result": {...}, "speech_result": {...}, "face_result": {...}}
+    - GET  /health loaded models and batcher stats
+    - GET  /metrics per-stage timings, fallback paths and batcher counters (Prometheus text format)
+    With `collect_metrics` the process-wide metrics sink is installed before
+    the models load, so load times are included.
+    """
+    if collect_metrics:
+        metrics.enable()
+    if preload_models:
+        preload()
+
+    app = Flask(__name__)
+    batchers = {
+        name: MicroBatcher(
+            fn,
+            max_batch_size=max_batch_size or DEFAULT_MAX_BATCH_SIZE,
+            max_wait_ms=DEFAULT_MAX_WAIT_MS if max_wait_ms is None else max_wait_ms,
+            max_queue=max_queue or DEFAULT_MAX_QUEUE,
+            name=f"{name}-batcher",
+        )
+        for name, fn in _BATCH_FUNCTIONS.items()
+    }
+    app.extensions["mood_batchers"] = batchers
+
+    def dispatch(name: str, item: Any) -> Response:
+        try:
+            future = batchers[name].submit(item)
+        except BatcherFull as exc:
+            return _json({"error": str(exc)}, 503, headers={"Retry-After": "1"})
+        try:
+            result = future.result(timeout=REQUEST_TIMEOUT)
+        except FutureTimeout:
+            # Still queued: the batcher skips cancelled items instead of spending a batch slot on them
+            future.cancel()
+            return _json({"error": f"{name} analysis timed out"}, 504)
+        except Exception as exc:
+            return _json({"error": repr(exc)}, 500)
+        return _json(result)
+
+    @app.post("/text")
+    def text_endpoint() -> Response:
+        payload = request.get_json(silent=True) or {}
+        text = payload.get("text")
+        if not isinstance(text, str) or not text.strip():
+            return _json({"error": "expected JSON body with a non-empty 'text'"}, 400)
+        return dispatch("text", text.strip())
+
+    @app.post("/speech")
+    def speech_endpoint() -> Response:
+        data = _upload_bytes()
+        if not data:
+            return _json({"error": "expected audio bytes as the body or a 'file' upload"}, 400)
+        return dispatch("speech", data)
+
+    @app.post("/face")
+    def face_endpoint() -> Response:
+        data = _upload_bytes()
+        if not data:
+            return _json({"error": "expected image bytes as the body or a 'file' upload"}, 400)
+        return dispatch("face", data)
+
+    @app.post("/mood")
+    def mood_endpoint() -> Response:
+        payload = request.get_json(silent=True)
+        if not isinstance(payload, dict):
+            return _json({"error": "expected a JSON object with text_result / speech_result / face_result"}, 400)
+        error = _mood_payload_error(payload)
+        if error:
+            return _json({"error": error}, 400)
+        return dispatch("mood", payload)
+
+    @app.get("/health")
+    def health() -> Response:
+        return _json(
+            {
+                "models": {name: stats.load_seconds for name, stats in get_registry().stats().items()},
+                "batchers": {name: vars(b.stats()) for name, b in batchers.items()},
+            }
+        )
+
+    @app.get("/metrics")
+    def metrics_endpoint() -> Response:
+        body = metrics.default_sink().render() + _service_metrics(batchers)
+        return Response(body, mimetype="text/plain; version=0.0.4")
+
+    return app
+
+
+# BatcherStats field -> (metric name, type, help)
+_BATCHER_METRICS = (
+    ("submitted", "mood_batcher_submitted_total", "counter", "Items submitted to the micro-batcher."),
+    ("rejected", "mood_batcher_rejected_total", "counter", "Items rejected because the queue was full (503)."),
+    ("batches", "mood_batcher_batches_total", "counter", "Model calls made by the micro-batcher."),
+    ("items", "mood_batcher_items_total", "counter", "Items processed by the micro-batcher."),
+    ("queued", "mood_batcher_queued", "gauge", "Items currently waiting in the queue."),
+)
+
+
+def _service_metrics(batchers: Dict[str, MicroBatcher]) -> str:
+    stats = {name: batcher.stats() for name, batcher in batchers.items()}
+    lines: List[str] = []
+    for field, metric, kind, help_text in _BATCHER_METRICS:
+        samples = [((("batcher", name),), getattr(s, field)) for name, s in stats.items()]
+        lines.extend(metrics.prometheus_lines(metric, samples, kind, help_text))
+    loads = [((("model", name),), s.load_seconds) for name, s in get_registry().stats().items()]
+    lines.extend(metrics.prometheus_lines("mood_model_load_seconds", loads, "gauge", "Load plus warmup time per model."))
+    return "\n".join(lines) + "\n"
+
+
+def _upload_bytes() -> bytes:
+    upload = request.files.get("file")
+    if upload is not None:
+        return upload.read()
+    return request.get_data(cache=False)
+
+
+def _json(payload: Any, status: int = 200, headers: Optional[Dict[str, str]] = None) -> Response:
+    return Response(json.dumps(payload, default=json_default), status=status, headers=headers, mimetype="application/json")
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Run the headless inference service.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--max-batch-size", type=int, default=DEFAULT_MAX_BATCH_SIZE)
+    parser.add_argument("--max-wait-ms", type=float, default=DEFAULT_MAX_WAIT_MS)
+    parser.add_argument("--max-queue", type=int, default=DEFAULT_MAX_QUEUE)
+    args = parser.parse_args(argv)
+
+    app = create_app(args.max_batch_size, args.max_wait_ms, args.max_queue)
+    app.run(host=args.host, port=args.port, threaded=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,21 @@
 from __future__ import annotations
 
+import io
 from dataclasses import dataclass
-from typing import Dict
+from typing import TYPE_CHECKING, BinaryIO, Dict, Iterable, Iterator, List, Optional, Union
 
-import numpy as np
+from metrics import record_path, stage
+from result_cache import as_buffer
+
+if TYPE_CHECKING:
+    import numpy as np
+
+    from result_cache import ResultCache
+
+
+AudioSource = Union[str, BinaryIO]
+AudioBytes = Union[bytes, bytearray, memoryview, BinaryIO]
+PCMChunk = Union["np.ndarray", bytes, bytearray, memoryview]
 
 
 @dataclass
@@ -18,25 +30,78 @@ class SpeechEmotionAnalyzer:
     Intended as a placeholder until a trained model is integrated.
     """
 
-    def __init__(self, target_sr: int = 16000) -> None:
+    def __init__(self, target_sr: int = 16000, cache: Optional["ResultCache"] = None) -> None:
         self.target_sr = target_sr
+        self._cache = cache
+
+    def warmup(self) -> None:
+        """
+        Decode and analyze a short silent in-memory WAV once, so the decoder
+        and NumPy imports happen here rather than in the first request.
+        """
+        import wave
+
+        buffer = io.BytesIO()
+        with wave.open(buffer, "wb") as wav:
+            wav.setnchannels(1)
+            wav.setsampwidth(2)
+            wav.setframerate(self.target_sr)
+            wav.writeframes(b"\0\0" * (self.target_sr // 4))
+        buffer.seek(0)
+        try:
+            waveform, sr = self._load_audio(buffer)
+            self._extract_features(waveform, sr)
+        except Exception:
+            pass
+
+    def _load_audio(self, source: AudioSource) -> tuple[np.ndarray, int]:
+        with stage("speech", "decode"):
+            try:
+                # soundfile decodes WAV/FLAC/OGG directly; librosa is only needed to resample
+                import soundfile as sf  # type: ignore
+
+                waveform, sr = sf.read(source, dtype="float32", always_2d=True)
+                if sr == self.target_sr:
+                    record_path("speech", "decode", "soundfile")
+                    return waveform.mean(axis=1), sr
+            except Exception:
+                pass
+            if not isinstance(source, str):
+                source.seek(0)
+            import librosa  # Lazy import
 
-    def _load_audio(self, path: str) -> tuple[np.ndarray, int]:
-        import librosa  # Lazy import
+            # librosa accepts both paths and file-like objects (decoded in memory)
+            waveform, sr = librosa.load(source, sr=self.target_sr, mono=True)
+            record_path("speech", "decode", "librosa")
+            return waveform, sr
 
-        waveform, sr = librosa.load(path, sr=self.target_sr, mono=True)
+    def _prepare_array(self, waveform: np.ndarray, sr: int) -> tuple[np.ndarray, int]:
+        import numpy as np
+
+        waveform = np.asarray(waveform)
+        if np.issubdtype(waveform.dtype, np.integer):
+            # PCM integers -> [-1, 1] floats
+            waveform = waveform.astype(np.float32) / float(np.iinfo(waveform.dtype).max)
+        else:
+            waveform = waveform.astype(np.float32, copy=False)
+        if waveform.ndim > 1:
+            # Accept (channels, samples) as librosa does, or (samples, channels)
+            channel_axis = 0 if waveform.shape[0] < waveform.shape[-1] else -1
+            waveform = waveform.mean(axis=channel_axis)
+        if sr != self.target_sr and waveform.size:
+            import librosa
+
+            waveform = librosa.resample(waveform, orig_sr=sr, target_sr=self.target_sr)
+            sr = self.target_sr
         return waveform, sr
 
     def _extract_features(self, waveform: np.ndarray, sr: int) -> Dict[str, float]:
-        import librosa
-
-        if waveform.size == 0:
-            return {"rms": 0.0, "centroid": 0.0, "zcr": 0.0}
+        # Pure NumPy; matches the librosa.feature rms / spectral_centroid / zero_crossing_rate means
+        from audio_features import extract_features
 
-        rms = float(np.mean(librosa.feature.rms(y=waveform)))
-        centroid = float(np.mean(librosa.feature.spectral_centroid(y=waveform, sr=sr)))
-        zcr = float(np.mean(librosa.feature.zero_crossing_rate(y=waveform)))
-        return {"rms": rms, "centroid": centroid, "zcr": zcr}
+        with stage("speech", "features"):
+            feats = extract_features(waveform, sr)
+        return {"rms": feats["rms"], "centroid": feats["centroid"], "zcr": feats["zcr"]}  # type: ignore[dict-item]
 
     def _heuristic_classify(self, feats: Dict[str, float]) -> ClassificationResult:
         # Simple thresholds tuned coarsely for placeholder behavior
@@ -59,11 +124,183 @@ class SpeechEmotionAnalyzer:
             return ClassificationResult("happy", 0.55)
         return ClassificationResult("neutral", 0.5)
 
+    def cache_namespace(self) -> str:
+        return f"speech:v1:heuristic:sr={self.target_sr}"
+
     def analyze_file(self, audio_path: str) -> Dict[str, float | str]:
+        if self._cache is not None:
+            try:
+                with open(audio_path, "rb") as fh:
+                    data = fh.read()
+            except Exception:
+                return {"label": "neutral", "confidence": 0.5}
+            return self.analyze_bytes(data)
+        return self._analyze_source(audio_path)
+
+    def analyze_bytes(self, data: AudioBytes) -> Dict[str, float | str]:
+        """
+        Analyzes an encoded audio clip (WAV/MP3/OGG) held in memory: bytes,
+        a memoryview, or a file-like object such as an upload buffer.
+        """
+        payload = as_buffer(data)
+        if self._cache is not None:
+            return self._cache.get_or_compute(
+                self.cache_namespace(), payload, lambda: self._analyze_source(io.BytesIO(payload))
+            )
+        return self._analyze_source(io.BytesIO(payload))
+
+    def analyze_array(self, waveform: np.ndarray, sr: int) -> Dict[str, float | str]:
+        """Analyzes already-decoded PCM samples (float or integer, mono or multi-channel)."""
         try:
-            waveform, sr = self._load_audio(audio_path)
-            feats = self._extract_features(waveform, sr)
-            pred = self._heuristic_classify(feats)
-            return {"label": pred.label, "confidence": pred.confidence, **feats}
+            with stage("speech", "decode"):
+                waveform, sr = self._prepare_array(waveform, sr)
+            record_path("speech", "decode", "array")
+            return self._analyze_waveform(waveform, sr)
+        except Exception:
+            record_path("speech", "inference", "default")
+            return {"label": "neutral", "confidence": 0.5}
+
+    def _analyze_source(self, source: AudioSource) -> Dict[str, float | str]:
+        try:
+            waveform, sr = self._load_audio(source)
+            return self._analyze_waveform(waveform, sr)
         except Exception:
-            return {"label": "neutral", "confidence": 0.5}
\ No newline at end of file
+            record_path("speech", "inference", "default")
+            return {"label": "neutral", "confidence": 0.5}
+
+    def _analyze_waveform(self, waveform: np.ndarray, sr: int) -> Dict[str, float | str]:
+        feats = self._extract_features(waveform, sr)
+        with stage("speech", "inference"):
+            record_path("speech", "inference", "heuristic")
+            pred = self._heuristic_classify(feats)
+        return {"label": pred.label, "confidence": pred.confidence, **feats}
+
+    def analyze_stream(
+        self,
+        chunks: Iterable[PCMChunk],
+        window_seconds: float = 2.0,
+        emit_every_seconds: float = 0.5,
+    ) -> Iterator[Dict[str, float | str]]:
+        """
+        Yields a rolling emotion estimate while PCM chunks (at `target_sr`) arrive.
+        Memory stays constant regardless of how long the stream runs.
+        """
+        stream = StreamingSpeechAnalyzer(self, window_seconds, emit_every_seconds)
+        for chunk in chunks:
+            yield from stream.push(chunk)
+        yield from stream.flush()
+
+
+class StreamingSpeechAnalyzer:
+    """
+    Incremental counterpart of `SpeechEmotionAnalyzer` for live audio.
+    Each complete 2048-sample frame is analyzed once as it arrives; per-frame
+    features are kept in a fixed-size ring covering `window_seconds`, and a
+    label for that window is emitted every `emit_every_seconds`. Only a
+    partial frame of samples is carried between chunks, so peak memory does
+    not depend on the recording length. Integer PCM or raw int16 bytes are
+    scaled to [-1, 1]; byte chunks may split a sample (e.g. socket reads of
+    odd length), the trailing odd byte is carried to the next `push`.
+    """
+
+    def __init__(
+        self,
+        analyzer: Optional[SpeechEmotionAnalyzer] = None,
+        window_seconds: float = 2.0,
+        emit_every_seconds: float = 0.5,
+    ) -> None:
+        import numpy as np
+
+        from audio_features import FRAME_LENGTH, HOP_LENGTH
+
+        self.analyzer = analyzer or SpeechEmotionAnalyzer()
+        self.sr = self.analyzer.target_sr
+        self._frame_length = FRAME_LENGTH
+        self._hop_length = HOP_LENGTH
+        self._window_frames = max(1, int(round(window_seconds * self.sr / HOP_LENGTH)))
+        self._emit_every = max(1, int(round(emit_every_seconds * self.sr / HOP_LENGTH)))
+        self._ring = np.zeros((self._window_frames, 3), dtype=np.float64)
+        self._ring_pos = 0
+        self._ring_count = 0
+        self._pending = np.zeros(0, dtype=np.float32)
+        self._odd_byte = b""
+        self._frames_seen = 0
+        self._totals = np.zeros(3, dtype=np.float64)
+
+    def push(self, chunk: PCMChunk) -> List[Dict[str, float | str]]:
+        import numpy as np
+
+        from audio_features import frame_features, frame_signal
+
+        if isinstance(chunk, (bytes, bytearray, memoryview)):
+            chunk = memoryview(chunk).cast("B")
+            if self._odd_byte:
+                chunk = memoryview(self._odd_byte + chunk.tobytes())
+            whole = len(chunk) - len(chunk) % 2
+            self._odd_byte = chunk[whole:].tobytes()
+            chunk = chunk[:whole]
+        samples = _pcm_to_float(chunk)
+        buf = np.concatenate([self._pending, samples]) if self._pending.size else samples
+        frames = frame_signal(buf, self._frame_length, self._hop_length)
+        n_frames = frames.shape[0]
+        emitted: List[Dict[str, float | str]] = []
+        if n_frames:
+            feats = frame_features(frames, self.sr)
+            stacked = np.stack([feats["rms"], feats["centroid"], feats["zcr"]], axis=1)
+            for row in stacked:
+                self._ring[self._ring_pos] = row
+                self._ring_pos = (self._ring_pos + 1) % self._window_frames
+                self._ring_count = min(self._ring_count + 1, self._window_frames)
+                self._totals += row
+                self._frames_seen += 1
+                if self._frames_seen % self._emit_every == 0:
+                    emitted.append(self._emit())
+            # Keep only the samples the next frame still needs
+            buf = buf[n_frames * self._hop_length:]
+        self._pending = np.array(buf, dtype=np.float32, copy=True)
+        return emitted
+
+    def flush(self) -> List[Dict[str, float | str]]:
+        """
+        Emits a final estimate for frames not yet reported. Samples after the
+        last complete frame (fewer than one frame length) and a dangling odd
+        byte are dropped; they are too short for a stable estimate.
+        """
+        if self._ring_count and self._frames_seen % self._emit_every:
+            return [self._emit()]
+        return []
+
+    def summary(self) -> Dict[str, float | str]:
+        """Estimate over the whole stream so far, from running feature means."""
+        if not self._frames_seen:
+            return {"label": "neutral", "confidence": 0.5}
+        means = self._totals / self._frames_seen
+        return self._classify(means, 0.0, self._frames_seen)
+
+    def _emit(self) -> Dict[str, float | str]:
+        means = self._ring[: self._ring_count].mean(axis=0)
+        start_frame = self._frames_seen - self._ring_count
+        return self._classify(means, start_frame * self._hop_length / self.sr, self._frames_seen)
+
+    def _classify(self, means: np.ndarray, start: float, end_frame: int) -> Dict[str, float | str]:
+        feats = {"rms": float(means[0]), "centroid": float(means[1]), "zcr": float(means[2])}
+        pred = self.analyzer._heuristic_classify(feats)
+        end = ((end_frame - 1) * self._hop_length + self._frame_length) / self.sr
+        return {"label": pred.label, "confidence": pred.confidence, "start": start, "end": end, **feats}
+
+
+def _pcm_to_float(chunk: PCMChunk) -> np.ndarray:
+    import numpy as np
+
+    if isinstance(chunk, (bytes, bytearray, memoryview)):
+        chunk = np.frombuffer(chunk, dtype="<i2")
+    chunk = np.asarray(chunk)
+    # Scale before averaging channels; the mean of integer PCM is already float
+    if np.issubdtype(chunk.dtype, np.integer):
+        chunk = chunk.astype(np.float32) / float(np.iinfo(chunk.dtype).max)
+    else:
+        chunk = chunk.astype(np.float32, copy=False)
+    if chunk.ndim > 1:
+        # (samples, channels), as interleaved PCM is laid out
+        chunk = chunk.mean(axis=-1, dtype=np.float32)
+    return chunk
@@ -1,10 +1,24 @@
 from __future__ import annotations
 
+import os
+import re
+import threading
+from bisect import bisect_right
 from dataclasses import dataclass
-from typing import Dict, Optional
+from typing import TYPE_CHECKING, Dict, List, Optional, Sequence, Tuple
+
+from metrics import record_path, stage
+
+if TYPE_CHECKING:
+    from result_cache import ResultCache
 
 # Lazy imports inside methods to avoid heavy downloads at import time
 
+# A commonly used emotion model; downloads on first use
+EMOTION_MODEL_ID = "j-hartmann/emotion-english-distilroberta-base"
+# "keywords" disables the emotion model and always uses the keyword fallback
+EMOTION_BACKENDS = ("torch", "torch-int8", "onnx", "keywords")
+
 
 @dataclass
 class ClassificationResult:
@@ -17,15 +31,49 @@ class TextAnalyzer:
     Performs sentiment and emotion classification on text.
     - Sentiment: Uses NLTK VADER (lightweight, offline)
     - Emotion: Tries a transformers pipeline; falls back to a simple heuristic
+    The emotion model is read from `model_path` (a local directory, see
+    `prepare_local_model`) or the hub. `offline=True` never touches the network.
+    `backend` selects fp32 torch, dynamic-int8-quantized torch, or ONNX Runtime
+    (via optimum; uses `model.onnx` from the model directory, exporting and saving
+    it there on first load if missing and the directory is writable).
     """
 
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        cache: Optional["ResultCache"] = None,
+        model_path: Optional[str] = None,
+        offline: bool = False,
+        backend: str = "torch",
+    ) -> None:
+        if backend not in EMOTION_BACKENDS:
+            raise ValueError(f"Unknown emotion backend '{backend}'; expected one of {EMOTION_BACKENDS}.")
+        self._cache = cache
+        self.model_path = model_path
+        self.offline = offline
+        self.backend = backend
         self._vader: Optional[object] = None
         self._emotion_pipe: Optional[object] = None
+        self._model_fingerprint = ""
+        # Load each resource at most once, even when it fails (e.g. offline nodes)
+        self._vader_loaded = False
+        self._emotion_loaded = False
+        self._load_lock = threading.Lock()
+
+    def warmup(self) -> None:
+        """Load VADER and the emotion pipeline eagerly and run one tiny inference."""
+        self.analyze_sentiment("warmup")
+        self.analyze_emotion("warmup")
 
     def _ensure_vader(self) -> None:
-        if self._vader is not None:
+        if self._vader_loaded:
             return
+        with self._load_lock:
+            if not self._vader_loaded:
+                with stage("text", "load"):
+                    self._load_vader()
+                self._vader_loaded = True
+
+    def _load_vader(self) -> None:
         try:
             import nltk
             from nltk.sentiment import SentimentIntensityAnalyzer
@@ -33,85 +81,480 @@ class TextAnalyzer:
             try:
                 nltk.data.find("sentiment/vader_lexicon.zip")
             except LookupError:
-                try:
-                    nltk.download("vader_lexicon", quiet=True)
-                except Exception:
-                    pass
+                if not self.offline:
+                    try:
+                        nltk.download("vader_lexicon", quiet=True)
+                    except Exception:
+                        pass
             self._vader = SentimentIntensityAnalyzer()
         except Exception:
             self._vader = None
 
     def _ensure_emotion_pipe(self) -> None:
-        if self._emotion_pipe is not None:
+        if self._emotion_loaded:
+            return
+        with self._load_lock:
+            if not self._emotion_loaded:
+                with stage("text", "load"):
+                    self._load_emotion_pipe()
+                self._emotion_loaded = True
+
+    def _load_emotion_pipe(self) -> None:
+        if self.backend == "keywords":
+            self._emotion_pipe = None
             return
         try:
-            from transformers import pipeline  # type: ignore
-            # A commonly used emotion model; downloads on first use
-            model_id = "j-hartmann/emotion-english-distilroberta-base"
-            self._emotion_pipe = pipeline("text-classification", model=model_id, top_k=None)
+            from transformers import AutoTokenizer, pipeline  # type: ignore
+
+            source = self.model_path or EMOTION_MODEL_ID
+            tokenizer = AutoTokenizer.from_pretrained(source, local_files_only=self.offline)
+            model = _load_emotion_model(source, self.backend, self.offline)
+            self._emotion_pipe = pipeline("text-classification", model=model, tokenizer=tokenizer, top_k=None)
+            # After loading: the ONNX backend may have just saved model.onnx into the directory
+            self._model_fingerprint = _model_fingerprint(source)
         except Exception:
             self._emotion_pipe = None
 
     def analyze_sentiment(self, text: str) -> ClassificationResult:
         self._ensure_vader()
-        if self._vader is None:
-            # Minimal fallback: classify by simple polarity keywords
-            lowered = text.lower()
-            positive_cues = ["good", "great", "love", "excellent", "awesome", "happy"]
-            negative_cues = ["bad", "terrible", "hate", "awful", "worst", "sad"]
-            pos_hits = sum(cue in lowered for cue in positive_cues)
-            neg_hits = sum(cue in lowered for cue in negative_cues)
-            if pos_hits > neg_hits:
-                return ClassificationResult("positive", 0.55)
-            if neg_hits > pos_hits:
-                return ClassificationResult("negative", 0.55)
-            return ClassificationResult("neutral", 0.5)
-
-        scores = self._vader.polarity_scores(text)
-        compound = scores.get("compound", 0.0)
-        if compound >= 0.05:
-            return ClassificationResult("positive", float(min(1.0, max(0.5, compound))))
-        if compound <= -0.05:
-            return ClassificationResult("negative", float(min(1.0, max(0.5, -compound))))
-        return ClassificationResult("neutral", float(1.0 - abs(compound)))
+        with stage("text", "sentiment"):
+            if self._vader is None:
+                # Minimal fallback: classify by simple polarity keywords
+                record_path("text", "sentiment", "keywords")
+                return _keyword_sentiment(_SENTIMENT_MATCHER.counts(text.lower()))
+            record_path("text", "sentiment", "vader")
+            return _vader_result(self._vader.polarity_scores(text))
 
     def analyze_emotion(self, text: str) -> ClassificationResult:
         self._ensure_emotion_pipe()
-        if self._emotion_pipe is None:
-            # Heuristic fallback based on keywords
-            lowered = text.lower()
-            heuristics = [
-                ("joy", ["happy", "joy", "glad", "excited", "love", "great"]),
-                ("sadness", ["sad", "down", "unhappy", "depressed", "cry"]),
-                ("anger", ["angry", "mad", "furious", "rage", "annoyed"]),
-                ("fear", ["afraid", "scared", "fear", "anxious", "nervous"]),
-                ("disgust", ["disgust", "gross", "repuls", "nausea"]),
-                ("surprise", ["surprise", "shocked", "astonished", "wow"]),
-            ]
-            for label, cues in heuristics:
-                if any(cue in lowered for cue in cues):
-                    return ClassificationResult(label, 0.55)
-            return ClassificationResult("neutral", 0.5)
+        with stage("text", "emotion"):
+            if self._emotion_pipe is None:
+                # Heuristic fallback based on keywords
+                record_path("text", "emotion", "keywords")
+                return _keyword_emotion(_EMOTION_MATCHER.counts(text.lower()))
 
-        try:
-            outputs = self._emotion_pipe(text, truncation=True)
-            # pipeline with top_k=None returns list of dicts per item; handle both shapes
-            if isinstance(outputs, list) and len(outputs) > 0:
-                result = outputs[0] if isinstance(outputs[0], dict) else outputs[0][0]
+            try:
+                outputs = self._emotion_pipe(text, truncation=True)
+                # pipeline with top_k=None returns list of dicts per item; handle both shapes
+                result = _top_emotion(outputs[0]) if isinstance(outputs, list) and len(outputs) > 0 else None
+            except Exception:
+                record_path("text", "emotion", "error")
+                return ClassificationResult("neutral", 0.5)
+            record_path("text", "emotion", "model")
+            return result or ClassificationResult("neutral", 0.5)
+
+    def cache_namespace(self) -> str:
+        """Identifies the loaded backends so cached results never outlive a model change."""
+        self._ensure_vader()
+        self._ensure_emotion_pipe()
+        sentiment = "vader" if self._vader is not None else "keywords"
+        if self._emotion_pipe is not None:
+            emotion = f"{self.model_path or EMOTION_MODEL_ID}:{self.backend}:{self._model_fingerprint}"
+        else:
+            emotion = "keywords"
+        return f"text:v1:{sentiment}:{emotion}"
+
+    def analyze_emotion_chunked(
+        self,
+        text: str,
+        max_tokens: Optional[int] = None,
+        overlap: int = 64,
+        aggregate: str = "mean",
+    ) -> Dict[str, object]:
+        """
+        Scores a long document without truncating it: the text is split into
+        overlapping token windows, all windows go through the model in one
+        batch, and the per-label scores are combined with `aggregate`
+        ("mean", "max" or "length" for a token-count weighted mean).
+        Per-chunk results (with character spans) are returned under "chunks"
+        to expose emotional shifts within the document. Raises ValueError when
+        `max_tokens` leaves no room for text next to the special tokens or
+        `overlap` is negative; the overlap is capped at half the text window.
+        """
+        if aggregate not in _AGGREGATES:
+            raise ValueError(f"Unknown aggregate '{aggregate}'; expected one of {_AGGREGATES}.")
+        if max_tokens is not None and max_tokens < 1:
+            raise ValueError(f"max_tokens must be positive, got {max_tokens}.")
+        if overlap < 0:
+            raise ValueError(f"overlap must not be negative, got {overlap}.")
+        self._ensure_emotion_pipe()
+        chunks: List[Dict[str, object]] = []
+        with stage("text", "emotion"):
+            if self._emotion_pipe is not None:
+                # Outside the fallback: a bad window is the caller's error, not a model failure
+                max_length, stride = self._chunk_window(max_tokens, overlap)
+                try:
+                    chunks = self._model_chunks(text, max_length, stride)
+                except Exception:
+                    chunks = []
+            if chunks:
+                record_path("text", "emotion", "model")
             else:
-                result = {"label": "neutral", "score": 0.5}
-            label = str(result.get("label", "neutral")).lower()
-            score = float(result.get("score", 0.5))
-            return ClassificationResult(label, score)
-        except Exception:
-            return ClassificationResult("neutral", 0.5)
+                record_path("text", "emotion", "keywords")
+                chunks = _keyword_chunks(text, max_tokens or 128, overlap)
 
+        labels = list(chunks[0]["scores"])  # type: ignore[union-attr]
+        matrix = [[float(c["scores"][label]) for label in labels] for c in chunks]  # type: ignore[index]
+        if aggregate == "max":
+            combined = [max(col) for col in zip(*matrix)]
+        else:
+            weights = [float(c["length"]) if aggregate == "length" else 1.0 for c in chunks]
+            total = sum(weights) or 1.0
+            combined = [sum(w * v for w, v in zip(weights, col)) / total for col in zip(*matrix)]
+        scores = dict(zip(labels, combined))
+        label = max(scores, key=scores.get)  # type: ignore[arg-type]
+        return {"label": label, "confidence": scores[label], "scores": scores, "chunks": chunks}
 
-def analyze_text(text: str) -> Dict[str, Dict[str, float | str]]:
-    analyzer = TextAnalyzer()
-    sentiment = analyzer.analyze_sentiment(text)
-    emotion = analyzer.analyze_emotion(text)
+    def _chunk_window(self, max_tokens: Optional[int], overlap: int) -> Tuple[int, int]:
+        """(max_length, stride) for the tokenizer; the stride must stay below the text tokens per window."""
+        tokenizer = self._emotion_pipe.tokenizer  # type: ignore[attr-defined]
+        model = self._emotion_pipe.model  # type: ignore[attr-defined]
+        limit = min(
+            int(getattr(tokenizer, "model_max_length", 512) or 512),
+            int(getattr(model.config, "max_position_embeddings", 514)) - 2,
+            512,
+        )
+        max_length = min(max_tokens or limit, limit)
+        specials = int(tokenizer.num_special_tokens_to_add())
+        content = max_length - specials
+        if content < 1:
+            raise ValueError(
+                f"max_tokens={max_length} leaves no room for text next to {specials} special tokens."
+            )
+        # content // 2 < content, which the fast tokenizer requires (it panics otherwise)
+        return max_length, min(overlap, content // 2)
+
+    def _model_chunks(self, text: str, max_length: int, stride: int) -> List[Dict[str, object]]:
+        import torch
+
+        tokenizer = self._emotion_pipe.tokenizer  # type: ignore[attr-defined]
+        model = self._emotion_pipe.model  # type: ignore[attr-defined]
+        encoded = tokenizer(
+            text,
+            truncation=True,
+            max_length=max_length,
+            stride=stride,
+            return_overflowing_tokens=True,
+            return_offsets_mapping=True,
+            padding=True,
+            return_tensors="pt",
+        )
+        offsets = encoded.pop("offset_mapping")
+        encoded.pop("overflow_to_sample_mapping", None)
+        with torch.inference_mode():
+            logits = model(**encoded).logits
+        probs = torch.softmax(logits.float(), dim=-1).cpu().numpy()
+        id2label = model.config.id2label
+        lengths = encoded["attention_mask"].sum(dim=1).tolist()
+
+        chunks: List[Dict[str, object]] = []
+        for row, spans, length in zip(probs, offsets.tolist(), lengths):
+            # Special and padding tokens map to (0, 0)
+            real = [span for span in spans if span[1] > span[0]]
+            scores = {str(id2label[i]).lower(): float(p) for i, p in enumerate(row)}
+            top = max(scores, key=scores.get)  # type: ignore[arg-type]
+            chunks.append(
+                {
+                    "start": real[0][0] if real else 0,
+                    "end": real[-1][1] if real else 0,
+                    "length": int(length),
+                    "label": top,
+                    "confidence": scores[top],
+                    "scores": scores,
+                }
+            )
+        return chunks
+
+    def analyze(self, text: str) -> Dict[str, Dict[str, float | str]]:
+        if self._cache is None:
+            return self._analyze_uncached(text)
+        return self._cache.get_or_compute(
+            self.cache_namespace(), text.encode("utf-8"), lambda: self._analyze_uncached(text)
+        )
+
+    def _analyze_uncached(self, text: str) -> Dict[str, Dict[str, float | str]]:
+        return _to_dict(self.analyze_sentiment(text), self.analyze_emotion(text))
+
+    def analyze_batch(
+        self,
+        texts: Sequence[str],
+        batch_size: int = 32,
+        padding: bool | str = True,
+    ) -> List[Dict[str, Dict[str, float | str]]]:
+        """
+        Scores many texts at once; the emotion pipeline receives the whole list
+        and batches it internally. With the keyword, fp32 torch and ONNX
+        backends results match calling `analyze` on each text. Under
+        "torch-int8" they can differ slightly (labels may flip on close calls):
+        dynamic quantization derives its activation scales from the padded batch.
+        """
+        texts = list(texts)
+        if not texts:
+            return []
+        if self._cache is None:
+            return self._analyze_batch_uncached(texts, batch_size, padding)
+
+        namespace = self.cache_namespace()
+        keys = [self._cache.make_key(namespace, t.encode("utf-8")) for t in texts]
+        results: List[Optional[Dict[str, Dict[str, float | str]]]] = [self._cache.get(k) for k in keys]
+        missing = [i for i, r in enumerate(results) if r is None]
+        if missing:
+            computed = self._analyze_batch_uncached([texts[i] for i in missing], batch_size, padding)
+            for i, result in zip(missing, computed):
+                self._cache.set(keys[i], result)
+                results[i] = result
+        return results  # type: ignore[return-value]
+
+    def _analyze_batch_uncached(
+        self, texts: List[str], batch_size: int, padding: bool | str
+    ) -> List[Dict[str, Dict[str, float | str]]]:
+        sentiments = self._sentiment_batch(texts)
+        emotions = self._emotion_batch(texts, batch_size, padding)
+        return [_to_dict(s, e) for s, e in zip(sentiments, emotions)]
+
+    def _sentiment_batch(self, texts: List[str]) -> List[ClassificationResult]:
+        self._ensure_vader()
+        with stage("text", "sentiment"):
+            if self._vader is None:
+                record_path("text", "sentiment", "keywords", len(texts))
+                hits = _SENTIMENT_MATCHER.counts_batch([t.lower() for t in texts])
+                return [_keyword_sentiment(h) for h in hits]
+            record_path("text", "sentiment", "vader", len(texts))
+            polarity_scores = self._vader.polarity_scores
+            return [_vader_result(polarity_scores(t)) for t in texts]
+
+    def _emotion_batch(
+        self, texts: List[str], batch_size: int, padding: bool | str
+    ) -> List[ClassificationResult]:
+        self._ensure_emotion_pipe()
+        with stage("text", "emotion"):
+            if self._emotion_pipe is None:
+                record_path("text", "emotion", "keywords", len(texts))
+                hits = _EMOTION_MATCHER.counts_batch([t.lower() for t in texts])
+                return [_keyword_emotion(h) for h in hits]
+
+            try:
+                outputs = self._emotion_pipe(
+                    texts, batch_size=max(1, int(batch_size)), truncation=True, padding=padding
+                )
+                results = [_top_emotion(item) for item in outputs]
+            except Exception:
+                record_path("text", "emotion", "error", len(texts))
+                return [ClassificationResult("neutral", 0.5) for _ in texts]
+            record_path("text", "emotion", "model", len(texts))
+            return results
+
+
+def _model_fingerprint(source: str) -> str:
+    """Total size and newest mtime of a local model directory's files ("" for hub ids)."""
+    if not os.path.isdir(source):
+        return ""
+    size, mtime = 0, 0
+    for entry in os.scandir(source):
+        if entry.is_file():
+            stat = entry.stat()
+            size += stat.st_size
+            mtime = max(mtime, stat.st_mtime_ns)
+    return f"{size}:{mtime}"
+
+
+def _load_emotion_model(source: str, backend: str, offline: bool):
+    if backend == "onnx":
+        from optimum.onnxruntime import ORTModelForSequenceClassification  # type: ignore
+
+        has_onnx = os.path.isfile(os.path.join(source, "model.onnx"))
+        model = ORTModelForSequenceClassification.from_pretrained(
+            source, export=not has_onnx, local_files_only=offline
+        )
+        if not has_onnx and os.path.isdir(source) and os.access(source, os.W_OK):
+            # The export lands in a temp dir; keep it so later cold starts skip re-exporting.
+            # Hub ids (or read-only dirs) re-export each start: use prepare_local_model(onnx=True)
+            model.save_pretrained(source)
+        return model
+
+    from transformers import AutoModelForSequenceClassification  # type: ignore
+
+    model = AutoModelForSequenceClassification.from_pretrained(source, local_files_only=offline)
+    model.eval()
+    if backend == "torch-int8":
+        import torch
+
+        quantization = getattr(torch, "ao", torch).quantization
+        model = quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+    return model
+
+
+def prepare_local_model(target_dir: str, source: str = EMOTION_MODEL_ID, onnx: bool = False) -> str:
+    """
+    Saves the emotion model and tokenizer to `target_dir` so workers can load it
+    with `model_path=target_dir, offline=True`. With `onnx`, also writes
+    `model.onnx` for the ONNX Runtime backend.
+    """
+    from transformers import AutoModelForSequenceClassification, AutoTokenizer  # type: ignore
+
+    os.makedirs(target_dir, exist_ok=True)
+    AutoTokenizer.from_pretrained(source).save_pretrained(target_dir)
+    AutoModelForSequenceClassification.from_pretrained(source).save_pretrained(target_dir)
+    if onnx:
+        from optimum.onnxruntime import ORTModelForSequenceClassification  # type: ignore
+
+        ORTModelForSequenceClassification.from_pretrained(target_dir, export=True).save_pretrained(target_dir)
+    return target_dir
+
+
+class _KeywordMatcher:
+    """
+    Counts cue occurrences for every label in a single pass over the text.
+    All cues are compiled into one regex alternation (longest cue first, so
+    "unhappy" is not also counted as "happy").
+    """
+
+    def __init__(self, table: Sequence[Tuple[str, Sequence[str]]]) -> None:
+        self.labels = tuple(label for label, _ in table)
+        cue_labels: Dict[str, List[int]] = {}
+        for idx, (_, cues) in enumerate(table):
+            for cue in cues:
+                cue_labels.setdefault(cue, []).append(idx)
+        self._cue_labels = {cue: tuple(idxs) for cue, idxs in cue_labels.items()}
+        ordered = sorted(self._cue_labels, key=len, reverse=True)
+        self._pattern = re.compile("|".join(re.escape(cue) for cue in ordered))
+
+    def counts(self, lowered: str) -> List[int]:
+        hits = [0] * len(self.labels)
+        cue_labels = self._cue_labels
+        for match in self._pattern.finditer(lowered):
+            for idx in cue_labels[match.group()]:
+                hits[idx] += 1
+        return hits
+
+    def counts_batch(self, lowered: Sequence[str]) -> List[List[int]]:
+        # One scan over the joined corpus; match offsets are mapped back to texts
+        sep = "\x00"
+        starts = []
+        offset = 0
+        for text in lowered:
+            starts.append(offset)
+            offset += len(text) + len(sep)
+        hits = [[0] * len(self.labels) for _ in lowered]
+        cue_labels = self._cue_labels
+        for match in self._pattern.finditer(sep.join(lowered)):
+            row = hits[bisect_right(starts, match.start()) - 1]
+            for idx in cue_labels[match.group()]:
+                row[idx] += 1
+        return hits
+
+
+_SENTIMENT_MATCHER = _KeywordMatcher(
+    (
+        ("positive", ("good", "great", "love", "excellent", "awesome", "happy")),
+        ("negative", ("bad", "terrible", "hate", "awful", "worst", "sad", "unhappy")),
+    )
+)
+_EMOTION_MATCHER = _KeywordMatcher(
+    (
+        ("joy", ("happy", "joy", "glad", "excited", "love", "great")),
+        ("sadness", ("sad", "down", "unhappy", "depressed", "cry")),
+        ("anger", ("angry", "mad", "furious", "rage", "annoyed")),
+        ("fear", ("afraid", "scared", "fear", "anxious", "nervous")),
+        ("disgust", ("disgust", "gross", "repuls", "nausea")),
+        ("surprise", ("surprise", "shocked", "astonished", "wow")),
+    )
+)
+
+
+def _graded_confidence(top_hits: int, total_hits: int) -> float:
+    # Grows with the number of hits and with how dominant the winning label is;
+    # a single unopposed hit scores 0.55 and the value saturates below 0.9
+    share = top_hits / total_hits
+    return 0.5 + 0.4 * share * (1.0 - 0.875 ** top_hits)
+
+
+def _keyword_sentiment(hits: Sequence[int]) -> ClassificationResult:
+    pos_hits, neg_hits = hits
+    total = pos_hits + neg_hits
+    if pos_hits > neg_hits:
+        return ClassificationResult("positive", _graded_confidence(pos_hits, total))
+    if neg_hits > pos_hits:
+        return ClassificationResult("negative", _graded_confidence(neg_hits, total))
+    return ClassificationResult("neutral", 0.5)
+
+
+def _keyword_emotion(hits: Sequence[int]) -> ClassificationResult:
+    top = max(hits)
+    if top == 0:
+        return ClassificationResult("neutral", 0.5)
+    # Ties go to the label listed first in the table
+    label = _EMOTION_MATCHER.labels[hits.index(top)]
+    return ClassificationResult(label, _graded_confidence(top, sum(hits)))
+
+
+_AGGREGATES = ("mean", "max", "length")
+
+
+def _keyword_chunks(text: str, window: int, overlap: int) -> List[Dict[str, object]]:
+    """Word-window chunks scored by the keyword matcher, for when no model is loaded."""
+    words = [m.span() for m in re.finditer(r"\S+", text)] or [(0, 0)]
+    step = max(1, window - min(overlap, window // 2))
+    labels = _EMOTION_MATCHER.labels + ("neutral",)
+    chunks: List[Dict[str, object]] = []
+    for first in range(0, len(words), step):
+        span = words[first : first + window]
+        start, end = span[0][0], span[-1][1]
+        hits = _EMOTION_MATCHER.counts(text[start:end].lower())
+        total = sum(hits)
+        result = _keyword_emotion(hits)
+        scores = {label: (count / total if total else 0.0) for label, count in zip(labels, hits)}
+        scores["neutral"] = 0.0 if total else 1.0
+        chunks.append(
+            {
+                "start": start,
+                "end": end,
+                "length": len(span),
+                "label": result.label,
+                "confidence": result.confidence,
+                "scores": scores,
+            }
+        )
+        if first + window >= len(words):
+            break
+    return chunks
+
+
+def _vader_result(scores: Dict[str, float]) -> ClassificationResult:
+    compound = scores.get("compound", 0.0)
+    if compound >= 0.05:
+        return ClassificationResult("positive", float(min(1.0, max(0.5, compound))))
+    if compound <= -0.05:
+        return ClassificationResult("negative", float(min(1.0, max(0.5, -compound))))
+    return ClassificationResult("neutral", float(1.0 - abs(compound)))
+
+
+def _top_emotion(output: object) -> ClassificationResult:
+    # A single item is either the top dict or a score-sorted list of dicts (top_k=None)
+    result = output if isinstance(output, dict) else output[0]  # type: ignore[index]
+    label = str(result.get("label", "neutral")).lower()
+    score = float(result.get("score", 0.5))
+    return ClassificationResult(label, score)
+
+
+def _to_dict(sentiment: ClassificationResult, emotion: ClassificationResult) -> Dict[str, Dict[str, float | str]]:
     return {
         "sentiment": {"label": sentiment.label, "confidence": sentiment.confidence},
         "emotion": {"label": emotion.label, "confidence": emotion.confidence},
-    }
\ No newline at end of file
+    }
+
+
+def analyze_text(text: str) -> Dict[str, Dict[str, float | str]]:
+    from registry import get_analyzer
+
+    analyzer: TextAnalyzer = get_analyzer("text")
+    return analyzer.analyze(text)
+
+
+def analyze_texts(
+    texts: Sequence[str], batch_size: int = 32
+) -> List[Dict[str, Dict[str, float | str]]]:
+    from registry import get_analyzer
+
+    analyzer: TextAnalyzer = get_analyzer("text")
+    return analyzer.analyze_batch(texts, batch_size=batch_size)
@@ -0,0 +1,47 @@
+import os
+import shutil
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+EMOTION_LABELS = ("anger", "disgust", "fear", "joy", "neutral", "sadness", "surprise")
+
+
+@pytest.fixture(scope="session")
+def _tiny_text_model_dir(tmp_path_factory):
+    """A randomly initialized one-layer BERT emotion classifier with a word-level vocab, saved locally."""
+    pytest.importorskip("torch")
+    transformers = pytest.importorskip("transformers")
+    import torch
+
+    path = str(tmp_path_factory.mktemp("tiny-text-model"))
+    words = "i am so happy sad angry scared today the meeting is at three great news but also little worried".split()
+    vocab = ["[PAD]", "[UNK]", "[CLS]", "[SEP]", "[MASK]"]
+    vocab += sorted(set(words) | set("abcdefghijklmnopqrstuvwxyz") - set(vocab))
+    with open(os.path.join(path, "vocab.txt"), "w", encoding="utf-8") as fh:
+        fh.write("\n".join(vocab) + "\n")
+    transformers.BertTokenizerFast(vocab_file=os.path.join(path, "vocab.txt"), model_max_length=64).save_pretrained(path)
+    config = transformers.BertConfig(
+        vocab_size=len(vocab),
+        hidden_size=16,
+        num_hidden_layers=1,
+        num_attention_heads=2,
+        intermediate_size=32,
+        max_position_embeddings=66,
+        num_labels=len(EMOTION_LABELS),
+        id2label=dict(enumerate(EMOTION_LABELS)),
+        label2id={label: i for i, label in enumerate(EMOTION_LABELS)},
+    )
+    torch.manual_seed(0)
+    transformers.BertForSequenceClassification(config).save_pretrained(path)
+    return path
+
+
+@pytest.fixture
+def tiny_text_model(_tiny_text_model_dir, tmp_path):
+    """Fresh copy of the tiny local emotion model per test (tests may write model.onnx into it)."""
+    path = str(tmp_path / "model")
+    shutil.copytree(_tiny_text_model_dir, path)
+    return path
@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from audio_features import extract_features
+
+SR = 16000
+
+
+def _tone(freq: float = 220.0, seconds: float = 2.0, seed: int = 0) -> np.ndarray:
+    t = np.arange(int(SR * seconds)) / SR
+    rng = np.random.default_rng(seed)
+    # A little noise keeps the centroid and ZCR away from degenerate values
+    return (0.4 * np.sin(2 * np.pi * freq * t) + 0.01 * rng.standard_normal(t.size)).astype(np.float32)
+
+
+@pytest.mark.parametrize("freq", [110.0, 220.0, 440.0])
+def test_pitch_of_a_sine(freq):
+    feats = extract_features(_tone(freq), SR, pitch=True)
+    assert feats["pitch"] == pytest.approx(freq, rel=0.01)
+    assert feats["voiced_ratio"] > 0.9
+
+
+def test_pitch_matches_librosa_yin():
+    librosa = pytest.importorskip("librosa")
+    y = _tone(220.0)
+    reference = float(np.median(librosa.yin(y, fmin=65.0, fmax=1000.0, sr=SR)))
+    assert extract_features(y, SR, pitch=True)["pitch"] == pytest.approx(reference, rel=0.01)
+
+
+def test_silence_is_unvoiced():
+    feats = extract_features(np.zeros(SR, dtype=np.float32), SR, pitch=True)
+    assert feats["pitch"] == 0.0 and feats["voiced_ratio"] == 0.0
+
+
+def test_matches_librosa_features():
+    librosa = pytest.importorskip("librosa")
+    y = _tone(220.0)
+    feats = extract_features(y, SR, n_mfcc=13)
+    assert feats["rms"] == pytest.approx(float(np.mean(librosa.feature.rms(y=y))), rel=1e-5)
+    assert feats["centroid"] == pytest.approx(float(np.mean(librosa.feature.spectral_centroid(y=y, sr=SR))), rel=1e-5)
+    assert feats["zcr"] == pytest.approx(float(np.mean(librosa.feature.zero_crossing_rate(y))), rel=1e-5)
+    mfcc = librosa.feature.mfcc(y=y, sr=SR, n_mfcc=13).mean(axis=1)
+    np.testing.assert_allclose(feats["mfcc"], mfcc, rtol=1e-4, atol=1e-3)
+
+
+def test_empty_signal():
+    feats = extract_features(np.zeros(0, dtype=np.float32), SR, n_mfcc=4, pitch=True)
+    assert feats == {"rms": 0.0, "centroid": 0.0, "zcr": 0.0, "mfcc": [0.0] * 4, "pitch": 0.0, "voiced_ratio": 0.0}
@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+import json
+import os
+
+import pytest
+
+pytest.importorskip("tqdm")
+
+import batch_runner
+
+
+def _read_jsonl(path):
+    if not os.path.exists(path):
+        return []
+    with open(path, "r", encoding="utf-8") as fh:
+        return [json.loads(line) for line in fh if line.strip()]
+
+
+def _run(source, output):
+    return batch_runner.run([str(source)], str(output), workers=1, batch_size=4, preload_names=("mood",), progress=False)
+
+
+def test_missing_input_is_an_error_and_retried_on_resume(tmp_path, monkeypatch):
+    monkeypatch.setenv("MOOD_OFFLINE", "1")
+    monkeypatch.setenv("MOOD_TEXT_BACKEND", "keywords")
+    source = tmp_path / "entries.jsonl"
+    source.write_text(
+        json.dumps({"id": "ok", "text": "what a happy day"}) + "\n"
+        + json.dumps({"id": "gone", "text": "fine", "audio": "missing.wav"}) + "\n",
+        encoding="utf-8",
+    )
+    output = tmp_path / "results.jsonl"
+    errors_path = str(output) + ".errors.jsonl"
+
+    assert _run(source, output) == {"done": 1, "skipped": 0, "failed": 1}
+    assert [r["id"] for r in _read_jsonl(output)] == ["ok"]
+    errors = _read_jsonl(errors_path)
+    assert [r["id"] for r in errors] == ["gone"]
+    assert "FileNotFoundError" in errors[0]["errors"]["speech"]
+    assert batch_runner.load_checkpoint(str(output) + ".checkpoint") == {"ok"}
+
+    # Still missing: retried, and fails again
+    assert _run(source, output) == {"done": 0, "skipped": 1, "failed": 1}
+    assert len(_read_jsonl(errors_path)) == 2
+
+    # Once the file exists the record completes
+    (tmp_path / "missing.wav").write_bytes(b"")
+    assert _run(source, output) == {"done": 1, "skipped": 1, "failed": 0}
+    assert batch_runner.load_checkpoint(str(output) + ".checkpoint") == {"ok", "gone"}
+    assert [r["id"] for r in _read_jsonl(output)] == ["ok", "gone"]
+
+
+def test_unreadable_paths_are_reported(tmp_path):
+    present = tmp_path / "clip.wav"
+    present.write_bytes(b"RIFF")
+    assert batch_runner._input_error(str(present)) is None
+    assert batch_runner._input_error(str(tmp_path / "nope.wav")).startswith("FileNotFoundError")
+    assert batch_runner._input_error(str(tmp_path)).startswith("FileNotFoundError")
@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+import threading
+
+from diary_store import DiaryStore
+
+
+def _entry(mood, score):
+    return {"text": "x", "mood": {"mood": mood, "score": score, "confidence": 0.7}}
+
+
+def test_memory_store_has_schema_on_every_thread():
+    store = DiaryStore(":memory:")
+    store.append("main", _entry("calm", 0.4), timestamp=1000.0)
+    results, errors = {}, []
+
+    def worker(i):
+        try:
+            user = f"user{i}"
+            for k in range(5):
+                store.append(user, _entry("stressed", -0.5), timestamp=1000.0 + k)
+            results[i] = (store.count(user), len(store.query(user).entries), store.trends(user))
+        except Exception as e:  # surfaced below; pytest does not see thread exceptions
+            errors.append(e)
+        finally:
+            store.close()
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert errors == []
+    assert sorted(results) == [0, 1, 2, 3]
+    assert all(count == 5 and page == 5 for count, page, _ in results.values())
+    assert store.count("main") == 1
+
+
+def test_file_store_is_shared_across_threads(tmp_path):
+    store = DiaryStore(str(tmp_path / "diary.sqlite"))
+    store.append("u", _entry("calm", 0.4), timestamp=1000.0)
+    seen = []
+    thread = threading.Thread(target=lambda: (seen.append(store.count("u")), store.close()))
+    thread.start()
+    thread.join()
+    assert seen == [1]
@@ -0,0 +1,105 @@
+"""
+Face age/emotion head on a tiny randomly initialized model (build_model(seed=...)),
+so the tests need no network or downloaded weights.
+"""
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+torch = pytest.importorskip("torch")
+Image = pytest.importorskip("PIL.Image")
+
+from face_analysis import FaceAnalyzer  # noqa: E402
+from face_attributes import (  # noqa: E402
+    EMOTION_LABELS,
+    PLACEHOLDER_PREDICTION,
+    AgeEmotionClassifier,
+    build_model,
+    export_onnx,
+    preprocess,
+    save_checkpoint,
+)
+
+
+def _crops(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return [Image.fromarray(rng.integers(0, 256, (40 + 8 * i, 32 + 4 * i, 3), dtype=np.uint8)) for i in range(n)]
+
+
+@pytest.fixture(scope="module")
+def model():
+    return build_model(width=8, seed=0)
+
+
+@pytest.fixture(scope="module")
+def checkpoint(model, tmp_path_factory):
+    path = str(tmp_path_factory.mktemp("head") / "head.pt")
+    save_checkpoint(model, path)
+    return path
+
+
+def test_torch_and_onnx_agree(model, checkpoint, tmp_path):
+    ort = pytest.importorskip("onnxruntime")
+    onnx_path = export_onnx(model, str(tmp_path / "head.onnx"))
+    batch = preprocess(_crops(4))
+    with torch.inference_mode():
+        expected = model(torch.from_numpy(batch)).numpy()
+    session = ort.InferenceSession(onnx_path, providers=["CPUExecutionProvider"])
+    actual = session.run(None, {session.get_inputs()[0].name: batch})[0]
+    np.testing.assert_allclose(actual, expected, rtol=1e-4, atol=1e-5)
+
+    from_torch = AgeEmotionClassifier("torch", checkpoint).predict(_crops(4))
+    from_onnx = AgeEmotionClassifier("onnxruntime", onnx_path).predict(_crops(4))
+    for (age_t, age_conf_t, emo_t, emo_conf_t), (age_o, age_conf_o, emo_o, emo_conf_o) in zip(from_torch, from_onnx):
+        assert (age_t, emo_t) == (age_o, emo_o)
+        assert age_conf_t == pytest.approx(age_conf_o, abs=1e-4)
+        assert emo_conf_t == pytest.approx(emo_conf_o, abs=1e-4)
+
+
+def test_int8_export_loads_and_runs(model, tmp_path):
+    pytest.importorskip("onnxruntime")
+    quantized = export_onnx(model, str(tmp_path / "head.onnx"), quantize=True)
+    assert quantized.endswith(".int8.onnx")
+    head = AgeEmotionClassifier("onnxruntime", quantized, num_threads=1)
+    predictions = head.predict(_crops(3))
+    assert head.available and head.version.startswith("onnxruntime:head.int8.onnx:")
+    assert len(predictions) == 3
+    for age, age_conf, emotion, emotion_conf in predictions:
+        assert 0 <= age <= 100 and emotion in EMOTION_LABELS
+        assert 0.0 < age_conf <= 1.0 and 0.0 < emotion_conf <= 1.0
+
+
+def test_crops_share_one_forward_pass(model):
+    batch_sizes = []
+    handle = model.register_forward_hook(lambda module, inputs, output: batch_sizes.append(inputs[0].shape[0]))
+    try:
+        predictions = AgeEmotionClassifier("torch", model=model).predict(_crops(5))
+    finally:
+        handle.remove()
+    assert batch_sizes == [5]
+    assert len(predictions) == 5
+
+
+@pytest.mark.parametrize("backend", ["torch", "onnxruntime"])
+def test_bad_model_path_falls_back_to_placeholder(backend, tmp_path):
+    head = AgeEmotionClassifier(backend, str(tmp_path / "missing.bin"))
+    assert head.predict(_crops(2)) == [PLACEHOLDER_PREDICTION, PLACEHOLDER_PREDICTION]
+    assert not head.available
+    assert head.version == "placeholder"
+
+
+def test_loading_torch_head_keeps_process_thread_count(checkpoint):
+    before = torch.get_num_threads()
+    head = AgeEmotionClassifier("torch", checkpoint, num_threads=before + 1)
+    assert head.available
+    assert torch.get_num_threads() == before
+
+
+def test_face_analyzer_wires_attribute_backend(checkpoint):
+    analyzer = FaceAnalyzer(cache=None, attribute_backend="torch", attribute_model_path=checkpoint, attribute_threads=1)
+    head = analyzer._attributes
+    assert (head.backend, head.model_path, head.num_threads) == ("torch", checkpoint, 1)
+    crops = _crops(2)
+    assert analyzer._age_emotion_batch(crops) == AgeEmotionClassifier("torch", checkpoint).predict(crops)
+    assert head.version in analyzer.cache_namespace()
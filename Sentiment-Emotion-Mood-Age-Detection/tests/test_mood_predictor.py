@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+import random
+
+import numpy as np
+import pytest
+
+from mood_predictor import FUSION_WEIGHTS, MOOD_THRESHOLDS, MoodPredictor, to_columns
+
+
+def _labels(modality):
+    # Every weighted label, an unweighted one and a case variant
+    known = list(FUSION_WEIGHTS[modality])
+    return known + ["neutral", "bored", known[0].upper()]
+
+
+def _records(n, seed=0):
+    rng = random.Random(seed)
+    conf = lambda: round(rng.random(), 3)  # noqa: E731
+    records = []
+    for _ in range(n):
+        text = None
+        if rng.random() < 0.8:
+            text = {
+                "sentiment": {"label": rng.choice(_labels("text_sentiment")), "confidence": conf()},
+                "emotion": {"label": rng.choice(_labels("text_emotion")), "confidence": conf()},
+            }
+        speech = {"label": rng.choice(_labels("speech")), "confidence": conf()} if rng.random() < 0.6 else None
+        face = None
+        if rng.random() < 0.6:
+            faces = [{"emotion": rng.choice(_labels("face")), "emotion_confidence": conf()} for _ in range(rng.randint(0, 2))]
+            face = {"faces": faces}
+        records.append((text, speech, face))
+    return records
+
+
+def _assert_same(batch, expected):
+    assert list(batch["mood"]) == [e["mood"] for e in expected]
+    assert list(batch["score"]) == [e["score"] for e in expected]
+    assert list(batch["confidence"]) == [e["confidence"] for e in expected]
+
+
+def test_batch_matches_scalar_on_dict_columns():
+    predictor = MoodPredictor()
+    records = _records(2000)
+    expected = [predictor.predict_mood(*record) for record in records]
+    _assert_same(predictor.predict_mood_batch(to_columns(records)), expected)
+
+
+def test_batch_matches_scalar_on_dataframe():
+    pd = pytest.importorskip("pandas")
+    predictor = MoodPredictor()
+    records = _records(2000, seed=1)
+    expected = [predictor.predict_mood(*record) for record in records]
+    _assert_same(predictor.predict_mood_batch(pd.DataFrame(to_columns(records))), expected)
+
+
+def _sentiment_only(score):
+    label = "positive" if score >= 0 else "negative"
+    return ({"sentiment": {"label": label, "confidence": abs(score)}}, None, None)
+
+
+@pytest.mark.parametrize("op, threshold, mood", MOOD_THRESHOLDS)
+def test_threshold_boundaries(op, threshold, mood):
+    predictor = MoodPredictor()
+    inside = np.nextafter(threshold, np.inf if op == ">=" else -np.inf)
+    outside = np.nextafter(threshold, -np.inf if op == ">=" else np.inf)
+    records = [_sentiment_only(threshold), _sentiment_only(float(inside)), _sentiment_only(float(outside))]
+    expected = [predictor.predict_mood(*record) for record in records]
+    assert [e["mood"] for e in expected][:2] == [mood, mood]
+    assert expected[2]["mood"] != mood
+    _assert_same(predictor.predict_mood_batch(to_columns(records)), expected)
+
+
+def test_empty_inputs():
+    predictor = MoodPredictor()
+    assert predictor.predict_mood() == {"mood": "neutral", "confidence": 0.5, "score": 0.0}
+    batch = predictor.predict_mood_batch(to_columns([]))
+    assert len(batch["mood"]) == 0
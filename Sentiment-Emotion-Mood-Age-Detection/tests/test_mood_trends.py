@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+import numpy as np
+
+from mood_trends import DAY_SECONDS, MOOD_LABELS, MoodTrends
+
+DAY0 = 20000 * DAY_SECONDS
+
+
+def test_in_order_entries_follow_the_ewma():
+    trends = MoodTrends(alpha=0.5)
+    trends.add_many([(DAY0, "calm", 0.4), (DAY0 + DAY_SECONDS, "stressed", -0.4), (DAY0 + 3 * DAY_SECONDS, "calm", 0.8)])
+    window = trends.trend("day", last=4)
+    np.testing.assert_allclose(window["ewma"], [0.4, 0.0, 0.0, 0.4])
+    np.testing.assert_array_equal(window["total"], [1, 1, 0, 1])
+
+
+def test_backfill_updates_counts_but_not_the_ewma():
+    trends = MoodTrends(alpha=0.5)
+    trends.add(DAY0, "calm", 0.4)
+    trends.add(DAY0 + 2 * DAY_SECONDS, "energetic", 1.0)
+    before = trends.trend("day", last=3)
+
+    # Older than the newest entry: into an empty bucket and into an existing one
+    trends.add(DAY0 + DAY_SECONDS, "depressed", -1.0)
+    trends.add(DAY0 + 2 * DAY_SECONDS - 1, "depressed", -1.0)
+    after = trends.trend("day", last=3)
+
+    np.testing.assert_array_equal(after["total"], [1, 2, 1])
+    np.testing.assert_allclose(after["mean"], [0.4, -1.0, 1.0])
+    assert after["counts"][1, MOOD_LABELS.index("depressed")] == 2
+    # The backfilled bucket carries the earlier EWMA and later buckets keep theirs
+    np.testing.assert_allclose(after["ewma"], before["ewma"])
+    np.testing.assert_allclose(after["ewma"], [0.4, 0.4, 0.7])
+    assert trends.current_ewma == 0.7
+
+
+def test_backfill_before_the_first_bucket_has_no_ewma():
+    trends = MoodTrends()
+    trends.add(DAY0 + DAY_SECONDS, "calm", 0.4)
+    trends.add(DAY0, "stressed", -0.4)
+    window = trends.trend("day", last=2)
+    assert np.isnan(window["ewma"][0])
+    assert window["ewma"][1] == 0.4
+    assert trends.entries == 2
+
+
+def test_rebuild_in_time_order_can_differ_from_backfilled_aggregates():
+    rows = [(DAY0, "calm", 0.4), (DAY0 + 2 * DAY_SECONDS, "energetic", 1.0), (DAY0 + DAY_SECONDS, "depressed", -1.0)]
+    incremental = MoodTrends(alpha=0.5)
+    for row in rows:
+        incremental.add(*row)
+    rebuilt = MoodTrends(alpha=0.5)
+    rebuilt.add_many(rows)
+
+    np.testing.assert_array_equal(incremental.trend("day", last=3)["total"], rebuilt.trend("day", last=3)["total"])
+    assert incremental.current_ewma == 0.7
+    assert rebuilt.current_ewma == 0.5 * 1.0 + 0.5 * (0.5 * -1.0 + 0.5 * 0.4)
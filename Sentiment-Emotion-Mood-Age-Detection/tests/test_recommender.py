@@ -0,0 +1,37 @@
+from __future__ import annotations
+
+from recommender import CATEGORIES, Recommender
+
+
+def _catalog():
+    items = [
+        {"id": f"{mood}-{category}-{n}", "category": category, "text": f"{mood} {category} {n}", "moods": [mood], "weight": 10 - n}
+        for mood in ("neutral", "stressed")
+        for category in CATEGORIES
+        for n in range(4)
+    ]
+    return {"items": items, "limits": {category: 2 for category in CATEGORIES}}
+
+
+def test_preview_matches_the_following_remembering_call():
+    recommender = Recommender(_catalog())
+    preview = recommender.recommend("stressed", user_id="alice", remember=False)
+    assert recommender.recommend("stressed", user_id="alice", remember=False) == preview
+    assert recommender.recommend("stressed", user_id="alice") == preview
+    assert preview["relaxation"] == ["stressed relaxation 0", "stressed relaxation 1"]
+
+
+def test_remembered_items_are_skipped_until_forgotten():
+    recommender = Recommender(_catalog())
+    first = recommender.recommend("stressed", user_id="alice")
+    second = recommender.recommend("stressed", user_id="alice", remember=False)
+    assert second["relaxation"] == ["stressed relaxation 2", "stressed relaxation 3"]
+    assert recommender.recommend("stressed", user_id="bob") == first
+    recommender.forget("alice")
+    assert recommender.recommend("stressed", user_id="alice") == first
+
+
+def test_history_seeds_recent_items():
+    recommender = Recommender(_catalog(), history=lambda user: [{"relaxation": ["stressed relaxation 0"]}])
+    recs = recommender.recommend("stressed", user_id="carol", remember=False)
+    assert recs["relaxation"] == ["stressed relaxation 1", "stressed relaxation 2"]
@@ -0,0 +1,45 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from speech_analysis import SpeechEmotionAnalyzer, StreamingSpeechAnalyzer
+
+SR = 16000
+
+
+def _stereo_int16(seconds: float = 3.0) -> np.ndarray:
+    t = np.arange(int(SR * seconds)) / SR
+    left = 0.3 * np.sin(2 * np.pi * 220 * t)
+    right = 0.2 * np.sin(2 * np.pi * 330 * t)
+    return (np.stack([left, right], axis=1) * 32767).astype(np.int16)
+
+
+def test_stereo_int16_stream_matches_analyze_array():
+    pcm = _stereo_int16()
+    analyzer = SpeechEmotionAnalyzer(cache=None)
+    expected = analyzer.analyze_array(pcm, SR)
+    stream = StreamingSpeechAnalyzer(analyzer)
+    for i in range(0, len(pcm), 1000):
+        stream.push(pcm[i : i + 1000])
+    summary = stream.summary()
+    # The stream has no edge padding, so features agree closely rather than exactly
+    for key in ("rms", "centroid", "zcr"):
+        assert summary[key] == pytest.approx(expected[key], rel=0.05)
+    assert summary["label"] == expected["label"]
+    assert summary["rms"] < 1.0  # scaled to [-1, 1], not raw int16
+
+
+def test_odd_length_byte_chunks_match_one_buffer():
+    mono = _stereo_int16()[:, 0].astype("<i2").tobytes()
+    whole = StreamingSpeechAnalyzer()
+    expected = whole.push(mono) + whole.flush()
+    chunked = StreamingSpeechAnalyzer()
+    windows = []
+    for i in range(0, len(mono), 1001):
+        windows.extend(chunked.push(mono[i : i + 1001]))
+    windows.extend(chunked.flush())
+    assert len(windows) == len(expected)
+    for got, want in zip(windows, expected):
+        assert got["label"] == want["label"]
+        assert got["rms"] == pytest.approx(want["rms"], rel=1e-6)
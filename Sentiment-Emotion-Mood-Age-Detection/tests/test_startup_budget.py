@@ -0,0 +1,36 @@
+from __future__ import annotations
+
+import json
+import os
+import sys
+
+import pytest
+
+BENCHMARKS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "benchmarks")
+
+
+@pytest.fixture(scope="module")
+def bench_startup():
+    # The warm first requests load the real models
+    for name in ("numpy", "torch", "transformers", "librosa", "PIL"):
+        pytest.importorskip(name)
+    sys.path.insert(0, BENCHMARKS)
+    try:
+        import bench_startup
+    finally:
+        sys.path.remove(BENCHMARKS)
+    return bench_startup
+
+
+def test_startup_within_budget(bench_startup):
+    with open(bench_startup.DEFAULT_BUDGET, "r", encoding="utf-8") as fh:
+        budget = json.load(fh)
+    modules = set(budget.get("import_ms", {})) | set(budget.get("forbidden_imports", {}))
+    report = {
+        "imports": {module: bench_startup.measure_import(module) for module in sorted(modules)},
+        "requests": {
+            name: {"warm": bench_startup.measure_request(name, warm=True)}
+            for name in budget.get("warm_first_request_ms", {})
+        },
+    }
+    assert bench_startup.check(report, budget) == []
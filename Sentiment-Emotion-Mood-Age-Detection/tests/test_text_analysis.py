@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import os
+
+import pytest
+
+from result_cache import ResultCache
+from text_analysis import TextAnalyzer
+
+TEXTS = [
+    "I am so happy and excited about today!",
+    "This is terrible, I feel sad and lonely.",
+    "Why does this keep making me angry",
+    "I'm scared of what happens next.",
+    "The meeting is at three.",
+    "",
+    "Great news, but I'm also a little worried.",
+]
+
+
+def _analyzer(cache=None) -> TextAnalyzer:
+    return TextAnalyzer(cache=cache, offline=True, backend="keywords")
+
+
+def test_batch_matches_single_calls():
+    analyzer = _analyzer()
+    assert analyzer.analyze_batch(TEXTS, batch_size=3) == [analyzer.analyze(text) for text in TEXTS]
+
+
+def test_batch_with_partially_cached_results():
+    cache = ResultCache()
+    analyzer = _analyzer(cache)
+    expected = [_analyzer().analyze(text) for text in TEXTS]
+    # Warm every other text so the batch mixes hits and misses
+    for text in TEXTS[::2]:
+        analyzer.analyze(text)
+    hits_before = cache.stats().hits
+    assert analyzer.analyze_batch(TEXTS) == expected
+    assert cache.stats().hits - hits_before == len(TEXTS[::2])
+    # Everything is cached now, including the texts computed by the batch
+    assert analyzer.analyze_batch(TEXTS) == expected
+    assert [analyzer.analyze(text) for text in TEXTS] == expected
+
+
+def test_empty_batch():
+    assert _analyzer().analyze_batch([]) == []
+    assert _analyzer(ResultCache()).analyze_batch([]) == []
+
+
+def test_onnx_export_is_saved_into_the_model_directory(tiny_text_model):
+    pytest.importorskip("optimum.onnxruntime")
+    first = TextAnalyzer(model_path=tiny_text_model, offline=True, backend="onnx")
+    expected = first.analyze("i am so happy today")
+    assert first._emotion_pipe is not None
+    assert os.path.isfile(os.path.join(tiny_text_model, "model.onnx"))
+
+    # A cold start now loads the saved export; the cache namespace already reflected it
+    second = TextAnalyzer(model_path=tiny_text_model, offline=True, backend="onnx")
+    assert second.analyze("i am so happy today") == expected
+    assert second.cache_namespace() == first.cache_namespace()
+
+
+LONG_TEXT = " ".join(["i am so happy today", "the meeting is at three", "i am scared and sad"] * 20)
+
+
+@pytest.mark.parametrize("max_tokens, overlap", [(4, 2), (3, 5), (16, 64), (None, 8)])
+def test_chunked_small_windows_use_the_model(tiny_text_model, monkeypatch, max_tokens, overlap):
+    import text_analysis
+
+    def no_fallback(*args):
+        raise AssertionError("fell back to keyword chunks")
+
+    monkeypatch.setattr(text_analysis, "_keyword_chunks", no_fallback)
+    analyzer = TextAnalyzer(model_path=tiny_text_model, offline=True)
+    result = analyzer.analyze_emotion_chunked(LONG_TEXT, max_tokens=max_tokens, overlap=overlap)
+    assert len(result["chunks"]) > 1
+    assert all(chunk["length"] <= (max_tokens or 64) for chunk in result["chunks"])
+
+
+@pytest.mark.parametrize("max_tokens, overlap", [(2, 0), (1, 0), (0, 0), (16, -1)])
+def test_chunked_rejects_invalid_windows(tiny_text_model, max_tokens, overlap):
+    analyzer = TextAnalyzer(model_path=tiny_text_model, offline=True)
+    with pytest.raises(ValueError):
+        analyzer.analyze_emotion_chunked(LONG_TEXT, max_tokens=max_tokens, overlap=overlap)